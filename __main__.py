@@ -1,13 +1,60 @@
+import os
+import sys
+
 from src.renpy.args import *
+from src.renpy.build import *
 from src.renpy.read import *
 
+def check(arg_obj: args_obj.Args_Object):
+    # Only JSON Lines are written to stdout
+    read_paths = list(arg_obj.scripts)
+    if arg_obj.read_file:
+        read_paths.append(arg_obj.read_file)
+    if arg_obj.read_dir:
+        read_paths.extend(read_registry.Reader_Registry.find_scripts(arg_obj.read_dir))
+    checker = build_check.Script_Checker(read_paths, arg_obj.jobs)
+    results = checker.check()
+    checker.write(results)
+    checker.print_summary(results)
+    if checker.count(results, 'error'):
+        sys.exit(1)
+
 def main():
-    print('starting program...')
     argv = argv_parse.Argv_Parser()
-    args = argv.parser.parse_args()
+    args = argv.parse_args()
     arg_obj = args_obj.Args_Object()
     arg_obj.argparse_populate(args)
+    if arg_obj.check:
+        check(arg_obj)
+        return
+    print('starting program...')
     arg_obj.print()
+    shared_script_names = (arg_obj.character_script_name, arg_obj.sprite_script_name, arg_obj.location_script_name)
+    builder = build_batch.Batch_Builder(arg_obj.read_dir, arg_obj.game_dir, arg_obj.jobs, arg_obj.force, bool(arg_obj.profile), arg_obj.incremental, shared_script_names, arg_obj.report_format)
+    builds = None
+    if arg_obj.read_dir:
+        results = builder.build()
+        builder.print_results(results)
+        builder.print_summary(results)
+        print('wrote project report \''+builder.write_report(results)+'\'')
+    else:
+        write_path = os.path.join(arg_obj.game_dir, arg_obj.write_file+'.rpy')
+        builds = [(arg_obj.read_file, write_path, arg_obj.write_file)]
+        result = builder.build(builds, quiet=False)[0]
+        if result.cached:
+            print('\''+arg_obj.read_file+'\' is unchanged since \''+write_path+'\' was written, use -f to compile it again')
+        elif result.failure:
+            print('FAILED ('+result.failure+')')
+            if result.traceback:
+                print(result.traceback.rstrip())
+        results = [result]
+    if arg_obj.profile:
+        builder.write_profile(results, arg_obj.profile)
+    if arg_obj.watch:
+        try:
+            build_watch.Script_Watcher(builder, builds).watch()
+        except KeyboardInterrupt:
+            print('stopped watching')
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,201 @@
+import argparse
+import datetime
+import gc
+import hashlib
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+
+from dev.gen_script import Script_Generator
+from src.old_prog import Run_Manager
+
+'''
+******************************************************************
+Stage_Bench is a class that times every stage of compiling one
+synthetic script on its own. The script is lexed once, then quality
+assurance, character discovery and emission each make their own
+pass over the lexed statements, so the time of each stage is not
+mixed with the others. Writing the label file and the report are
+timed last, and the whole script is then compiled again through
+Run_Manager.run to time it end to end.
+'''
+class Stage_Bench:
+    stages: list[str] = ['lex', 'qa', 'discovery', 'emission', 'write', 'report', 'end_to_end']
+    
+    def __init__(self, work_dir: str, line_count: int, seed: int = 0) -> None:
+        self.work_dir = work_dir
+        self.line_count = line_count
+        self.seed = seed
+        self.read_path = os.path.join(work_dir, 'bench_'+str(line_count)+'.txt')
+        self.write_path = os.path.join(work_dir, 'bench_'+str(line_count)+'.rpy')
+        self.label_name = 'bench_'+str(line_count)
+    
+    def generate(self) -> int:
+        with open(self.read_path, 'w', encoding='utf-8') as write_file:
+            try:
+                Script_Generator(self.seed).write(write_file, self.line_count)
+            finally:
+                write_file.close()
+        return os.path.getsize(self.read_path)
+    
+    def run_once(self) -> dict[str, float]:
+        timings: dict[str, float] = {}
+        rm = Run_Manager(self.label_name, quiet=True)
+        rm.rr.set_format(rm.rr.report_format, self.work_dir)
+    
+        start = time.perf_counter()
+        with open(self.read_path, 'r', encoding='utf-8') as read_file:
+            try:
+                statements = list(rm.lexer.lex(read_file))
+            finally:
+                read_file.close()
+        timings['lex'] = time.perf_counter()-start
+    
+        start = time.perf_counter()
+        check_line = rm.qar.check_line
+        for stmt in statements:
+            if not check_line(stmt.line, stmt.raw or stmt, stmt.diagnosis): break
+        timings['qa'] = time.perf_counter()-start
+        rm.qa_done = True
+    
+        start = time.perf_counter()
+        discover_line = rm.coh.discover_line
+        for stmt in statements:
+            if not discover_line(stmt.line, stmt.raw or stmt): break
+        timings['discovery'] = time.perf_counter()-start
+        rm.dscv_done = True
+    
+        start = time.perf_counter()
+        rm.compile_statements(statements)
+        timings['emission'] = time.perf_counter()-start
+    
+        start = time.perf_counter()
+        with open(self.write_path, 'w', encoding='utf-8') as write_file:
+            try:
+                rm.write_label(write_file)
+            finally:
+                write_file.close()
+        timings['write'] = time.perf_counter()-start
+    
+        start = time.perf_counter()
+        rm.rr.write_report(rm.qar, rm.coh)
+        timings['report'] = time.perf_counter()-start
+    
+        self.num_statements = len(statements)
+        del statements, rm
+        gc.collect()
+    
+        # the report of Run_Manager.run is written to the working directory
+        curr_dir = os.getcwd()
+        os.chdir(self.work_dir)
+        try:
+            start = time.perf_counter()
+            Run_Manager.run(self.read_path, self.write_path, self.label_name, quiet=True)
+            timings['end_to_end'] = time.perf_counter()-start
+        finally:
+            os.chdir(curr_dir)
+        return timings
+    
+    def run(self, repeat: int = 1) -> dict:
+        # Every stage keeps its fastest time over all repeats
+        num_bytes = self.generate()
+        best: dict[str, float] = {}
+        for _ in range(max(repeat, 1)):
+            for stage, seconds in self.run_once().items():
+                best[stage] = min(seconds, best.get(stage, seconds))
+        return {'lines': self.line_count,
+                'bytes': num_bytes,
+                'statements': self.num_statements,
+                'seconds': {stage: round(best[stage], 6) for stage in self.stages},
+                'lines_per_second': round(self.line_count/best['end_to_end']) if best['end_to_end'] else None}
+
+'''
+******************************************************************
+Bench_Suite is a class that runs a Stage_Bench for every script
+size, and writes every result to a JSON file along with what they
+were measured on, so results from different releases can be
+compared with compare().
+'''
+class Bench_Suite:
+    default_sizes: list[int] = [1000, 10000, 100000, 1000000]
+    compiler_path: str = os.path.join(os.path.dirname(__file__), '..', 'src', 'old_prog.py')
+    
+    def __init__(self, sizes: list[int] = None, seed: int = 0, repeat: int = 1) -> None:
+        self.sizes = sizes if sizes else self.default_sizes
+        self.seed = seed
+        self.repeat = repeat
+    
+    def compiler_version(self) -> str:
+        with open(self.compiler_path, 'rb') as read_file:
+            try:
+                return hashlib.sha256(read_file.read()).hexdigest()
+            finally:
+                read_file.close()
+    
+    def run(self) -> dict:
+        results = {'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                   'compiler_version': self.compiler_version(),
+                   'python': platform.python_version(),
+                   'platform': platform.platform(),
+                   'seed': self.seed,
+                   'repeat': self.repeat,
+                   'runs': []}
+        work_dir = tempfile.mkdtemp(prefix='text2code_bench_')
+        try:
+            for line_count in self.sizes:
+                run = Stage_Bench(work_dir, line_count, self.seed).run(self.repeat)
+                self.print_run(run)
+                results['runs'].append(run)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        return results
+    
+    def print_run(self, run: dict) -> None:
+        seconds = run['seconds']
+        print(str(run['lines']).rjust(8)+' lines: '+'  '.join(stage+' '+format(seconds[stage], '.3f')+'s' for stage in Stage_Bench.stages))
+    
+    def compare(self, results: dict, old_results: dict) -> None:
+        # Prints how much slower (+) or faster (-) each stage got
+        old_runs = {run['lines']: run for run in old_results['runs']}
+        print('COMPARED TO '+old_results['date']+' ('+old_results['compiler_version'][:12]+'):')
+        for run in results['runs']:
+            if run['lines'] not in old_runs:
+                continue
+            changes = []
+            for stage in Stage_Bench.stages:
+                old_seconds = old_runs[run['lines']]['seconds'].get(stage)
+                if old_seconds:
+                    changes.append(stage+' '+format((run['seconds'][stage]/old_seconds-1)*100, '+.1f')+'%')
+            print(str(run['lines']).rjust(8)+' lines: '+'  '.join(changes))
+
+def main():
+    parser = argparse.ArgumentParser(description='Times every stage of text2code on synthetic screenplays.')
+    parser.add_argument('-n', '--sizes', type=int, nargs='+', help='the line counts of the scripts, 1k to 1M lines by default')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='the seed of every script')
+    parser.add_argument('-r', '--repeat', type=int, default=1, help='how many times each script is compiled, keeping the fastest time')
+    parser.add_argument('-o', '--output', default='bench_results.json', help='the JSON file the results are written to')
+    parser.add_argument('-c', '--compare', help='a JSON file of earlier results to compare against')
+    args = parser.parse_args()
+    old_results = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as read_file:
+            try:
+                old_results = json.load(read_file)
+            finally:
+                read_file.close()
+    suite = Bench_Suite(args.sizes, args.seed, args.repeat)
+    results = suite.run()
+    with open(args.output, 'w', encoding='utf-8') as write_file:
+        try:
+            json.dump(results, write_file, indent=2)
+        finally:
+            write_file.close()
+    print('wrote \''+args.output+'\'')
+    if old_results:
+        suite.compare(results, old_results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from dev.gen_script import Script_Generator
+
+'''
+******************************************************************
+Startup_Bench is a class that times how long the command line takes
+to compile a small plain text script, from starting Python to the
+label being written, so the time is mostly spent starting up. Each
+compile runs in a new interpreter. It is timed as text2code runs it,
+where readers are imported by Reader_Registry as scripts of their
+format are read, and again with every reader imported up front, as
+they were before. The modules a plain text compile imports are
+checked for the readers of other formats and what they are built on.
+'''
+class Startup_Bench:
+    repo_dir: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    reader_modules: list[str] = ['src.renpy.read.read_docx', 'src.renpy.read.read_fdx', 'src.renpy.read.read_fountain',
+                                 'src.renpy.read.read_pdf', 'src.renpy.read.read_raw']
+    # modules a plain text compile has no use for
+    unused_modules: list[str] = reader_modules[:4]+['pypdf', 'xml.etree.ElementTree', 'zipfile']
+    child_code: str = \
+        'import contextlib, io, json, runpy, sys\n' \
+        'sys.path.insert(0, sys.argv[2])\n' \
+        'for module_name in json.loads(sys.argv[1]): __import__(module_name)\n' \
+        'sys.argv = [sys.argv[2]]+sys.argv[3:]\n' \
+        'with contextlib.redirect_stdout(io.StringIO()): runpy.run_path(sys.argv[0], run_name=\'__main__\')\n' \
+        'print(json.dumps(sorted(sys.modules)))\n'
+    
+    def __init__(self, work_dir: str, line_count: int = 100, repeat: int = 10, seed: int = 0) -> None:
+        self.work_dir = work_dir
+        self.line_count = line_count
+        self.repeat = repeat
+        self.seed = seed
+        self.read_path = os.path.join(work_dir, 'startup.txt')
+    
+    def generate(self) -> None:
+        with open(self.read_path, 'w', encoding='utf-8') as write_file:
+            try:
+                Script_Generator(self.seed).write(write_file, self.line_count)
+            finally:
+                write_file.close()
+    
+    def compile_once(self, imports: list[str]) -> tuple[float, list[str]]:
+        # Returns how long the compile took, and every module it imported
+        command = [sys.executable, '-c', self.child_code, json.dumps(imports), self.repo_dir,
+                   '-r', self.read_path, '-g', self.work_dir, '-w', 'startup', '-f']
+        start = time.perf_counter()
+        done = subprocess.run(command, cwd=self.work_dir, capture_output=True, text=True)
+        seconds = time.perf_counter()-start
+        if done.returncode != 0:
+            raise Exception('INVALID BENCH: compiling \"'+self.read_path+'\" failed\n'+done.stderr)
+        return seconds, json.loads(done.stdout.splitlines()[-1])
+    
+    def time_compiles(self, imports: list[str]) -> dict:
+        times = []
+        modules = []
+        for _ in range(max(self.repeat, 1)):
+            seconds, modules = self.compile_once(imports)
+            times.append(seconds)
+        return {'best': round(min(times), 4),
+                'median': round(statistics.median(times), 4),
+                'unused_modules': [module for module in self.unused_modules if module in modules]}
+    
+    def run(self) -> dict:
+        self.generate()
+        return {'lines': self.line_count,
+                'repeat': self.repeat,
+                'lazy': self.time_compiles([]),
+                'eager': self.time_compiles(self.reader_modules)}
+
+def main():
+    parser = argparse.ArgumentParser(description='Times how long text2code takes to start up on a small plain text script.')
+    parser.add_argument('-n', '--lines', type=int, default=100, help='the line count of the script, 100 by default')
+    parser.add_argument('-r', '--repeat', type=int, default=10, help='how many times the script is compiled each way')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='the seed of the script')
+    args = parser.parse_args()
+    work_dir = tempfile.mkdtemp(prefix='text2code_startup_')
+    try:
+        results = Startup_Bench(work_dir, args.lines, args.repeat, args.seed).run()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    for way in ['lazy', 'eager']:
+        result = results[way]
+        print(way.ljust(6)+' best '+format(result['best'], '.3f')+'s  median '+format(result['median'], '.3f')+'s  '
+              +'imported: '+(', '.join(result['unused_modules']) or 'no reader of another format'))
+    saved = results['eager']['median']-results['lazy']['median']
+    print('a plain text compile starts '+format(saved*1000, '.1f')+'ms sooner when readers are imported lazily')
+    if results['lazy']['unused_modules']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+from dev.gen_script import Script_Generator
+from src.old_prog import Run_Manager
+
+'''
+******************************************************************
+Incremental_Check is a class that checks an incremental compile
+writes exactly what a full compile writes. A synthetic script is
+compiled incrementally, then edited: lines are changed, added and
+removed, scenes are duplicated and dropped, and characters and 
+lines quality assurance reports on are added. After every edit the
+script is compiled incrementally into the same label, and fully 
+into a label of its own, and both labels and both reports must be
+the same, or both compiles must fail the same way.
+'''
+class Incremental_Check:
+    def __init__(self, work_dir: str, seed: int = 0, line_count: int = 2000) -> None:
+        self.work_dir = work_dir
+        self.rand = random.Random(seed)
+        self.generator = Script_Generator(seed)
+        self.lines = list(self.generator.generate(line_count))
+        self.read_path = os.path.join(work_dir, 'script.txt')
+        # lines quality assurance warns about, or stops at
+        self.mistakes: list[str] = ['[enter quietly]', '<snap nvl>', '{bold, count=3}', 'INTERIOR. DOMUS',
+                                    '[enter slowly]', '<idle avl>', self.generator.cast[0]+' (CONT.)', '<SLOW>']
+        self.num_copied: int = 0
+    
+    def edit(self) -> str:
+        # Returns what kind of edit was made
+        lines = self.lines
+        index = self.rand.randrange(8, len(lines)-1)
+        kind = self.rand.choice(['change', 'insert', 'delete', 'scene', 'drop', 'character', 'style', 'mistake'])
+        if kind == 'change':
+            lines[index] = self.generator.text()+'\n'
+        elif kind == 'insert':
+            lines[index:index] = [line+'\n' for line in self.generator.beat()]
+        elif kind == 'delete':
+            del lines[index]
+        elif kind == 'scene':
+            headers = [num for num, line in enumerate(lines) if line.startswith(('INT.', 'EXT.', 'LOC.', 'IMG.'))]
+            if len(headers) > 1:
+                start = self.rand.randrange(len(headers)-1)
+                lines[headers[-1]:headers[-1]] = lines[headers[start]:headers[start+1]]
+        elif kind == 'drop':
+            headers = [num for num, line in enumerate(lines) if line.startswith(('INT.', 'EXT.', 'LOC.', 'IMG.'))]
+            if len(headers) > 1:
+                start = self.rand.randrange(len(headers)-1)
+                del lines[headers[start]:headers[start+1]]
+        elif kind == 'character':
+            lines[index:index] = ['NEWCOMER'+str(self.rand.randrange(3))+'\n', self.generator.text()+'\n', '\n']
+        elif kind == 'mistake':
+            lines[index:index] = [self.rand.choice(self.mistakes)+'\n']
+        else:
+            lines[index:index] = [self.rand.choice(self.generator.render_styles+self.generator.text_styles)+'\n']
+        return kind
+    
+    def compile(self, label_dir: str, incremental: bool):
+        # Every label gets a directory of its own, with its report
+        os.makedirs(label_dir, exist_ok=True)
+        try:
+            rm = Run_Manager.run(self.read_path, os.path.join(label_dir, 'script.rpy'), 'script', quiet=True, incremental=incremental, report_dir=label_dir)
+        except Exception as exc:
+            return None, repr(exc), None
+        with open(os.path.join(label_dir, 'script.rpy'), 'rb') as read_file:
+            label = read_file.read()
+        with open(rm.rr.report_name, 'r', encoding='utf-8') as read_file:
+            report = read_file.read().split('\n')
+        # the date of the report always differs
+        return rm, label, report[:3]+report[4:]
+    
+    def run(self, num_edits: int) -> bool:
+        for num in range(num_edits+1):
+            kind = self.edit() if num else 'none'
+            with open(self.read_path, 'w', encoding='utf-8') as write_file:
+                write_file.write(''.join(self.lines))
+            rm, label, report = self.compile(os.path.join(self.work_dir, 'incremental'), True)
+            full_rm, full_label, full_report = self.compile(os.path.join(self.work_dir, 'full'), False)
+            if rm is not None:
+                self.num_copied += rm.num_copied
+            if label != full_label or report != full_report:
+                print('edit '+str(num)+' ('+kind+'): incremental compile differs from full compile')
+                return False
+        return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Checks incremental compiles write the same labels as full compiles.')
+    parser.add_argument('-n', '--seeds', type=int, default=20, help='how many scripts to check')
+    parser.add_argument('-e', '--edits', type=int, default=10, help='how many edits to make to each script')
+    parser.add_argument('-l', '--lines', type=int, default=2000, help='the line count of each script')
+    args = parser.parse_args()
+    work_dir = tempfile.mkdtemp(prefix='text2code_check_')
+    num_failed = num_copied = 0
+    try:
+        for seed in range(args.seeds):
+            check = Incremental_Check(os.path.join(work_dir, str(seed)), seed, args.lines)
+            os.makedirs(check.work_dir)
+            if not check.run(args.edits):
+                print('seed '+str(seed)+' FAILED')
+                num_failed += 1
+            num_copied += check.num_copied
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(str(args.seeds-num_failed)+' of '+str(args.seeds)+' script(s) passed, '+str(num_copied)+' scene(s) copied')
+    sys.exit(1 if num_failed else 0)
+
+if __name__ == '__main__':
+    main()
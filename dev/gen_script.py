@@ -0,0 +1,209 @@
+import argparse
+import contextlib
+import random
+import sys
+from collections.abc import Iterator
+
+'''
+******************************************************************
+Script_Generator is a class that writes synthetic screenplays for
+benchmarking. Every statement Regular_Expressions understands is
+written: transitions, scene headers, character names with V.O. and
+O.S. extensions, parentheticals, character directions, render
+style, text style and audio statements, along with narration,
+dialogue and comments. Directions and extensions only name
+characters already discovered in the speech style they are written
+in, and an off screen line in BUBBLE or NVL also needs the character
+discovered in AVL, so every pass of the compiler reads the scripts to
+the end. An image style on its own sets the speech style of discovery
+back to AVL but leaves that of writing as it was, so both are kept.
+The same seed always generates the same script.
+'''
+class Script_Generator:
+    syllables: list[str] = ['SER', 'GI', 'US', 'JU', 'VEN', 'TIA', 'MAR', 'CUS', 'LI', 'VIA',
+                            'AU', 'RE', 'LI', 'O', 'CLAU', 'DIA', 'TI', 'BER', 'FLA', 'VI']
+    places: list[str] = ['DOMUS', 'FORUM', 'TEMPLUM', 'HORTUS', 'VIA APPIA', 'THERMAE', 'CURIA',
+                         'BASILICA', 'TABERNA', 'CASTRA', 'PORTUS', 'ATRIUM']
+    times: list[str] = ['DAY', 'NIGHT', 'DAWN', 'DUSK', 'LATER']
+    transitions: list[str] = ['CUT', 'FADE', 'DISSOLVE', 'WIPE', 'SMASH CUT', 'MATCH CUT']
+    emotions: list[str] = ['gaudium', 'ira', 'odium', 'timor', 'stupor', 'tristitia', 'amor', 'spes']
+    moods: list[str] = ['HAPPY', 'ANGRY', 'SAD', 'TIRED', 'AFRAID', 'CALM', 'CONFUSED']
+    change_verbs: list[str] = ['IS', 'GETS', 'GROWS', 'GOES', 'TURNS', 'BECOMES', ':']
+    render_styles: list[str] = ['<NVL>', '<BUBBLE>', '<AVL>', '<SNAP NVL>', '<IDLE AVL>', '<SNAP>',
+                                '<CMMN BUBL>', '<NVL-MODE SNAP>', '<RESET>', '<>']
+    text_styles: list[str] = ['{BOLD, COUNT=3}', '{ITALICS}', '{RED, SPEAK}', '{UPPER, COUNT=2}',
+                              '{QUICK, NARRATE}', '{SWAP, UNDERLINED}', '{BIG, BLUE, INF}',
+                              '{LOWER, TRANSLUCENT, COUNT=5}', '{RESET}', '{}']
+    audio: list[str] = ['*M: THEME?', '*MUSIC: BATTLE?', '*S: DOOR!*', '*SOUND: THUNDER*', '*KNOCK*',
+                        '*V: GREETING*', '*VOICE: SHOUT*', '*AMB: RAIN*', '*CROWD: CHEER*']
+    words: list[str] = ['lorem', 'ipsum', 'odor', 'amet', 'consectetuer', 'adipiscing', 'elit',
+                        'dictum', 'ornare', 'feugiat', 'ante', 'dignissim', 'euismod', 'penatibus',
+                        'congue', 'curabitur', 'urna', 'nisl', 'et', 'nibh', 'sed', 'orci', 'nulla',
+                        'varius', 'facilisis', 'tincidunt', 'egestas', 'aptent', 'habitasse', 'erat']
+    marks: list[str] = ['.', '.', '.', '!', '?', '...', '; "quoth" he.', ' {sic}.', ' [sic].', ' 50%.']
+    # speech style of the keywords of a render style
+    speech_keywords: dict[str, str] = {'AVL': 'AVL', 'AVL-MODE': 'AVL', 'BUBL': 'BUBBLE', 'BUBBLE': 'BUBBLE',
+                                       'NVL': 'NVL', 'NVL-MODE': 'NVL'}
+    
+    def __init__(self, seed: int = 0, cast_size: int = 12) -> None:
+        self.rand = random.Random(seed)
+        self.cast: list[str] = []
+        while len(self.cast) < cast_size:
+            name = ''.join(self.rand.sample(self.syllables, self.rand.randint(2, 3)))
+            if name not in self.cast:
+                self.cast.append(name)
+        self.curr_cast: list[str] = self.cast[:2]
+        # the speech style writing and discovery are in, every character
+        # discovered by the style they were discovered in, and the last
+        # character who spoke
+        self.speech: str = 'AVL'
+        self.dscv_speech: str = 'AVL'
+        self.discovered: set[tuple[str, str]] = set()
+        self.speaker: str = ''
+    
+    def can_write(self, name: str) -> bool:
+        # True when a line that discovers name leaves them discovered in
+        # the speech style they are written in
+        return (name, self.speech) in self.discovered or self.dscv_speech == self.speech
+    
+    def discover(self, name: str) -> None:
+        self.discovered.add((name, self.dscv_speech))
+    
+    def render_style(self) -> str:
+        style = self.rand.choice(self.render_styles)
+        if style == '<RESET>':
+            self.speech = self.dscv_speech = 'AVL'
+            return style
+        speeches = [self.speech_keywords[word] for word in style[1:-1].split() if word in self.speech_keywords]
+        if speeches:
+            self.speech = self.dscv_speech = speeches[0]
+        else:
+            self.dscv_speech = 'AVL'
+        return style
+    
+    def sentence(self) -> str:
+        words = self.rand.choices(self.words, k=self.rand.randint(4, 16))
+        return ' '.join(words).capitalize()+self.rand.choice(self.marks)
+    
+    def text(self) -> str:
+        return ' '.join(self.sentence() for _ in range(self.rand.randint(1, 3)))
+    
+    def title_page(self) -> Iterator[str]:
+        yield 'Titulus'
+        yield ''
+        yield 'by'
+        yield ''
+        yield 'AUCTOR'
+        yield ''
+        yield '///SCRIPT BEG\\\\\\'
+    
+    def scene_header(self) -> Iterator[str]:
+        if self.rand.random() < 0.5:
+            yield self.rand.choice(self.transitions)+' TO:'
+        header = self.rand.choice(['INT.', 'EXT.', 'LOC.', 'IMG.'])+' '+self.rand.choice(self.places)
+        if self.rand.random() < 0.6:
+            header = header+self.rand.choice([' - ', ' , '])+self.rand.choice(self.times)
+        yield header
+        yield ''
+        self.curr_cast = self.rand.sample(self.cast, self.rand.randint(2, min(5, len(self.cast))))
+    
+    def dialogue(self) -> Iterator[str]:
+        names = [name for name in self.curr_cast if self.can_write(name)]
+        if not names:
+            yield self.text()
+            yield ''
+            return
+        name = self.rand.choice(names)
+        was_discovered = (name, self.speech) in self.discovered
+        self.discover(name)
+        self.speaker = name
+        extension = self.rand.random()
+        if extension < 0.08 and was_discovered:
+            name = name+' (V.O.)'
+        elif extension < 0.16 and was_discovered and (name, 'AVL') in self.discovered:
+            name = name+' (O.S.)'
+        yield name
+        for num in range(self.rand.randint(1, 3)):
+            if self.rand.random() < (0.5 if num == 0 else 0.25):
+                yield '('+self.rand.choice(self.emotions)+')'
+            yield self.text()
+        yield ''
+    
+    def direction(self) -> str:
+        # An exit hides the last character who spoke, whoever it names
+        names = [name for name in self.curr_cast if (name, self.speech) in self.discovered]
+        if not names:
+            return '# '+self.sentence()
+        name = self.rand.choice(names)
+        self.discover(name)
+        if self.rand.random() < 0.7:
+            return '['+name+' '+self.rand.choice(self.change_verbs)+' '+self.rand.choice(self.moods)+']'
+        if (self.speaker, self.speech) in self.discovered and self.rand.random() < 0.5:
+            return '[EXIT '+name+']'
+        return '[ENTER '+name+']'
+    
+    def beat(self) -> Iterator[str]:
+        kind = self.rand.random()
+        if kind < 0.45:
+            yield from self.dialogue()
+        elif kind < 0.70:
+            yield self.text()
+            yield ''
+        elif kind < 0.80:
+            yield self.direction()
+        elif kind < 0.84:
+            yield self.render_style()
+        elif kind < 0.90:
+            yield self.rand.choice(self.text_styles)
+        elif kind < 0.97:
+            yield self.rand.choice(self.audio)
+        else:
+            yield '# '+self.sentence()
+    
+    def generate(self, line_count: int) -> Iterator[str]:
+        # Yields at least line_count lines, each ending in a newline.
+        # Scenes are only ever ended between beats
+        num_lines = 0
+        for line in self.title_page():
+            num_lines += 1
+            yield line+'\n'
+        while num_lines < line_count-1:
+            for line in self.scene_header():
+                num_lines += 1
+                yield line+'\n'
+            for _ in range(self.rand.randint(8, 40)):
+                for line in self.beat():
+                    num_lines += 1
+                    yield line+'\n'
+                if num_lines >= line_count-1:
+                    break
+        yield '\\\\\\SCRIPT END///\n'
+    
+    def write(self, write_file, line_count: int) -> int:
+        # Returns how many characters were written
+        num_chars = 0
+        block: list[str] = []
+        for line in self.generate(line_count):
+            block.append(line)
+            num_chars += len(line)
+            if len(block) >= 4096:
+                write_file.write(''.join(block))
+                block.clear()
+        write_file.write(''.join(block))
+        return num_chars
+
+def main():
+    parser = argparse.ArgumentParser(description='Writes a synthetic screenplay for benchmarking text2code.')
+    parser.add_argument('-n', '--lines', type=int, default=1000, help='how many lines to write')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='the seed of the script')
+    parser.add_argument('-o', '--output', default='-', help='the file to write, or \'-\' for stdout')
+    args = parser.parse_args()
+    if args.output == '-':
+        write_context = contextlib.nullcontext(sys.stdout)
+    else:
+        write_context = open(args.output, 'w', encoding='utf-8')
+    with write_context as write_file:
+        Script_Generator(args.seed).write(write_file, args.lines)
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,21 @@
 import argparse
+import codecs
+from collections.abc import Iterable, Iterator
+import contextlib
+import csv
 from datetime import datetime as dt
+import functools
+import hashlib
+import io
+import json
+import marshal
+import mmap
 import random
 import sys
 import os
 import re
+import tempfile
+import time
 
 '''
 ******************************************************************
@@ -11,48 +23,116 @@ Regular_Expressions class is the class that stores all regular
 expressions throughout every process of ren_form.py. By default,
 the Regular_Expressions contains no regular expression, but
 using the init methods will initiate specific regular expressions 
-to use.
+to use. Accessing a regular expression that was not initiated 
+initiates its group.
+Every group is compiled once per process and character set, then 
+shared by every Regular_Expressions made with that character set.
 '''
 class Regular_Expressions:
+    default_set: str = r'[A-Z0-9\s_-]+?' #r'[^a-z`~!@#$%^&*\[{\]};:\'\",<\.>/?\(\)\-=+\\|]+?'
+    
+    # compiled groups of every character set: {char_set: {group: {name: pattern}}}
+    pattern_sets: dict[str, dict[str, dict[str, re.Pattern]]] = {}
+    
+    # the group each regular expression belongs to
+    pattern_groups: dict[str, str] = \
+        {'script_beg': 'script', 'script_end': 'script', 'empty_line': 'script', 'cmmnt_line': 'script',
+         'chrct_name': 'characters', 'chrct_prnth': 'characters',
+         'scene_trans': 'headers', 'scene_headr': 'headers',
+         'chng_drct': 'directions', 'appr_drct': 'directions',
+         'rendr_style': 'render_styles', 'reset_rendr': 'render_styles',
+         'text_style': 'text_styles', 'reset_text': 'text_styles',
+         'sound_stmt': 'audio', 'music_stmt': 'audio', 'voice_stmt': 'audio', 'audio_stmt': 'audio',
+         'unknw_extn': 'quality_assurance', 'unkwn_drct': 'quality_assurance', 'unkwn_rendr': 'quality_assurance',
+         'potnt_headr': 'quality_assurance', 'potnt_drct': 'quality_assurance', 'potnt_rendr': 'quality_assurance',
+         'potnt_text': 'quality_assurance',
+         'var_name': 'objects', 'is_num': 'objects'}
+    
     def __init__(self, new_set = '') -> None:
         if new_set == '':
-            self.char_set = r'[A-Z0-9\s_-]+?' #r'[^a-z`~!@#$%^&*\[{\]};:\'\",<\.>/?\(\)\-=+\\|]+?'
+            self.char_set = Regular_Expressions.default_set
         else:
             self.char_set = '['+new_set+']'
+        self.patterns = Regular_Expressions.pattern_sets.setdefault(self.char_set, {})
+    
+    def __getattr__(self, name: str) -> re.Pattern:
+        if name not in Regular_Expressions.pattern_groups:
+            raise AttributeError('\'Regular_Expressions\' object has no attribute \''+name+'\'')
+        self.init_group(Regular_Expressions.pattern_groups[name])
+        return self.__dict__[name]
+    
+    def init_group(self, group: str) -> None:
+        if group not in self.patterns:
+            self.patterns[group] = getattr(self, 'compile_'+group)()
+        self.__dict__.update(self.patterns[group])
+    
+    def compile_script(self) -> dict[str, re.Pattern]:
+        return {'script_beg': re.compile(r'^\s*\/\/\/\s*SCRIPT\s+BEG\s*\\\\\\\s*$'),
+                'script_end': re.compile(r'^\s*\\\\\\\s*SCRIPT\s+END\s*\/\/\/\s*$'),
+                'empty_line': re.compile(r'^\s*$'),
+                'cmmnt_line': re.compile(r'^\s*#.+$')}
+        
+    def compile_characters(self) -> dict[str, re.Pattern]:
+        return {'chrct_name': re.compile(r'^\s*\s*((?:[A-Z0-9\s_-]{2,5}\.)?\s*'+self.char_set+r')(?:\s+\(\s*(O.S.|V.O.)\s*\))?\s*$'),
+                'chrct_prnth': re.compile(r'^\s*\((\w+)\)\s*$')}
+    
+    def compile_headers(self) -> dict[str, re.Pattern]:
+        header_start = r'INT\.|EXT\.|LOC\.|IMG\.'
+        return {'scene_trans': re.compile(r'^\s*('+self.char_set+r')\s+TO:\s*$'),
+                'scene_headr': re.compile(r'^\s*('+header_start+r')\s+('+self.char_set+r')(?:\s+(-|,)\s+('+self.char_set+r'))?\s*$')}
+    
+    def compile_directions(self) -> dict[str, re.Pattern]:
+        return {'chng_drct': re.compile(r'\s*\[\s*('+self.char_set+r')\s+(?:\:|IS|GETS|GROWS|GOES|TURNS|BECOMES)\s+('+self.char_set+r')\s*\]\s*'),
+                'appr_drct': re.compile(r'\s*\[\s*(ENTER|EXIT)\s+('+self.char_set+r')\s*\]\s*')}
+        
+    def compile_render_styles(self) -> dict[str, re.Pattern]:
+        # rendr_style = re.compile(r'^\s*<\s*('+self.char_set+r')\s*>\s*$')
+        return {'rendr_style': re.compile(r'^\s*<\s*(?:(SNAP|IDLE|CMMN|COMMON)\s*)?(BUBL|AVL|NVL|BUBBLE|AVL-MODE|NVL-MODE)?(?:\s*(SNAP|IDLE|CMMN|COMMON))?\s*>\s*$'),
+                'reset_rendr': re.compile(r'^\s*<\s*(?:RESET)?\s*>\s*$')}
+        
+    def compile_text_styles(self) -> dict[str, re.Pattern]:
+        return {'text_style': re.compile(r'^\s*{\s*((?:\s*[A-Z]+(?:\s*=\s*[\w\d\.#]+?)?\s*,\s*)*?(?:\s*[A-Z]+(?:\s*=\s*[\w\d\.#]+?)?))\s*}\s*$'),
+                'reset_text': re.compile(r'^\s*{\s*(?:RESET)?\s*}\s*$')}
+        
+    def compile_audio(self) -> dict[str, re.Pattern]:
+        return {'sound_stmt': re.compile(r'^\s*\*\s*(?:(?:S|SOUND)\s*\:\s*)?('+self.char_set+r')\s*(!)?\s*\*\s*$'),
+                'music_stmt': re.compile(r'^\s*\*\s*(?:(?:M|MUSIC)\s*\:)\s*('+self.char_set+r')\s*\?\s*$'),
+                'voice_stmt': re.compile(r'^\s*\*\s*(?:(?:V|VOICE)\s*\:)\s*('+self.char_set+r')\s*\*\s*$'),
+                'audio_stmt': re.compile(r'^\s*\*\s*('+self.char_set+r')\s*\:\s*('+self.char_set+r')\s*\*\s*$')}
+    
+    def compile_quality_assurance(self) -> dict[str, re.Pattern]:
+        return {'unknw_extn': re.compile(r'^\s*'+self.char_set+r'\s+\(\s*(.+)\s*\)\s*$'),
+                'unkwn_drct': re.compile(r'^\s*(\[\s*'+self.char_set+r'\s*\])\s*$'),
+                'unkwn_rendr': re.compile(r'^\s*(<\s*'+self.char_set+r'\s*>)\s*$'),
+                'potnt_headr': re.compile(r'^\s*([A-Z]+\.\s+[A-Z-\s]+?)\s*$'),
+                'potnt_drct': re.compile(r'^\s*(\[\s*.+?\s*\])\s*$'),
+                'potnt_rendr': re.compile(r'^\s*(<\s*.+\s*>)\s*$'),
+                'potnt_text': re.compile(r'^\s*({.+})\s*$')}
+    
+    def compile_objects(self) -> dict[str, re.Pattern]:
+        return {'var_name': re.compile(r'^([^a-z])[AEIOU]*([^AEIOU])'),
+                'is_num': re.compile(r'^[0-9]{2}')}
     
     def init_script(self) -> None:
-        self.script_beg = re.compile(r'^\s*\/\/\/\s*SCRIPT\s+BEG\s*\\\\\\\s*$')
-        self.script_end = re.compile(r'^\s*\\\\\\\s*SCRIPT\s+END\s*\/\/\/\s*$')
-        self.empty_line = re.compile(r'^\s*$')
-        self.cmmnt_line = re.compile(r'^\s*#.+$')
+        self.init_group('script')
         
     def init_characters(self) -> None:
-        self.chrct_name = re.compile(r'^\s*\s*((?:[A-Z0-9\s_-]{2,5}\.)?\s*'+self.char_set+r')(?:\s+\(\s*(O.S.|V.O.)\s*\))?\s*$')
-        self.chrct_prnth = re.compile(r'^\s*\((\w+)\)\s*$')
+        self.init_group('characters')
     
     def init_headers(self) -> None:
-        header_start = r'INT\.|EXT\.|LOC\.|IMG\.'
-        self.scene_trans = re.compile(r'^\s*('+self.char_set+r')\s+TO:\s*$')
-        self.scene_headr = re.compile(r'^\s*('+header_start+r')\s+('+self.char_set+r')(?:\s+(-|,)\s+('+self.char_set+r'))?\s*$')
+        self.init_group('headers')
     
     def init_directions(self) -> None:
-        self.chng_drct = re.compile(r'\s*\[\s*('+self.char_set+r')\s+(?:\:|IS|GETS|GROWS|GOES|TURNS|BECOMES)\s+('+self.char_set+r')\s*\]\s*')
-        self.appr_drct = re.compile(r'\s*\[\s*(ENTER|EXIT)\s+('+self.char_set+r')\s*\]\s*')
+        self.init_group('directions')
         
     def init_render_styles(self) -> None:
-        self.rendr_style = re.compile(r'^\s*<\s*(?:(SNAP|IDLE|CMMN|COMMON)\s*)?(BUBL|AVL|NVL|BUBBLE|AVL-MODE|NVL-MODE)?(?:\s*(SNAP|IDLE|CMMN|COMMON))?\s*>\s*$')
-        # self.rendr_style = re.compile(r'^\s*<\s*('+self.char_set+r')\s*>\s*$')
-        self.reset_rendr = re.compile(r'^\s*<\s*(?:RESET)?\s*>\s*$')
+        self.init_group('render_styles')
         
     def init_text_styles(self) -> None:
-        self.text_style = re.compile(r'^\s*{\s*((?:\s*[A-Z]+(?:\s*=\s*[\w\d\.#]+?)?\s*,\s*)*?(?:\s*[A-Z]+(?:\s*=\s*[\w\d\.#]+?)?))\s*}\s*$')
-        self.reset_text = re.compile(r'^\s*{\s*(?:RESET)?\s*}\s*$')
+        self.init_group('text_styles')
         
     def init_audio(self) -> None:
-        self.sound_stmt = re.compile(r'^\s*\*\s*(?:(?:S|SOUND)\s*\:\s*)?('+self.char_set+r')\s*(!)?\s*\*\s*$')
-        self.music_stmt = re.compile(r'^\s*\*\s*(?:(?:M|MUSIC)\s*\:)\s*('+self.char_set+r')\s*\?\s*$')
-        self.voice_stmt = re.compile(r'^\s*\*\s*(?:(?:V|VOICE)\s*\:)\s*('+self.char_set+r')\s*\*\s*$')
-        self.audio_stmt = re.compile(r'^\s*\*\s*('+self.char_set+r')\s*\:\s*('+self.char_set+r')\s*\*\s*$')
+        self.init_group('audio')
     
     def init_all(self) -> None:
         self.init_script()
@@ -64,14 +144,546 @@ class Regular_Expressions:
         self.init_audio()
         
     def init_quality_assurance(self) -> None:
-        self.unknw_extn = re.compile(r'^\s*'+self.char_set+r'\s+\(\s*(.+)\s*\)\s*$')
-        self.unkwn_drct = re.compile(r'^\s*(\[\s*'+self.char_set+r'\s*\])\s*$')
-        self.unkwn_rendr = re.compile(r'^\s*(<\s*'+self.char_set+r'\s*>)\s*$')
-        
-        self.potnt_headr = re.compile(r'^\s*([A-Z]+\.\s+[A-Z-\s]+?)\s*$')
-        self.potnt_drct = re.compile(r'^\s*(\[\s*.+?\s*\])\s*$')
-        self.potnt_rendr = re.compile(r'^\s*(<\s*.+\s*>)\s*$')
-        self.potnt_text = re.compile(r'^\s*({.+})\s*$')
+        self.init_group('quality_assurance')
+
+'''
+******************************************************************
+Line_Kinds is a class that stores the kind of every line the 
+Line_Classifier can recognize. The first group are the statements 
+understood by Run_Manager, the second group are the kinds
+Script_Lexer gives plain text once it knows who is speaking, and the
+third group are only used by Quality_Assurance_Reporter to diagnose
+lines that were not recognized.
+'''
+class Line_Kinds:
+    script_beg: str = 'SCRIPT_BEG'
+    script_end: str = 'SCRIPT_END'
+    empty_line: str = 'EMPTY'
+    cmmnt_line: str = 'COMMENT'
+    scene_headr: str = 'SCENE_HEADER'
+    chrct_name: str = 'CHARACTER'
+    scene_trans: str = 'TRANSITION'
+    reset_rendr: str = 'RESET_RENDER'
+    rendr_style: str = 'RENDER_STYLE'
+    reset_text: str = 'RESET_TEXT'
+    text_style: str = 'TEXT_STYLE'
+    chng_drct: str = 'CHANGE_DIRECTION'
+    appr_drct: str = 'APPEAR_DIRECTION'
+    music_stmt: str = 'MUSIC'
+    voice_stmt: str = 'VOICE'
+    sound_stmt: str = 'SOUND'
+    audio_stmt: str = 'AUDIO'
+    chrct_prnth: str = 'PARENTHETICAL'
+    text_line: str = 'TEXT'
+    
+    dialg_line: str = 'DIALOGUE'
+    narrt_line: str = 'NARRATION'
+    
+    unknw_extn: str = 'UNKNOWN_EXTENSION'
+    unkwn_drct: str = 'UNKNOWN_DIRECTION'
+    unkwn_rendr: str = 'UNKNOWN_RENDER'
+    potnt_headr: str = 'POTENTIAL_HEADER'
+    potnt_drct: str = 'POTENTIAL_DIRECTION'
+    potnt_rendr: str = 'POTENTIAL_RENDER'
+    potnt_text: str = 'POTENTIAL_TEXT'
+
+'''
+******************************************************************
+Line_Class is the result of classifying a line: its kind from 
+Line_Kinds, and the groups captured by the pattern that recognized
+it (empty for empty lines and plain text).
+'''
+class Line_Class:
+    __slots__ = ('kind', 'groups')
+    
+    def __init__(self, kind: str, groups: tuple = ()) -> None:
+        self.kind = kind
+        self.groups = groups
+    
+    def group(self, index: int) -> str:
+        # numbered like re.Match.group, starting from 1
+        return self.groups[index-1]
+
+'''
+******************************************************************
+Line_Classifier is a class which finds the kind of a line by only 
+trying the patterns that can match it. The first non-blank 
+character of a line decides which patterns are tried, so plain
+narration and dialogue are usually recognized without a single 
+pattern being matched. Classifying a line with a custom character
+set falls back to trying every pattern in order. The classifier
+counts every kind it returns and every pattern it tries.
+'''
+class Line_Classifier:
+    caps_start: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-'
+    ws_start: str = '.('
+    # kinds a typed script format gives its lines itself
+    typed_kinds: set[str] = {Line_Kinds.scene_headr, Line_Kinds.chrct_name, Line_Kinds.scene_trans, Line_Kinds.chrct_prnth}
+    
+    def __init__(self, res: Regular_Expressions = None) -> None:
+        if res is None:
+            res = Regular_Expressions()
+        self.res = res
+        self.kind_counts: dict[str, int] = {}
+        self.attempts: int = 0
+        self.is_default = res.char_set == Regular_Expressions.default_set
+        # tables are built the first time they are needed, so a pass
+        # only compiles the pattern groups it actually uses
+        self.statements: dict[str, tuple] = None
+        self.diagnostics: dict[str, tuple] = None
+    
+    def build_statements(self) -> None:
+        res = self.res
+        statements = \
+            {'[': ((Line_Kinds.chng_drct, res.chng_drct),
+                   (Line_Kinds.appr_drct, res.appr_drct)),
+             '<': ((Line_Kinds.reset_rendr, res.reset_rendr),
+                   (Line_Kinds.rendr_style, res.rendr_style)),
+             '{': ((Line_Kinds.reset_text, res.reset_text),
+                   (Line_Kinds.text_style, res.text_style)),
+             '*': ((Line_Kinds.music_stmt, res.music_stmt),
+                   (Line_Kinds.voice_stmt, res.voice_stmt),
+                   (Line_Kinds.sound_stmt, res.sound_stmt),
+                   (Line_Kinds.audio_stmt, res.audio_stmt)),
+             '#': ((Line_Kinds.cmmnt_line, res.cmmnt_line),),
+             '(': ((Line_Kinds.chrct_prnth, res.chrct_prnth),)}
+        caps_statements = \
+            ((Line_Kinds.scene_headr, res.scene_headr),
+             (Line_Kinds.chrct_name, res.chrct_name),
+             (Line_Kinds.scene_trans, res.scene_trans))
+        # order every pass checked the patterns in before classifying
+        self.all_statements = caps_statements \
+            + statements['<'] + statements['{'] + statements['['] \
+            + statements['*'] + statements['#'] + statements['(']
+        self.kind_patterns = dict(self.all_statements)
+        self.untyped_patterns: dict[tuple, tuple] = {}
+        # a character name can take its first characters from the
+        # whitespace leading an unstripped line
+        self.ws_statements = \
+            {'.': caps_statements,
+             '(': caps_statements + statements['(']}
+        for char in self.caps_start:
+            statements[char] = caps_statements
+        self.statements = statements
+    
+    def build_diagnostics(self) -> None:
+        res = self.res
+        diagnostics = \
+            {'[': ((Line_Kinds.unkwn_drct, res.unkwn_drct),
+                   (Line_Kinds.potnt_drct, res.potnt_drct)),
+             '<': ((Line_Kinds.unkwn_rendr, res.unkwn_rendr),
+                   (Line_Kinds.potnt_rendr, res.potnt_rendr)),
+             '{': ((Line_Kinds.potnt_text, res.potnt_text),)}
+        caps_diagnostics = \
+            ((Line_Kinds.unknw_extn, res.unknw_extn),
+             (Line_Kinds.potnt_headr, res.potnt_headr))
+        self.all_diagnostics = \
+            ((Line_Kinds.unknw_extn, res.unknw_extn),
+             (Line_Kinds.unkwn_drct, res.unkwn_drct),
+             (Line_Kinds.unkwn_rendr, res.unkwn_rendr),
+             (Line_Kinds.potnt_headr, res.potnt_headr),
+             (Line_Kinds.potnt_drct, res.potnt_drct),
+             (Line_Kinds.potnt_rendr, res.potnt_rendr),
+             (Line_Kinds.potnt_text, res.potnt_text))
+        self.ws_diagnostics = caps_diagnostics[:1]
+        for char in self.caps_start:
+            diagnostics[char] = caps_diagnostics
+        self.diagnostics = diagnostics
+    
+    def count(self, kind: str) -> None:
+        self.kind_counts[kind] = self.kind_counts.get(kind, 0) + 1
+    
+    def try_patterns(self, line: str, patterns: tuple, count_miss: bool = True) -> Line_Class:
+        for kind, pattern in patterns:
+            self.attempts += 1
+            if curr_match := pattern.match(line):
+                self.count(kind)
+                return Line_Class(kind, curr_match.groups())
+        if count_miss:
+            self.count(Line_Kinds.text_line)
+        return Line_Class(Line_Kinds.text_line)
+    
+    def is_caps(self, line: str) -> bool:
+        # no pattern in caps_statements can match a lowercase letter 
+        # before the opening parenthesis of a character extension
+        head = line.partition('(')[0]
+        return head.upper() == head
+    
+    def is_whitespace_sensitive(self, line: str, clean_line: str) -> bool:
+        # True when the whitespace stripped from line could change its
+        # class: the character set also matches whitespace, so a name 
+        # or a header can be completed by the spaces around the text
+        if not clean_line:
+            return False
+        if not self.is_default:
+            return True
+        if clean_line[-1] in '.,' and line[-1:].isspace():
+            return True
+        if line[:1].isspace():
+            return '.' in clean_line[:6] or clean_line[0] == '(' or clean_line.startswith('TO:')
+        return False
+    
+    def classify(self, line: str, in_script: bool = True, typed: bool = False) -> Line_Class:
+        # A typed line comes from a script format that gives the kinds in
+        # typed_kinds itself, so it is never guessed to be one of them
+        stripped = line.lstrip()
+        first = stripped[:1]
+        if first == '/':
+            self.attempts += 1
+            if curr_match := self.res.script_beg.match(line):
+                self.count(Line_Kinds.script_beg)
+                return Line_Class(Line_Kinds.script_beg, curr_match.groups())
+        elif first == '\\':
+            self.attempts += 1
+            if curr_match := self.res.script_end.match(line):
+                self.count(Line_Kinds.script_end)
+                return Line_Class(Line_Kinds.script_end, curr_match.groups())
+        if not in_script:
+            self.count(Line_Kinds.text_line)
+            return Line_Class(Line_Kinds.text_line)
+        if not stripped:
+            self.count(Line_Kinds.empty_line)
+            return Line_Class(Line_Kinds.empty_line)
+        if self.statements is None:
+            self.build_statements()
+        if not self.is_default:
+            patterns = self.all_statements
+        else:
+            patterns = self.statements.get(first)
+            if first in self.ws_start and line[:1].isspace():
+                patterns = self.ws_statements[first]
+            if patterns is None or (first in self.caps_start and not self.is_caps(stripped)):
+                self.count(Line_Kinds.text_line)
+                return Line_Class(Line_Kinds.text_line)
+        if typed:
+            patterns = self.untyped(patterns)
+        return self.try_patterns(line, patterns)
+    
+    def untyped(self, patterns: tuple) -> tuple:
+        # patterns without those of typed_kinds, for every table once
+        untyped = self.untyped_patterns.get(patterns)
+        if untyped is None:
+            untyped = self.untyped_patterns[patterns] = tuple(pattern for pattern in patterns if pattern[0] not in self.typed_kinds)
+        return untyped
+    
+    def classify_as(self, line: str, kind: str) -> Line_Class:
+        # Only tries the pattern of kind, and returns None when it does 
+        # not match line
+        if self.statements is None:
+            self.build_statements()
+        line_class = self.try_patterns(line, ((kind, self.kind_patterns[kind]),), count_miss=False)
+        return line_class if line_class.kind == kind else None
+    
+    def diagnose(self, line: str) -> Line_Class:
+        # Only meant for lines classify found not to be a statement
+        if self.diagnostics is None:
+            self.build_diagnostics()
+        if not self.is_default:
+            return self.try_patterns(line, self.all_diagnostics, count_miss=False)
+        stripped = line.lstrip()
+        first = stripped[:1]
+        patterns = self.diagnostics.get(first)
+        if first == '(' and line[:1].isspace():
+            patterns = self.ws_diagnostics
+        if patterns is None or (first in self.caps_start and not self.is_caps(stripped)):
+            return Line_Class(Line_Kinds.text_line)
+        return self.try_patterns(line, patterns, count_miss=False)
+    
+    def print_counts(self) -> None:
+        print(' Line_Classifier Report:')
+        print('   attempts = '+str(self.attempts))
+        for kind in sorted(self.kind_counts):
+            print('   '+kind+' = '+str(self.kind_counts[kind]))
+
+'''
+******************************************************************
+Statement is a line of a script once lexed by Script_Lexer: its
+Line_Class along with the cleaned line. raw is how the unstripped
+line was classified when that could differ, and diagnosis is what
+quality assurance found in a line it does not accept, so a
+Statement can be checked, discovered and written without its line
+being parsed again.
+'''
+class Statement(Line_Class):
+    __slots__ = ('line', 'raw', 'diagnosis', 'line_num')
+    
+    def __init__(self, kind: str, groups: tuple = (), line: str = '', raw: Line_Class = None, diagnosis: Line_Class = None, line_num: int = 0) -> None:
+        self.kind = kind
+        self.groups = groups
+        self.line = line
+        self.raw = raw
+        self.diagnosis = diagnosis
+        # the line of the script file the statement was read from, 0
+        # when it was not read from a file
+        self.line_num = line_num
+    
+    def to_tuple(self) -> tuple:
+        raw = (self.raw.kind, self.raw.groups) if self.raw else None
+        diagnosis = (self.diagnosis.kind, self.diagnosis.groups) if self.diagnosis else None
+        return (self.kind, self.groups, self.line, raw, diagnosis, self.line_num)
+    
+    def from_tuple(values: tuple):
+        kind, groups, line, raw, diagnosis, line_num = values
+        return Statement(kind, groups, line,
+                         Line_Class(*raw) if raw else None,
+                         Line_Class(*diagnosis) if diagnosis else None,
+                         line_num)
+
+'''
+******************************************************************
+Script_Lexer is a class that turns the lines of a script into a
+stream of Statements, ending with the Script End Statement. Plain
+text is lexed as dialogue while a character is speaking and as
+narration otherwise, by the same rules Run_Manager writes it with.
+Lines of typed script formats are lexed as the kind they were given.
+'''
+class Script_Lexer:
+    # kinds of lines that leave wrote_empty as it was
+    keep_empty: set[str] = {Line_Kinds.chrct_name, Line_Kinds.scene_trans, Line_Kinds.reset_text, Line_Kinds.text_style}
+    # kinds of typed paragraphs that continue the speech of a character
+    speech_kinds: set[str] = {Line_Kinds.chrct_prnth, Line_Kinds.dialg_line}
+    
+    def __init__(self, lcl: Line_Classifier = None) -> None:
+        self.lcl = lcl if lcl is not None else Line_Classifier()
+        self.rh = Run_Helper()
+        # lines quality assurance does not accept are diagnosed here
+        self.checked_kinds = Quality_Assurance_Reporter.checked_kinds
+        self.in_script: bool = False
+        self.is_spkng: bool = False
+        self.wrote_empty: bool = False
+    
+    def lex_line(self, line: str, typed: bool = False) -> Statement:
+        lcl = self.lcl
+        clean_line = self.rh.clean_str(line)
+        line_class = lcl.classify(clean_line, self.in_script, typed)
+        stmt = Statement(line_class.kind, line_class.groups, clean_line)
+        raw_class = line_class
+        if lcl.is_whitespace_sensitive(line, clean_line):
+            # quality assurance and discovery read the unstripped line
+            raw_class = stmt.raw = lcl.classify(line, self.in_script, typed)
+        return self.advance(line, stmt, raw_class)
+    
+    def lex_typed(self, line: str, kind: str) -> Statement:
+        # Lexes a line a typed script format gave kind to. A line of a
+        # kind in Line_Classifier.typed_kinds is only matched against 
+        # the pattern of kind, for its groups. Any other line can be any 
+        # statement but those of typed_kinds, which is how a line of any
+        # kind that does not match its pattern is lexed
+        if kind not in Line_Classifier.typed_kinds or not self.in_script:
+            return self.lex_line(line, True)
+        clean_line = self.rh.clean_str(line)
+        line_class = self.lcl.classify_as(clean_line, kind)
+        if line_class is None:
+            return self.lex_line(line, True)
+        stmt = Statement(kind, line_class.groups, clean_line)
+        return self.advance(clean_line, stmt, stmt)
+    
+    def numbered(stmt: Statement, line_num: int) -> Statement:
+        stmt.line_num = line_num
+        return stmt
+    
+    def advance(self, line: str, stmt: Statement, raw_class: Line_Class) -> Statement:
+        # Diagnoses stmt and moves the lexer past it
+        lcl = self.lcl
+        kind = stmt.kind
+        if kind == Line_Kinds.script_beg:
+            self.in_script = True
+        elif self.in_script and kind != Line_Kinds.script_end:
+            if raw_class.kind not in self.checked_kinds:
+                stmt.diagnosis = lcl.diagnose(line)
+            if kind == Line_Kinds.empty_line:
+                if not self.wrote_empty:
+                    self.is_spkng = False
+                    self.wrote_empty = True
+            elif kind == Line_Kinds.chrct_name:
+                self.is_spkng = True
+            elif kind not in self.keep_empty:
+                if kind == Line_Kinds.text_line:
+                    stmt.kind = Line_Kinds.dialg_line if self.is_spkng else Line_Kinds.narrt_line
+                self.wrote_empty = False
+        return stmt
+    
+    def lex(self, lines: Iterable[str]) -> Iterator[Statement]:
+        for line_num, line in enumerate(lines, 1):
+            stmt = self.lex_line(line)
+            stmt.line_num = line_num
+            yield stmt
+            if stmt.kind == Line_Kinds.script_end: break
+    
+    def lex_typed_lines(self, lines: Iterable[tuple]) -> Iterator[Statement]:
+        # Lexes the (kind, line, line_num) lines of a typed script format
+        # that is laid out as a plain text script, kind being None for a
+        # line that has no type and line_num the line of the file it was
+        # read from. Unlike lex_paragraphs, no empty line is added
+        for kind, line, line_num in lines:
+            stmt = self.lex_line(line) if kind is None else self.lex_typed(line, kind)
+            stmt.line_num = line_num
+            yield stmt
+            if stmt.kind == Line_Kinds.script_end: break
+    
+    def lex_paragraphs(self, paragraphs: Iterable[tuple]) -> Iterator[Statement]:
+        # Lexes the (kind, text, line_num) paragraphs of a typed script 
+        # format, kind being None for a paragraph that has no type and is
+        # lexed as a plain line, and line_num the line it was read from.
+        # Typed paragraphs are laid out as in a plain text script: an 
+        # empty line comes before each one that does not continue the 
+        # speech of a character, and after the last one. An empty line
+        # added is given the line of the paragraph after it
+        prev_kind: str = None
+        is_blank: bool = True
+        for kind, text, line_num in paragraphs:
+            if not text.strip():
+                if kind is None or not is_blank:
+                    yield Script_Lexer.numbered(self.lex_line(''), line_num)
+                prev_kind = None
+                is_blank = True
+                continue
+            in_speech = prev_kind == Line_Kinds.chrct_name or prev_kind in self.speech_kinds
+            if not is_blank and (kind is not None or prev_kind is not None) and not (in_speech and kind in self.speech_kinds):
+                yield Script_Lexer.numbered(self.lex_line(''), line_num)
+            if kind == Line_Kinds.chrct_prnth and not text.lstrip().startswith('('):
+                text = '('+text.strip()+')'
+            stmt = self.lex_line(text) if kind is None else self.lex_typed(text, kind)
+            stmt.line_num = line_num
+            yield stmt
+            if stmt.kind == Line_Kinds.script_end: break
+            prev_kind = kind
+            is_blank = False
+
+'''
+******************************************************************
+Mapped_Script is a class that reads the lines of a script through a
+memory map of its file. Line boundaries are found on the bytes of
+the map, and the script is decoded a block of whole lines at a time,
+so however large the script is only one block is ever held as text,
+and the pages already read can be dropped by the operating system.
+A UTF-8 byte order mark at the start of the file is skipped, and
+'\r\n' and '\r' line endings read as '\n', as they do in a file 
+opened as text.
+'''
+class Mapped_Script:
+    def __init__(self, read_path: str, block_size: int = 1 << 18) -> None:
+        self.read_path = read_path
+        self.block_size = block_size
+    
+    def blocks(self, script_map: mmap.mmap) -> Iterator[str]:
+        # Every block ends at a line boundary, so no character or line
+        # ending is ever split between two blocks
+        start = last_start = 0
+        size = len(script_map)
+        if script_map[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+            start = len(codecs.BOM_UTF8)
+        while start < size:
+            end = size
+            if start+self.block_size < size:
+                end = script_map.rfind(b'\n', start, start+self.block_size)+1
+                if end <= start:
+                    # a single line longer than a block
+                    end = script_map.find(b'\n', start+self.block_size)+1 or size
+            block = script_map[start:end].decode('utf-8')
+            if '\r' in block:
+                block = block.replace('\r\n', '\n').replace('\r', '\n')
+            # the block before is dropped again, as reading a page can 
+            # map the pages around it back in
+            self.release(script_map, last_start, end)
+            yield block
+            last_start, start = start, end
+    
+    def release(self, script_map: mmap.mmap, start: int, end: int) -> None:
+        # Drops the pages of decoded blocks from memory where the 
+        # platform allows it, so they are not kept until the map closes
+        if hasattr(mmap, 'MADV_DONTNEED'):
+            start -= start % mmap.PAGESIZE
+            script_map.madvise(mmap.MADV_DONTNEED, start, end-start)
+    
+    def __iter__(self) -> Iterator[str]:
+        with open(self.read_path, 'rb') as read_file:
+            try:
+                # empty files and pipes cannot be mapped, so are read as
+                # text the way a mapped script would be
+                if os.fstat(read_file.fileno()).st_size == 0:
+                    yield from io.TextIOWrapper(read_file, encoding='utf-8-sig')
+                    return
+                with mmap.mmap(read_file.fileno(), 0, access=mmap.ACCESS_READ) as script_map:
+                    for block in self.blocks(script_map):
+                        yield from io.StringIO(block, newline='\n')
+            finally:
+                read_file.close()
+
+'''
+******************************************************************
+Statement_Cache is a class that keeps the Statements lexed from a
+script in a binary file next to it. The file starts with a hash of
+the script and of the compiler that lexed it, and is only read back
+while neither has changed, so an unchanged script is compiled again
+without a single line of its text being parsed. Statements are
+stored as blocks of plain tuples with marshal.
+'''
+class Statement_Cache:
+    file_extension: str = '.t2c'
+    file_format: int = 2
+    block_size: int = 4096
+    
+    def __init__(self, read_path: str) -> None:
+        self.read_path = read_path
+        self.cache_path = read_path+self.file_extension
+        self.header = (self.file_format, marshal.version, Statement_Cache.hash_file(__file__), Statement_Cache.hash_file(read_path))
+    
+    def hash_file(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as read_file:
+            try:
+                for block in iter(lambda: read_file.read(1 << 20), b''):
+                    digest.update(block)
+            finally:
+                read_file.close()
+        return digest.hexdigest()
+    
+    def is_fresh(self) -> bool:
+        try:
+            with open(self.cache_path, 'rb') as cache_file:
+                try:
+                    return marshal.load(cache_file) == self.header
+                finally:
+                    cache_file.close()
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+    
+    def write(self, statements: Iterable[Statement]) -> None:
+        temp_path = self.cache_path+'.tmp'
+        with open(temp_path, 'wb') as cache_file:
+            try:
+                marshal.dump(self.header, cache_file)
+                block = []
+                for stmt in statements:
+                    block.append(stmt.to_tuple())
+                    if len(block) == self.block_size:
+                        marshal.dump(tuple(block), cache_file)
+                        block = []
+                marshal.dump(tuple(block), cache_file)
+            finally:
+                cache_file.close()
+        os.replace(temp_path, self.cache_path)
+    
+    def read(self) -> Iterator[Statement]:
+        with open(self.cache_path, 'rb') as cache_file:
+            try:
+                marshal.load(cache_file)
+                while True:
+                    try:
+                        block = marshal.load(cache_file)
+                    except EOFError:
+                        break
+                    for values in block:
+                        yield Statement.from_tuple(values)
+            finally:
+                cache_file.close()
+    
+    def statements(self, lexer: Script_Lexer) -> Iterator[Statement]:
+        # Lexes the script into the cache first when it is out of date
+        if not self.is_fresh():
+            self.write(lexer.lex(Mapped_Script(self.read_path)))
+        return self.read()
 
 '''
 ******************************************************************
@@ -158,12 +770,15 @@ class Scene_Handler:
 ******************************************************************
 Tag_Attributes is a class which automatically generates the start 
 and end formats for a Ren'Py text tag. If the tag originally has 
-no value, the value can be generated later using the create_value 
-method.
+no value, the start of the tag with a value is made by the 
+create_value method, which leaves the tag as it is, so a tag can be
+shared by every Text_Style_Handler.
 '''
 class Tag_Attributes:
-    def create_value(self, value: str) -> None:
-        self.tag_start = self.tag_start+value+'}'
+    __slots__ = ('tag_start', 'tag_end', 'needs_value', 'no_value')
+    
+    def create_value(self, value: str) -> str:
+        return self.tag_start+value+'}'
     
     def __init__(self, tag: str, needs_value: bool = False, value: str = None, self_closing: bool = False) -> None:
         self.tag_start = '{'+tag
@@ -195,9 +810,94 @@ are applied to the text which can be found at:
 https://www.renpy.org/doc/html/text.html#styling-and-text-tags
 This class also adds the ability to alter the case of text, and
 the user can control how many lines of text are styled by using
-the condition keywords found in conds_dict.
+the condition keywords found in conds_dict. A style statement is 
+compiled once into what it adds to the tags and what it sets, which
+is kept for the most recently used statements, so a repeated
+statement is a single lookup.
 '''
 class Text_Style_Handler:
+    # the tables are shared by every handler, and are never changed
+    cases_dict: dict[str, str] = \
+        {'UP': TS_Keywords.upper_case,
+         'LOW': TS_Keywords.lower_case,
+         TS_Keywords.upper_case: TS_Keywords.upper_case,
+         TS_Keywords.lower_case: TS_Keywords.lower_case,
+         TS_Keywords.random_case: TS_Keywords.random_case,
+         TS_Keywords.swap_case: TS_Keywords.swap_case,
+         'UPPERCASE': TS_Keywords.upper_case,
+         'LOWERCASE': TS_Keywords.lower_case,
+         'RANDOMCASE': TS_Keywords.random_case,
+         'SWAPCASE': TS_Keywords.swap_case}
+    conds_dict: dict[str, str] = \
+        {# Condition flags
+         'SPEAK': 'SPEAK',
+         'NARRATE': 'NARRATE',
+         'WHILESPEAKING': 'SPEAK',
+         'WHILENARRATING': 'NARRATE',
+         # Line counts
+         TS_Keywords.count_cond: TS_Keywords.count_cond,
+         'LINECOUNT':TS_Keywords.count_cond,
+         'INF': 'INF',
+         'INFINITY': 'INF',
+         'FOREVER': 'INF'}
+    tags_dict: dict[str, Tag_Attributes] = \
+        {# Predefined text tags
+         '': Tag_Attributes('', True, self_closing=True), # Style Text Tags
+         'A': Tag_Attributes('a', True),
+         'ANCHOR': Tag_Attributes('a', True),
+         'ALPHA': Tag_Attributes('alpha', True),
+         'ALT': Tag_Attributes('alt'),
+         'B': Tag_Attributes('b'),
+         'BOLD': Tag_Attributes('b'),
+         'COLOR': Tag_Attributes('color', True),
+         'CPS': Tag_Attributes('cps', True),
+         'FONT': Tag_Attributes('font', True),
+         'I': Tag_Attributes('i'),
+         'ITALICS': Tag_Attributes('i'),
+         'K': Tag_Attributes('k', True),
+         'KERNING': Tag_Attributes('k', True),
+         'NOALT': Tag_Attributes('noalt'),
+         'OUTLINECOLOR': Tag_Attributes('outlinecolor', True),
+         'PLAIN': Tag_Attributes('plain'),
+         'S': Tag_Attributes('s'),
+         'STRIKETHROUGH': Tag_Attributes('s'),
+         'SIZE': Tag_Attributes('size', True),
+         'U': Tag_Attributes('u'),
+         'UNDERLINED': Tag_Attributes('u'),
+         # Pre-defined alpha tags
+         'TRANSLUCENT': Tag_Attributes('alpha', True, '*0.75'),
+         'TRANSPARENT': Tag_Attributes('alpha', True, '*0.5'),
+         'LIMPID': Tag_Attributes('alpha', True, '*0.1'),
+         # Pre-defined cps tags
+         'QUICK': Tag_Attributes('cps', True, '*4'),
+         'SWIFT': Tag_Attributes('cps', True, '*2'),
+         'STEADY': Tag_Attributes('cps', True, '*0.5'),
+         'SLOW': Tag_Attributes('cps', True, '*0.25'),
+         'CRAWL': Tag_Attributes('cps', True, '*0.1'),
+         # Pre-defined size tags
+         'HUGE': Tag_Attributes('size', True, '*4'),
+         'BIG': Tag_Attributes('size', True, '*2'),
+         'SMALL': Tag_Attributes('size', True, '*0.5'),
+         'TINY': Tag_Attributes('size', True, '*0.25'),
+         # Pre-defined color tags
+         'WHITE': Tag_Attributes('color', True, '#FFFFFF'),
+         'BLACK': Tag_Attributes('color', True, '#000000'),
+         'GREY': Tag_Attributes('color', True, '#888888'),
+         'RED': Tag_Attributes('color', True, '#FF0000'),
+         'ORANGE': Tag_Attributes('color', True, '#FF7700'),
+         'YELLOW': Tag_Attributes('color', True, '#FFFF00'),
+         'LIME': Tag_Attributes('color', True, '#77FF00'),
+         'GREEN': Tag_Attributes('color', True, '#00FF00'),
+         'TURQUOISE': Tag_Attributes('color', True, '#00FF77'),
+         'CYAN': Tag_Attributes('color', True, '#00FFFF'),
+         'AZURE': Tag_Attributes('color', True, '#0077FF'),
+         'BLUE': Tag_Attributes('color', True, '#0000FF'),
+         'VIOLET': Tag_Attributes('color', True, '#7700FF'),
+         'MAGENTA': Tag_Attributes('color', True, '#FF00FF'),
+         'ROSE': Tag_Attributes('color', True, '#FF0077')}
+    # how many style statements stay compiled
+    cache_size: int = 256
+    
     def __init__(self) -> None:
         self.is_active: bool = False
         self.curr_case: str = None
@@ -205,84 +905,6 @@ class Text_Style_Handler:
         self.line_count: int = 1
         self.tag_prefix: str = ''
         self.tag_suffix: str = ''
-        self.cases_dict = \
-            {'UP': TS_Keywords.upper_case,
-             'LOW': TS_Keywords.lower_case,
-             TS_Keywords.upper_case: TS_Keywords.upper_case,
-             TS_Keywords.lower_case: TS_Keywords.lower_case,
-             TS_Keywords.random_case: TS_Keywords.random_case,
-             TS_Keywords.swap_case: TS_Keywords.swap_case,
-             'UPPERCASE': TS_Keywords.upper_case,
-             'LOWERCASE': TS_Keywords.lower_case,
-             'RANDOMCASE': TS_Keywords.random_case,
-             'SWAPCASE': TS_Keywords.swap_case}
-        self.conds_dict = \
-            {# Condition flags
-             'SPEAK': 'SPEAK',
-             'NARRATE': 'NARRATE',
-             'WHILESPEAKING': 'SPEAK',
-             'WHILENARRATING': 'NARRATE',
-             # Line counts
-             TS_Keywords.count_cond: TS_Keywords.count_cond,
-             'LINECOUNT':TS_Keywords.count_cond,
-             'INF': 'INF',
-             'INFINITY': 'INF',
-             'FOREVER': 'INF'}
-        self.tags_dict = \
-            {# Predefined text tags
-             '': Tag_Attributes('', True, self_closing=True), # Style Text Tags
-             'A': Tag_Attributes('a', True),
-             'ANCHOR': Tag_Attributes('a', True),
-             'ALPHA': Tag_Attributes('alpha', True),
-             'ALT': Tag_Attributes('alt'),
-             'B': Tag_Attributes('b'),
-             'BOLD': Tag_Attributes('b'),
-             'COLOR': Tag_Attributes('color', True),
-             'CPS': Tag_Attributes('cps', True),
-             'FONT': Tag_Attributes('font', True),
-             'I': Tag_Attributes('i'),
-             'ITALICS': Tag_Attributes('i'),
-             'K': Tag_Attributes('k', True),
-             'KERNING': Tag_Attributes('k', True),
-             'NOALT': Tag_Attributes('noalt'),
-             'OUTLINECOLOR': Tag_Attributes('outlinecolor', True),
-             'PLAIN': Tag_Attributes('plain'),
-             'S': Tag_Attributes('s'),
-             'STRIKETHROUGH': Tag_Attributes('s'),
-             'SIZE': Tag_Attributes('size', True),
-             'U': Tag_Attributes('u'),
-             'UNDERLINED': Tag_Attributes('u'),
-             # Pre-defined alpha tags
-             'TRANSLUCENT': Tag_Attributes('alpha', True, '*0.75'),
-             'TRANSPARENT': Tag_Attributes('alpha', True, '*0.5'),
-             'LIMPID': Tag_Attributes('alpha', True, '*0.1'),
-             # Pre-defined cps tags
-             'QUICK': Tag_Attributes('cps', True, '*4'),
-             'SWIFT': Tag_Attributes('cps', True, '*2'),
-             'STEADY': Tag_Attributes('cps', True, '*0.5'),
-             'SLOW': Tag_Attributes('cps', True, '*0.25'),
-             'CRAWL': Tag_Attributes('cps', True, '*0.1'),
-             # Pre-defined size tags
-             'HUGE': Tag_Attributes('size', True, '*4'),
-             'BIG': Tag_Attributes('size', True, '*2'),
-             'SMALL': Tag_Attributes('size', True, '*0.5'),
-             'TINY': Tag_Attributes('size', True, '*0.25'),
-             # Pre-defined color tags
-             'WHITE': Tag_Attributes('color', True, '#FFFFFF'),
-             'BLACK': Tag_Attributes('color', True, '#000000'),
-             'GREY': Tag_Attributes('color', True, '#888888'),
-             'RED': Tag_Attributes('color', True, '#FF0000'),
-             'ORANGE': Tag_Attributes('color', True, '#FF7700'),
-             'YELLOW': Tag_Attributes('color', True, '#FFFF00'),
-             'LIME': Tag_Attributes('color', True, '#77FF00'),
-             'GREEN': Tag_Attributes('color', True, '#00FF00'),
-             'TURQUOISE': Tag_Attributes('color', True, '#00FF77'),
-             'CYAN': Tag_Attributes('color', True, '#00FFFF'),
-             'AZURE': Tag_Attributes('color', True, '#0077FF'),
-             'BLUE': Tag_Attributes('color', True, '#0000FF'),
-             'VIOLET': Tag_Attributes('color', True, '#7700FF'),
-             'MAGENTA': Tag_Attributes('color', True, '#FF00FF'),
-             'ROSE': Tag_Attributes('color', True, '#FF0077')}
         
     def reset_all(self) -> None:
         self.is_active: bool = False
@@ -345,44 +967,65 @@ class Text_Style_Handler:
         if tag in self.tags_dict: return self.tags_dict[tag]
         else: return None
         
-    def set_attributes(self, attributes: list[str]) -> None:
+    @staticmethod
+    @functools.lru_cache(maxsize=cache_size)
+    def compile_styles(styles: str) -> tuple:
+        # Returns the text a style statement without its spaces adds to
+        # the tag prefix and suffix, and the case, condition and line
+        # count it sets, each None when it is left as it was
+        tsh = Text_Style_Handler
+        tag_prefix: str = ''
+        tag_suffix: str = ''
+        curr_case: str = None
+        curr_cond: str = None
+        line_count: int = None
         attr_name: str = ''
         attr_value: str = ''
-        for attr in attributes:
+        for attr in styles.split(','):
             if attr.find('=') != -1:
                 attr_split = attr.split('=', 1)
                 attr_name = attr_split[0]
                 attr_value = attr_split[1].lower()
             else:
                 attr_name = attr
-            if curr_cond := self.is_cond(attr_name):
-                self.curr_cond = curr_cond
+            if attr_name in tsh.conds_dict:
+                curr_cond = tsh.conds_dict[attr_name]
                 if curr_cond == TS_Keywords.count_cond and attr_value != '':
-                    self.line_count = int(attr_value) if int(attr_value) > 0 else 1
+                    line_count = int(attr_value) if int(attr_value) > 0 else 1
                 else:
-                    self.line_count = -1
-            elif curr_case := self.is_case(attr_name):
-                self.curr_case = curr_case
-            elif curr_tag := self.is_tag(attr_name):
+                    line_count = -1
+            elif attr_name in tsh.cases_dict:
+                curr_case = tsh.cases_dict[attr_name]
+            elif attr_name in tsh.tags_dict:
+                curr_tag = tsh.tags_dict[attr_name]
                 if curr_tag.no_value and curr_tag.needs_value:
-                    curr_tag.create_value(attr_value)
-                self.tag_prefix = self.tag_prefix + curr_tag.tag_start
+                    tag_prefix = tag_prefix + curr_tag.create_value(attr_value)
+                else:
+                    tag_prefix = tag_prefix + curr_tag.tag_start
                 if curr_tag.tag_end:
-                    self.tag_suffix = self.tag_suffix + curr_tag.tag_end
+                    tag_suffix = tag_suffix + curr_tag.tag_end
             else:
                 new_tag = Tag_Attributes(attr_name.lower(), True if attr_value != '' else False, attr_value)
-                self.tag_prefix = self.tag_prefix + new_tag.tag_start
-                self.tag_suffix = self.tag_suffix + new_tag.tag_end
-    
-    def split_styles(self, styles) -> list[str]:
-        style_list = styles.split(',')
-        for i in range(0,len(style_list)):
-            style_list[i] = style_list[i].replace(' ', '')
-        return style_list
-            
+                tag_prefix = tag_prefix + new_tag.tag_start
+                tag_suffix = tag_suffix + new_tag.tag_end
+        return tag_prefix, tag_suffix, curr_case, curr_cond, line_count
+    
+    def set_styles(self, styles: tuple) -> None:
+        tag_prefix, tag_suffix, curr_case, curr_cond, line_count = styles
+        self.tag_prefix = self.tag_prefix + tag_prefix
+        self.tag_suffix = self.tag_suffix + tag_suffix
+        if curr_case is not None:
+            self.curr_case = curr_case
+        if curr_cond is not None:
+            self.curr_cond = curr_cond
+            self.line_count = line_count
+    
+    def set_attributes(self, attributes: list[str]) -> None:
+        self.set_styles(Text_Style_Handler.compile_styles(','.join(attributes)))
+    
     def get_text_styles(self, stmt: str) -> None:
-        style_list = self.split_styles(stmt)
-        self.set_attributes(style_list)
+        # Statements that only differ in their spaces are the same
+        self.set_styles(Text_Style_Handler.compile_styles(stmt.replace(' ', '')))
 
 '''
 ******************************************************************
@@ -433,6 +1076,13 @@ class Render_Style_Handler:
             is_nvl = True
         return is_bubl, is_nvl
     
+    def get_speech_style(self) -> str:
+        if self.in_bubl:
+            return 'BUBBLE'
+        elif self.in_nvl:
+            return 'NVL'
+        return 'AVL'
+    
     def redefine_narrator(self, kind: str = '') -> str:
         narrator_obj = '$ narrator = Character(name=None'
         if kind == 'BUBBLE':
@@ -446,6 +1096,53 @@ class Render_Style_Handler:
         image_name = 'img '+label+'_num'+str(image_num)
         return image_name
 
+'''
+******************************************************************
+Registry is an insertion ordered set, used wherever names have to 
+be kept in the order they were first found. Checking if a name is
+registered takes the same time however many names there are.
+'''
+class Registry(dict):
+    def __init__(self, items: Iterable = ()) -> None:
+        super().__init__(dict.fromkeys(items))
+    
+    def add(self, item) -> bool:
+        # Returns False if item was already registered
+        if item in self:
+            return False
+        self[item] = None
+        return True
+
+'''
+******************************************************************
+Name_Allocator is a class that hands out unique names. A name that
+is already taken gets the lowest number suffix that is not, and
+the next suffix to try is kept for every name so taken suffixes
+are never checked again.
+'''
+class Name_Allocator:
+    def __init__(self) -> None:
+        self.used: set[str] = set()
+        self.next_suffix: dict[str, int] = {}
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.used
+    
+    def reserve(self, names: Iterable[str]) -> None:
+        # Takes names without handing them out
+        self.used.update(names)
+    
+    def allocate(self, name: str) -> str:
+        if name not in self.used:
+            self.used.add(name)
+            return name
+        num_suffix = self.next_suffix.get(name, 1)
+        while name+str(num_suffix) in self.used:
+            num_suffix += 1
+        self.next_suffix[name] = num_suffix+1
+        self.used.add(name+str(num_suffix))
+        return name+str(num_suffix)
+
 '''
 ******************************************************************
 Character_Attributes is a class which stores information about
@@ -454,11 +1151,64 @@ for Character_Object_Handler, but it is also used to write the
 resulting report file created by Run_Reporter.
 '''
 class Character_Attributes:
+    __slots__ = ('is_onscreen', 'last_prnth', 'lines_spoken', 'sprites_used')
+    
     def __init__(self) -> None:
         self.is_onscreen: bool = False
         self.last_prnth: str = ''
         self.lines_spoken: int = 0
-        self.sprites_used: list[str] = []
+        self.sprites_used = Registry()
+
+'''
+******************************************************************
+Character_Table is a dict of Character_Attributes keyed by the name
+of a character and the speech style ('AVL', 'BUBBLE' or 'NVL') they
+were written in. The attributes of a character are created the 
+first time they are looked up, as the single pass compiler can 
+write a character before the line that discovers them has been 
+read. The table also keeps every speech style of each character, 
+and which characters are on screen so only they are reset.
+'''
+class Character_Table(dict):
+    def __init__(self) -> None:
+        super().__init__()
+        self.by_name: dict[str, dict[str, Character_Attributes]] = {}
+        self.onscreen: set[tuple[str, str]] = set()
+    
+    def __missing__(self, key: tuple[str, str]) -> Character_Attributes:
+        chrctr_attr = self[key] = Character_Attributes()
+        self.by_name.setdefault(key[0], {})[key[1]] = chrctr_attr
+        return chrctr_attr
+    
+    def set_onscreen(self, key: tuple[str, str], is_onscreen: bool) -> Character_Attributes:
+        chrctr_attr = self[key]
+        chrctr_attr.is_onscreen = is_onscreen
+        if is_onscreen:
+            self.onscreen.add(key)
+        else:
+            self.onscreen.discard(key)
+        return chrctr_attr
+    
+    def reset_onscreen(self) -> None:
+        for key in self.onscreen:
+            self[key].is_onscreen = False
+        self.onscreen.clear()
+    
+    def get_styles(self, chrctr: str) -> dict[str, Character_Attributes]:
+        return self.by_name.get(chrctr, {})
+    
+    def count_lines(self, chrctr: str) -> int:
+        # Every line a character spoke, in any speech style
+        return sum(chrctr_attr.lines_spoken for chrctr_attr in self.get_styles(chrctr).values())
+    
+    def discard(self, key: tuple[str, str]) -> None:
+        # Forgets a character, as if they were never looked up
+        if self.pop(key, None) is not None:
+            styles = self.by_name[key[0]]
+            del styles[key[1]]
+            if not styles:
+                del self.by_name[key[0]]
+            self.onscreen.discard(key)
   
 '''
 ******************************************************************
@@ -476,33 +1226,25 @@ class Character_Object_Handler:
     # ALL Character names are ALL CAPS, no punctuation, and no 
     # special characters. UNLESS there is a (V.O.) or (O.S.) at the end
 
+    def obj_name_helper(self, chrct_name: str, char_obj_names: dict, used_obj_names: Name_Allocator, prefix = '') -> str:
+        var_name = self.lcl.res.var_name
+        is_num = self.lcl.res.is_num
+        obj_name: str = ''
+        if char_match := var_name.match(chrct_name):
+            obj_name = (prefix+char_match.group(1)+char_match.group(2)).lower()
+        else:
+            obj_name = (prefix+chrct_name[0]+chrct_name[0]).lower()
+        if char_match := is_num.match(obj_name):
+            obj_name = 'c'+obj_name
+        char_obj_names[chrct_name] = used_obj_names.allocate(obj_name)
+        return char_obj_names[chrct_name]
+    
     def obj_names_helper(self, chrct_names: list[str], prefix = '') -> dict:
-        var_name = re.compile(r'^([^a-z])[AEIOU]*([^AEIOU])')
-        is_num = re.compile(r'^[0-9]{2}')
         char_obj_names = {} # final character object names
-        used_obj_names = [] # list to keep track what's been added
-                            # to char_obj_names
-        
+        used_obj_names = Name_Allocator() # keeps track what's been added
+                                          # to char_obj_names
         for char in chrct_names:
-            obj_name: str = ''
-            if char_match := var_name.match(char):
-                obj_name = (prefix+char_match.group(1)+char_match.group(2)).lower()
-            else:
-                obj_name = (prefix+char[0]+char[0]).lower()
-            if char_match := is_num.match(obj_name):
-                obj_name = 'c'+obj_name
-            if obj_name in used_obj_names:
-                num_suffix = 0
-                while obj_name in used_obj_names:
-                    num_suffix += 1
-                    if obj_name + str(num_suffix) not in used_obj_names:
-                        used_obj_names.append(obj_name+str(num_suffix))
-                        char_obj_names[char] = obj_name+str(num_suffix)
-                        break
-            else:
-                used_obj_names.append(obj_name)
-                char_obj_names[char] = obj_name
-        
+            self.obj_name_helper(char, char_obj_names, used_obj_names, prefix)
         return char_obj_names
     
     def create_chrct_obj_names(self) -> None:
@@ -519,28 +1261,23 @@ class Character_Object_Handler:
         char_obj = char_obj + ')\n'
         return char_obj
     
-    def chrct_overseers_helper(self, chrctr_names: list[str]) -> dict[Character_Attributes]:
-        overseer_dict = {}
-        for chrctr in chrctr_names:
-            overseer_dict[chrctr] = Character_Attributes()
-        return overseer_dict
-    
     def create_chrct_overseers(self) -> None:
-        self.avl_ovrs = self.chrct_overseers_helper(self.avl_chrctrs)
-        self.bubl_ovrs = self.chrct_overseers_helper(self.bubl_chrctrs)
-        self.nvl_ovrs = self.chrct_overseers_helper(self.nvl_chrctrs)
+        for kind, chrctrs in self.speech_chrctrs():
+            for chrctr in chrctrs:
+                self.chrctr_table[(chrctr, kind)]
         
     def create_all(self):
         self.create_chrct_obj_names()
         self.create_chrct_overseers()
         
+    def speech_chrctrs(self) -> tuple:
+        return (('AVL', self.avl_chrctrs), ('BUBBLE', self.bubl_chrctrs), ('NVL', self.nvl_chrctrs))
+    
+    def speech_objs(self) -> tuple:
+        return (('AVL', self.avl_objs), ('BUBBLE', self.bubl_objs), ('NVL', self.nvl_objs))
+    
     def reset_onscreen(self) -> None:
-        for chrctr in self.bubl_chrctrs:
-            self.bubl_ovrs[chrctr].is_onscreen = False
-        for chrctr in self.nvl_chrctrs:
-            self.nvl_ovrs[chrctr].is_onscreen = False
-        for chrctr in self.avl_chrctrs:
-            self.avl_ovrs[chrctr].is_onscreen = False
+        self.chrctr_table.reset_onscreen()
         
     def format_show_chrctr(self, curr_chrct: str, curr_prnth: str = '') -> str:
         show_str: str = 'show '+curr_chrct.lower()
@@ -551,36 +1288,18 @@ class Character_Object_Handler:
     def format_hide_chrctr(self, curr_chrct: str) -> str:
         return 'hide '+curr_chrct.lower()
     
-    def set_ovrs(self, curr_chrct: str, is_onscreen: bool, curr_prnth: str = '', kind: str = 'AVL') -> None:
-        if kind == 'BUBBLE':
-            self.bubl_ovrs[curr_chrct].is_onscreen = is_onscreen
-            if curr_prnth:
-                self.bubl_ovrs[curr_chrct].last_prnth = curr_prnth
-        elif kind == 'NVL':
-            self.nvl_ovrs[curr_chrct].is_onscreen = is_onscreen
-            if curr_prnth:
-                self.nvl_ovrs[curr_chrct].last_prnth = curr_prnth
-        else:
-            self.avl_ovrs[curr_chrct].is_onscreen = is_onscreen
-            if curr_prnth:
-                self.avl_ovrs[curr_chrct].last_prnth = curr_prnth
+    def set_ovrs(self, curr_chrct: str, is_onscreen: bool, curr_prnth: str = '', kind: str = 'AVL') -> Character_Attributes:
+        chrctr_attr = self.chrctr_table.set_onscreen((curr_chrct, kind), is_onscreen)
+        if curr_prnth:
+            chrctr_attr.last_prnth = curr_prnth
+        return chrctr_attr
     
     def is_necessary_prnth(self, curr_chrct: str, curr_prnth: str = '', kind : str = 'AVL') -> bool:
-        if kind == 'BUBBLE':
-            if self.bubl_ovrs[curr_chrct].last_prnth != curr_prnth and curr_prnth:
-                return True
-            elif self.bubl_ovrs[curr_chrct].last_prnth and not curr_prnth:
-                return True
-        elif kind == 'NVL':
-            if self.nvl_ovrs[curr_chrct].last_prnth != curr_prnth and curr_prnth:
-                return True
-            elif self.nvl_ovrs[curr_chrct].last_prnth and not curr_prnth:
-                return True
-        else:
-            if self.avl_ovrs[curr_chrct].last_prnth != curr_prnth and curr_prnth:
-                return True
-            elif self.avl_ovrs[curr_chrct].last_prnth and not curr_prnth:
-                return True
+        last_prnth = self.chrctr_table[(curr_chrct, kind)].last_prnth
+        if last_prnth != curr_prnth and curr_prnth:
+            return True
+        elif last_prnth and not curr_prnth:
+            return True
         return False
     
     def format_chrctr_dialg(self, dialogue: str, chrctr_name: str = '', chrctr_objs: dict = {}) -> str:
@@ -593,136 +1312,84 @@ class Character_Object_Handler:
     
     def collect_characters(self) -> None:
         self.all_chrctr: dict[Character_Attributes] = {}
-        for chrctr in self.avl_chrctrs:
-            if chrctr not in self.all_chrctr:
-                self.all_chrctr[chrctr] = self.avl_ovrs[chrctr]
-            else:
-                self.all_chrctr[chrctr].lines_spoken += self.avl_ovrs[chrctr].lines_spoken
-                for sprite in self.avl_ovrs[chrctr].sprites_used:
-                    if sprite not in self.all_chrctr[chrctr].sprites_used:
-                        self.all_chrctr[chrctr].sprites_used.append(sprite)
-            if chrctr in self.bubl_ovrs:
+        for kind, chrctrs in self.speech_chrctrs():
+            for chrctr in chrctrs:
                 if chrctr not in self.all_chrctr:
-                    self.all_chrctr[chrctr] = self.bubl_ovrs[chrctr]
-                else:
-                    self.all_chrctr[chrctr].lines_spoken += self.bubl_ovrs[chrctr].lines_spoken
-                    for sprite in self.bubl_ovrs[chrctr].sprites_used:
-                        if sprite not in self.all_chrctr[chrctr].sprites_used:
-                            self.all_chrctr[chrctr].sprites_used.append(sprite)
-            if chrctr in self.nvl_ovrs:
-                if chrctr not in self.all_chrctr:
-                    self.all_chrctr[chrctr] = self.nvl_ovrs[chrctr]
-                else:
-                    self.all_chrctr[chrctr].lines_spoken += self.nvl_ovrs[chrctr].lines_spoken
-                    for sprite in self.nvl_ovrs[chrctr].sprites_used:
-                        if sprite not in self.all_chrctr[chrctr].sprites_used:
-                            self.all_chrctr[chrctr].sprites_used.append(sprite)
-        for chrctr in self.bubl_chrctrs:
-            if chrctr not in self.all_chrctr:
-                self.all_chrctr[chrctr] = self.bubl_ovrs[chrctr]
+                    self.all_chrctr[chrctr] = self.merge_chrctr(chrctr)
+    
+    def merge_chrctr(self, chrctr: str) -> Character_Attributes:
+        # A character written in a single speech style keeps their own
+        # attributes. Otherwise every line they spoke in any style is
+        # counted once, and their sprites are those of every style in 
+        # the order the character was discovered in them
+        discovered = [kind for kind, chrctrs in self.speech_chrctrs() if chrctr in chrctrs]
+        chrctr_attr = self.chrctr_table[(chrctr, discovered[0])]
+        styles = self.chrctr_table.get_styles(chrctr)
+        if len(styles) == 1:
+            return chrctr_attr
+        merged_attr = Character_Attributes()
+        merged_attr.lines_spoken = self.chrctr_table.count_lines(chrctr)
+        for kind in discovered:
+            if kind in styles:
+                for sprite in styles[kind].sprites_used:
+                    merged_attr.sprites_used.add(sprite)
+        return merged_attr
+    
+    def add_chrctr(self, chrct_name: str, kind: str = 'AVL') -> None:
+        if kind == 'BUBBLE':
+            chrctrs, objs, used, prefix = self.bubl_chrctrs, self.bubl_objs, self.bubl_used, 'bubl_'
+        elif kind == 'NVL':
+            chrctrs, objs, used, prefix = self.nvl_chrctrs, self.nvl_objs, self.nvl_used, 'nvl_'
+        else:
+            chrctrs, objs, used, prefix = self.avl_chrctrs, self.avl_objs, self.avl_used, ''
+        if chrctrs.add(chrct_name):
+            obj_name = self.shared_objs.get(kind, {}).get(chrct_name)
+            if obj_name is not None:
+                objs[chrct_name] = obj_name
             else:
-                self.all_chrctr[chrctr].lines_spoken += self.bubl_ovrs[chrctr].lines_spoken
-                for sprite in self.bubl_ovrs[chrctr].sprites_used:
-                    if sprite not in self.all_chrctr[chrctr].sprites_used:
-                        self.all_chrctr[chrctr].sprites_used.append(sprite)
-            if chrctr in self.nvl_ovrs:
-                if chrctr not in self.all_chrctr:
-                    self.all_chrctr[chrctr] = self.nvl_ovrs[chrctr]
+                self.obj_name_helper(chrct_name, objs, used, prefix)
+    
+    def share_objs(self, shared_objs: dict[str, dict[str, str]]) -> None:
+        # Names every character by shared_objs, the object names of the
+        # whole project by speech style and character, and gives any 
+        # other character a name none of them has
+        self.shared_objs = shared_objs
+        shared_names = [obj_name for objs in shared_objs.values() for obj_name in objs.values()]
+        for used in (self.avl_used, self.bubl_used, self.nvl_used):
+            used.reserve(shared_names)
+    
+    def discover_line(self, line: str, line_class: Line_Class = None) -> bool:
+        # Returns False once the Script End Statement has been read
+        if line_class is None:
+            line_class = self.lcl.classify(line, self.in_script)
+        kind = line_class.kind
+        curr_match = line_class
+        if kind == Line_Kinds.script_beg: self.in_script = True
+        elif kind == Line_Kinds.script_end: return False
+        elif self.in_script == True:
+            speech = 'BUBBLE' if self.in_bubl else 'NVL' if self.in_nvl else 'AVL'
+            if kind == Line_Kinds.empty_line:
+                self.dscv_spkng = False
+            elif kind == Line_Kinds.chrct_name:
+                if not self.dscv_spkng:
+                    self.dscv_spkng = True
+                    self.add_chrctr(curr_match.group(1).strip(), speech)
+            elif kind == Line_Kinds.chng_drct:
+                self.add_chrctr(curr_match.group(1).strip(), speech)
+            elif kind == Line_Kinds.appr_drct:
+                self.add_chrctr(curr_match.group(2).strip(), speech)
+            elif kind == Line_Kinds.reset_rendr:
+                rsh = Render_Style_Handler()
+                self.in_bubl, self.in_nvl = rsh.set_speech_style('AVL')
+            elif kind == Line_Kinds.rendr_style:
+                rsh = Render_Style_Handler()
+                if curr_match.group(2) is not None:
+                    self.in_bubl, self.in_nvl = rsh.set_speech_style(curr_match.group(2))
                 else:
-                    self.all_chrctr[chrctr].lines_spoken += self.nvl_ovrs[chrctr].lines_spoken
-                    for sprite in self.nvl_ovrs[chrctr].sprites_used:
-                        if sprite not in self.all_chrctr[chrctr].sprites_used:
-                            self.all_chrctr[chrctr].sprites_used.append(sprite)
-        for chrctr in self.nvl_chrctrs:
-            if chrctr not in self.all_chrctr:
-                self.all_chrctr[chrctr] = self.nvl_ovrs[chrctr]
-            else:
-                self.all_chrctr[chrctr].lines_spoken += self.nvl_ovrs[chrctr].lines_spoken
-                for sprite in self.nvl_ovrs[chrctr].sprites_used:
-                    if sprite not in self.all_chrctr[chrctr].sprites_used:
-                        self.all_chrctr[chrctr].sprites_used.append(sprite)
-        pass
+                    self.in_bubl, self.in_nvl = rsh.set_speech_style('AVL')
+        return True
     
-    def __init__(self, read_path: str) -> None:
-        res = Regular_Expressions()
-        res.init_script()
-        res.init_characters()
-        res.init_render_styles()
-        res.init_directions()
-        res.init_headers()
-        
-        self.avl_chrctrs: list[str] = []
-        self.nvl_chrctrs: list[str] = []
-        self.bubl_chrctrs: list[str] = []
-        
-        self.is_spkng: bool = False
-        self.curr_chrct: str = ''
-        self.curr_extnt: str = ''
-        self.curr_prnth: str = ''
-        
-        in_script: bool = False
-        in_bubl: bool = False
-        in_nvl: bool = False
-        is_spkng: bool = False
-        
-        with open(read_path, 'r', encoding='utf-8') as read_file:
-            try:
-                for line in read_file:
-                    if res.script_beg.match(line): in_script = True
-                    elif res.script_end.match(line): break
-                    elif in_script == True:
-                        if curr_match := res.empty_line.match(line):
-                            is_spkng = False
-                            continue
-                        elif res.scene_headr.match(line): continue 
-                        elif res.cmmnt_line.match(line): continue
-                        elif curr_match := res.chrct_name.match(line):
-                            clean_name = curr_match.group(1).strip()
-                            if not is_spkng:
-                                is_spkng = True
-                                if in_bubl:
-                                    if clean_name not in self.bubl_chrctrs:
-                                        self.bubl_chrctrs.append(clean_name)
-                                elif in_nvl:
-                                    if clean_name not in self.nvl_chrctrs:
-                                        self.nvl_chrctrs.append(clean_name)
-                                else:
-                                    if clean_name not in self.avl_chrctrs:
-                                        self.avl_chrctrs.append(clean_name)
-                        elif curr_match := res.chng_drct.match(line):
-                            clean_name = curr_match.group(1).strip()
-                            if in_bubl:
-                                if clean_name not in self.bubl_chrctrs:
-                                    self.bubl_chrctrs.append(clean_name)
-                            elif in_nvl:
-                                if clean_name not in self.nvl_chrctrs:
-                                    self.nvl_chrctrs.append(clean_name)
-                            else:
-                                if clean_name not in self.avl_chrctrs:
-                                    self.avl_chrctrs.append(clean_name)
-                        elif curr_match := res.appr_drct.match(line):
-                            clean_name = curr_match.group(2).strip()
-                            if in_bubl:
-                                if clean_name not in self.bubl_chrctrs:
-                                    self.bubl_chrctrs.append(clean_name)
-                            elif in_nvl:
-                                if clean_name not in self.nvl_chrctrs:
-                                    self.nvl_chrctrs.append(clean_name)
-                            else:
-                                if clean_name not in self.avl_chrctrs:
-                                    self.avl_chrctrs.append(clean_name)
-                        elif curr_match := res.reset_rendr.match(line):
-                            rsh = Render_Style_Handler()
-                            in_bubl, in_nvl = rsh.set_speech_style('AVL')
-                        elif curr_match := res.rendr_style.match(line):
-                            rsh = Render_Style_Handler()
-                            if curr_match.group(2) is not None:
-                                in_bubl, in_nvl = rsh.set_speech_style(curr_match.group(2))
-                            else:
-                                in_bubl, in_nvl = rsh.set_speech_style('AVL')
-            finally:
-                read_file.close()
-            
+    def print_characters(self) -> None:
         print('STANDARD CHARACTERS:') 
         for char in self.avl_chrctrs:
             print(' - ' + char)
@@ -734,8 +1401,47 @@ class Character_Object_Handler:
         print('NVL CHARACTERS:')
         for char in self.nvl_chrctrs:
             print(' - ' + char)
-            
-        self.create_all()
+    
+    def check_undiscovered(self) -> None:
+        # Characters looked up while writing but never discovered would
+        # have raised a KeyError when discovery ran before writing
+        for kind, chrctrs in self.speech_chrctrs():
+            for chrctr, speech in self.chrctr_table:
+                if speech == kind and chrctr not in chrctrs:
+                    raise KeyError(chrctr)
+    
+    def __init__(self, read_path: str = '', lcl: Line_Classifier = None) -> None:
+        self.lcl = lcl if lcl is not None else Line_Classifier()
+        
+        self.avl_chrctrs = Registry()
+        self.nvl_chrctrs = Registry()
+        self.bubl_chrctrs = Registry()
+        
+        # object names and overseers are filled in as characters are
+        # discovered, so a single pass can write while it discovers
+        self.avl_objs: dict = {}
+        self.bubl_objs: dict = {}
+        self.nvl_objs: dict = {}
+        self.avl_used = Name_Allocator()
+        self.bubl_used = Name_Allocator()
+        self.nvl_used = Name_Allocator()
+        self.shared_objs: dict[str, dict[str, str]] = {}
+        self.chrctr_table = Character_Table()
+        
+        self.is_spkng: bool = False
+        self.curr_chrct: str = ''
+        self.curr_extnt: str = ''
+        self.curr_prnth: str = ''
+        
+        self.in_script: bool = False
+        self.in_bubl: bool = False
+        self.in_nvl: bool = False
+        self.dscv_spkng: bool = False
+        
+        if read_path:
+            for line in Mapped_Script(read_path):
+                if not self.discover_line(line): break
+            self.print_characters()
 
 '''
 ******************************************************************
@@ -752,136 +1458,286 @@ class QA_Keywords:
 Quality_Assurance_Message is a class that stores any information 
 pertaining to an error/warning message. This object is stored in
 Quality_Assurance_Report's 'messages' list whenever an 
-error/warning is found.
+error/warning is found. Lines and columns start from 1, and are 0
+for a message that is not about any line.
 '''
 class Quality_Assurance_Message:
-    def __init__(self, msg_type: str, msg_text: str, msg_tip: str) -> None:
+    def __init__(self, msg_type: str, msg_text: str, msg_tip: str, line_num: int = 0, column: int = 0) -> None:
         self.msg_type = msg_type
         self.msg_text: str = msg_text
         self.msg_tip: str = msg_tip
+        self.line_num: int = line_num
+        self.column: int = column
 
 '''
 ******************************************************************
 Quality_Assurance_Reporter is a class that stores any errors or 
 warnings found in the read file filed provided to ren_form.py. Any
-information stored is then used by class Run_Reporter.
+information stored is then used by class Run_Reporter. Checking 
+stops at the first error, unless every error is checked for, as
+when scripts are only linted.
 '''
 class Quality_Assurance_Reporter:
-    def __init__(self) -> None:
+    # any other kind of line is diagnosed
+    checked_kinds: set[str] = \
+        {Line_Kinds.empty_line, Line_Kinds.scene_headr, Line_Kinds.chrct_name,
+         Line_Kinds.scene_trans, Line_Kinds.chng_drct, Line_Kinds.appr_drct,
+         Line_Kinds.rendr_style, Line_Kinds.reset_rendr, Line_Kinds.reset_text,
+         Line_Kinds.text_style}
+    
+    def __init__(self, lcl: Line_Classifier = None, check_all: bool = False) -> None:
         self.error: Quality_Assurance_Message = None
+        self.errors: list[Quality_Assurance_Message] = []
         self.warnings: list[Quality_Assurance_Message] = []
+        self.check_all = check_all
+        self.lcl = lcl if lcl is not None else Line_Classifier()
+        self.no_start: bool = True
+        self.no_end: bool = True
+        self.line_num: int = 0
     
     def format_message(self, message: Quality_Assurance_Message) -> str:
         return message.msg_type+':\n  '+message.msg_text+'\n  '+message.msg_tip
     
-    def get_messages(self, read_path) -> None:
-        res = Regular_Expressions()
-        res.init_all()
-        res.init_quality_assurance()
-        no_start = True
-        no_end = True
-        line_num = 0
-        with open(read_path, 'r', encoding='utf-8') as read_file:
-                try:
-                    for line in read_file:
-                        warn_msg: Quality_Assurance_Message = None
-                        error_msg: Quality_Assurance_Message = None
-                        is_error: bool = False
-                        is_warning: bool = False
-                        msg_text: str = ''
-                        msg_tip: str = ''
-                        line_num += 1
-                        if res.script_beg.match(line):
-                            no_start = False
-                            continue
-                        elif res.script_end.match(line):
-                            no_end = False
-                            break
-                        if not no_start:
-                            if res.empty_line.match(line): continue
-                            elif res.scene_headr.match(line): continue
-                            elif res.chrct_name.match(line): continue
-                            elif res.scene_trans.match(line): continue
-                            elif res.chng_drct.match(line): continue
-                            elif res.appr_drct.match(line): continue
-                            elif res.rendr_style.match(line): continue
-                            elif res.reset_rendr.match(line): continue
-                            elif res.rendr_style.match(line): continue
-                            elif res.reset_text.match(line): continue
-                            elif res.text_style.match(line): continue # CHECK TEXT STYLES?
-                            elif error_match := res.unknw_extn.match(line):
-                                is_error = True
-                                msg_text = 'Invalid Character Name Extension \''+error_match.group(1)+'\' found on line '+str(line_num)
-                                msg_tip = 'The only valid Character extensions are \'V.O.\' and \'O.S.\''
-                            elif error_match := res.unkwn_drct.match(line):
-                                is_error = True
-                                msg_text = 'Invalid Character Direction \''+error_match.group(1)+'\' found on line '+str(line_num)
-                                msg_tip = 'Make sure Character Directions follow the EXACT format specified by the documentation'
-                            elif error_match := res.unkwn_rendr.match(line):
-                                is_error = True
-                                msg_text = 'Invalid Render Style Statement \''+error_match.group(1)+'\' found on line '+str(line_num)
-                                msg_tip = 'Make sure Render Style Statements follow the EXACT format specified by the documentation'
-                            elif warn_match := res.potnt_headr.match(line):
-                                is_warning = True
-                                msg_text = 'Potential Scene Header \''+warn_match.group(1)+'\' found on line '+str(line_num)
-                                msg_tip = 'If this was supposed to be a Scene Header, follow format specified in the documentation.'
-                            elif warn_match := res.potnt_drct.match(line):
-                                is_warning = True
-                                msg_text = 'Potential Character Direction \''+warn_match.group(1)+'\' found on line '+str(line_num)
-                                msg_tip = 'If this was supposed to be a Character Direction, follow format specified in the documentation.'
-                            elif warn_match := res.potnt_rendr.match(line):
-                                is_warning = True
-                                msg_text = 'Potential Render Style Statement \''+warn_match.group(1)+'\' found on line '+str(line_num)
-                                msg_tip = 'If this was supposed to be a Render Style Statement, follow format specified in the documentation.'
-                            elif warn_match := res.potnt_text.match(line):
-                                is_warning = True
-                                msg_text = 'Potential Text Style Statement \''+warn_match.group(1)+'\' found on line '+str(line_num)
-                                msg_tip = 'If this was supposed to be a Text Style Statement, follow format specified in the documentation.'
-                            if is_error:
-                                error_msg = Quality_Assurance_Message(QA_Keywords.error_type, msg_text, msg_tip)
-                            elif is_warning:
-                                warn_msg = Quality_Assurance_Message(QA_Keywords.warn_type, msg_text, msg_tip)
-                            else:
-                                continue
-                        if error_msg != None:
-                            self.error = error_msg
-                            break
-                        if warn_msg != None:
-                            self.warnings.append(warn_msg)
-                finally:
-                    read_file.close()
-        if no_start:
+    def check_line(self, line: str, line_class: Line_Class = None, diagnosis: Line_Class = None, raw_line: str = None, line_num: int = 0) -> bool:
+        # Returns False once no further lines need to be checked. The
+        # diagnosis of line is only made here when it is not given.
+        # Columns are found in raw_line, the line as it was read, when
+        # it is given. Messages are given line_num, the line of the file
+        # line was read from, when it is given, and the line after the
+        # last one checked otherwise
+        if line_class is None:
+            line_class = self.lcl.classify(line, not self.no_start)
+        kind = line_class.kind
+        self.line_num = line_num or self.line_num+1
+        if kind == Line_Kinds.script_beg:
+            self.no_start = False
+            return True
+        elif kind == Line_Kinds.script_end:
+            self.no_end = False
+            return False
+        if not self.no_start:
+            if kind in self.checked_kinds: return True # CHECK TEXT STYLES?
+            if diagnosis is None:
+                diagnosis = self.lcl.diagnose(line)
+            return self.add_message(self.diagnosis_message(diagnosis, self.line_num, line if raw_line is None else raw_line))
+        return True
+    
+    def find_column(self, diagnosis: Line_Class, line: str) -> int:
+        # Returns the column of what the diagnosis found in line, or of
+        # the first character of line that is not whitespace
+        if diagnosis.groups and diagnosis.group(1):
+            found = line.find(diagnosis.group(1))
+            if found >= 0:
+                return found+1
+        return len(line)-len(line.lstrip())+1
+    
+    def diagnosis_message(self, diagnosis: Line_Class, line_num: int, line: str = '') -> Quality_Assurance_Message:
+        # Returns None when the diagnosis is neither an error nor a
+        # warning. The column is only found when line is given
+        kind = diagnosis.kind
+        is_error: bool = False
+        is_warning: bool = False
+        msg_text: str = ''
+        msg_tip: str = ''
+        if kind == Line_Kinds.unknw_extn:
+            is_error = True
+            msg_text = 'Invalid Character Name Extension \''+diagnosis.group(1)+'\' found on line '+str(line_num)
+            msg_tip = 'The only valid Character extensions are \'V.O.\' and \'O.S.\''
+        elif kind == Line_Kinds.unkwn_drct:
+            is_error = True
+            msg_text = 'Invalid Character Direction \''+diagnosis.group(1)+'\' found on line '+str(line_num)
+            msg_tip = 'Make sure Character Directions follow the EXACT format specified by the documentation'
+        elif kind == Line_Kinds.unkwn_rendr:
+            is_error = True
+            msg_text = 'Invalid Render Style Statement \''+diagnosis.group(1)+'\' found on line '+str(line_num)
+            msg_tip = 'Make sure Render Style Statements follow the EXACT format specified by the documentation'
+        elif kind == Line_Kinds.potnt_headr:
+            is_warning = True
+            msg_text = 'Potential Scene Header \''+diagnosis.group(1)+'\' found on line '+str(line_num)
+            msg_tip = 'If this was supposed to be a Scene Header, follow format specified in the documentation.'
+        elif kind == Line_Kinds.potnt_drct:
+            is_warning = True
+            msg_text = 'Potential Character Direction \''+diagnosis.group(1)+'\' found on line '+str(line_num)
+            msg_tip = 'If this was supposed to be a Character Direction, follow format specified in the documentation.'
+        elif kind == Line_Kinds.potnt_rendr:
+            is_warning = True
+            msg_text = 'Potential Render Style Statement \''+diagnosis.group(1)+'\' found on line '+str(line_num)
+            msg_tip = 'If this was supposed to be a Render Style Statement, follow format specified in the documentation.'
+        elif kind == Line_Kinds.potnt_text:
+            is_warning = True
+            msg_text = 'Potential Text Style Statement \''+diagnosis.group(1)+'\' found on line '+str(line_num)
+            msg_tip = 'If this was supposed to be a Text Style Statement, follow format specified in the documentation.'
+        if not (is_error or is_warning):
+            return None
+        column = self.find_column(diagnosis, line) if line else 0
+        if is_error:
+            return Quality_Assurance_Message(QA_Keywords.error_type, msg_text, msg_tip, line_num, column)
+        return Quality_Assurance_Message(QA_Keywords.warn_type, msg_text, msg_tip, line_num, column)
+    
+    def add_message(self, message: Quality_Assurance_Message) -> bool:
+        # Returns False when message is an error, as checking stops at
+        # the first error unless every error is checked for
+        if message is None:
+            return True
+        if message.msg_type == QA_Keywords.error_type:
+            if self.error is None:
+                self.error = message
+            self.errors.append(message)
+            return self.check_all
+        self.warnings.append(message)
+        return True
+    
+    def check_assets(self, assets, images: Iterable[str], sprites: Iterable[str], audio: Iterable[str], image_lines: dict[str, int] = None, audio_lines: dict[str, int] = None) -> None:
+        # Warns about every image, sprite and audio name the label uses 
+        # that assets, the index of the game directory, has no file or
+        # definition for, on the line the name was first used on, as
+        # image_lines and audio_lines give it
+        image_lines = image_lines if image_lines is not None else {}
+        audio_lines = audio_lines if audio_lines is not None else {}
+        for image in images:
+            if not assets.has_image(image):
+                line_num = image_lines.get(image, 0)
+                msg_text = 'Missing Image \''+image+'\' first used on line '+str(line_num)
+                msg_tip = 'Add an image file named \''+image+'\' to the images directory of the game, or define the image in a .rpy file.'
+                self.warnings.append(Quality_Assurance_Message(QA_Keywords.warn_type, msg_text, msg_tip, line_num, 1))
+        for sprite in sprites:
+            if not assets.has_image(sprite):
+                line_num = image_lines.get(sprite, 0)
+                msg_text = 'Missing Sprite \''+sprite+'\' first used on line '+str(line_num)
+                msg_tip = 'Add an image file named \''+sprite+'\' to the images directory of the game, or define the image in a .rpy file.'
+                self.warnings.append(Quality_Assurance_Message(QA_Keywords.warn_type, msg_text, msg_tip, line_num, 1))
+        for audio_name in audio:
+            if not assets.has_audio(audio_name):
+                line_num = audio_lines.get(audio_name, 0)
+                msg_text = 'Missing Audio \''+audio_name+'\' first used on line '+str(line_num)
+                msg_tip = 'Add an audio file named \''+audio_name+'\' to the audio directory of the game, or define audio.'+audio_name+' in a .rpy file.'
+                self.warnings.append(Quality_Assurance_Message(QA_Keywords.warn_type, msg_text, msg_tip, line_num, 1))
+    
+    def finish(self) -> None:
+        if self.no_start:
             msg_text = r"Script Start Statement '///SCRIPT BEG\\\' never found!"
             msg_tip = 'Add Script Start Statement to read file, or use the -a flag at excecution.'
-            error_msg = Quality_Assurance_Message(QA_Keywords.error_type, msg_text, msg_tip)
+            error_msg = Quality_Assurance_Message(QA_Keywords.error_type, msg_text, msg_tip, 1, 1)
             self.error = error_msg
-        if no_end:
+            self.errors.insert(0, error_msg)
+        if self.no_end:
+            # found missing after the last line of the script
             msg_text = r"Script End Statement '\\\SCRIPT END///' never found!"
             msg_tip = 'If needed, add a Script End Statement to prevent unexpected output.'
-            warn_msg = Quality_Assurance_Message(QA_Keywords.warn_type, msg_text, msg_tip)
+            warn_msg = Quality_Assurance_Message(QA_Keywords.warn_type, msg_text, msg_tip, self.line_num+1, 1)
             self.warnings.insert(0, warn_msg)
+    
+    def check_statements(self, statements: Iterable[Statement]) -> None:
+        for stmt in statements:
+            if not self.check_line(stmt.line, stmt.raw or stmt, stmt.diagnosis, line_num=stmt.line_num): break
+        self.finish()
+    
+    def get_messages(self, read_path) -> None:
+        # Checks the script as Run_Manager does, lexing every line once
+        lex_line = Script_Lexer(self.lcl).lex_line
+        for line in Mapped_Script(read_path):
+            stmt = lex_line(line)
+            if not self.check_line(stmt.line, stmt.raw or stmt, stmt.diagnosis, line): break
+        self.finish()
 
 '''
 ******************************************************************
 Run_Reporter is a class that reports on several aspects of the 
 most recent ren_form.py run. All information regarding the report 
 is written to a report file with the following name format:
-    [label_name]_report.txt
+    [label_name]_report.md
 Where [label_name] is the label name passed to ren_form.py using 
-the -l flag.
+the -l flag. The report can also be written as JSON or CSV, with the
+same name and their own extension, which are written from to_dict
+and hold no date, so they only change when the label does.
 '''
 class Run_Reporter:
-    def __init__(self, label_name: str) -> None:
+    report_formats: tuple[str] = ('md', 'json', 'csv')
+    csv_fields: list[str] = ['character', 'lines_spoken', 'sprites_used', 'sprites']
+    
+    def __init__(self, label_name: str, report_format: str = 'md') -> None:
         self.label_name = label_name
-        self.report_name = label_name.lower()+'_report.md'
+        # the directory the report is written to, the working one when
+        # it is empty
+        self.report_dir: str = ''
+        self.set_format(report_format)
         self.lines_narrated = 0
-        self.images_used = [] # not to be confused with sprites_used
+        self.images_used = Registry() # not to be confused with sprites_used
+        self.audio_used = Registry()
+        # the line every image, sprite and audio name was first used on
+        self.image_lines: dict[str, int] = {}
+        self.audio_lines: dict[str, int] = {}
+    
+    def use_image(self, image_name: str, line_num: int) -> None:
+        # images_used is not added to here, as sprites are kept by characters
+        self.image_lines.setdefault(image_name, line_num)
+    
+    def use_audio(self, audio_name: str, line_num: int) -> None:
+        self.audio_used.add(audio_name)
+        self.audio_lines.setdefault(audio_name, line_num)
     
     def gather_characters(self, chrctr_handlr: Character_Object_Handler) -> None:
         pass
     
-    def write_report(self, qar: Quality_Assurance_Reporter, coh: Character_Object_Handler) -> None:
+    def set_format(self, report_format: str, report_dir: str = None) -> None:
+        if report_format not in self.report_formats:
+            raise Exception('INVALID REPORT: format \"'+report_format+'\" is not one of '+', '.join(self.report_formats))
+        if report_dir is not None:
+            self.report_dir = report_dir
+        self.report_format = report_format
+        self.report_name = os.path.join(self.report_dir, self.label_name.lower()+'_report.'+report_format)
+    
+    def format_message(message: Quality_Assurance_Message) -> dict:
+        return {'severity': message.msg_type.lower(),
+                'line': message.line_num,
+                'column': message.column,
+                'message': message.msg_text,
+                'tip': message.msg_tip}
+    
+    def to_dict(self, qar: Quality_Assurance_Reporter, coh: Character_Object_Handler) -> dict:
+        # Characters must already be collected by the Character_Object_Handler
+        chrctr_table = coh.chrctr_table
+        return {'label': self.label_name,
+                'error': Run_Reporter.format_message(qar.error) if qar.error else None,
+                'warnings': [Run_Reporter.format_message(warning) for warning in qar.warnings],
+                'lines_narrated': self.lines_narrated,
+                'characters': {chrctr: {'lines_spoken': chrctr_table.count_lines(chrctr), 'sprites': list(chrctr_attr.sprites_used)} for chrctr, chrctr_attr in coh.all_chrctr.items()},
+                'images': list(self.images_used),
+                'audio': list(self.audio_used)}
+    
+    def write_report(self, qar: Quality_Assurance_Reporter, coh: Character_Object_Handler) -> dict:
+        # Returns the report as to_dict does, whatever it was written as
         coh.collect_characters()
+        report = self.to_dict(qar, coh)
+        if self.report_format == 'json':
+            self.write_json(report)
+        elif self.report_format == 'csv':
+            self.write_csv(report)
+        else:
+            self.write_markdown(qar, coh)
+        return report
+    
+    def write_json(self, report: dict) -> None:
+        with open(self.report_name, 'w', encoding='utf-8') as write_file:
+            try:
+                json.dump(report, write_file, indent=2)
+                write_file.write('\n')
+            finally:
+                write_file.close()
+    
+    def write_csv(self, report: dict) -> None:
+        # A row for every character, the narrator first
+        with open(self.report_name, 'w', encoding='utf-8', newline='') as write_file:
+            try:
+                writer = csv.writer(write_file)
+                writer.writerow(self.csv_fields)
+                writer.writerow(['NARRATOR', report['lines_narrated'], 0, ''])
+                for chrctr, chrctr_report in report['characters'].items():
+                    writer.writerow([chrctr, chrctr_report['lines_spoken'], len(chrctr_report['sprites']), ';'.join(chrctr_report['sprites'])])
+            finally:
+                write_file.close()
+    
+    def write_markdown(self, qar: Quality_Assurance_Reporter, coh: Character_Object_Handler) -> None:
         with open(self.report_name, 'w', encoding='utf-8') as write_file:
             try:
                 write_file.write('# Report for Ren\'Py Label: \''+self.label_name+'\'\nDate:\n\n'+str(dt.now()))
@@ -903,6 +1759,90 @@ class Run_Reporter:
             finally:
                 write_file.close()
 
+'''
+******************************************************************
+Label_Spool is a class that holds the body of a label while its
+script is still being read, since the Character Objects written
+before it are only known once the whole script has been read.
+Written lines are gathered into large blocks and spooled to a
+temporary file once they outgrow max_size, so memory stays bounded
+however long the script is. Lines that can only be written later
+are deferred by their offset into the spool.
+'''
+class Label_Spool:
+    def __init__(self, block_size: int = 1 << 16, max_size: int = 1 << 23) -> None:
+        self.block_size = block_size
+        self.spool_file = tempfile.SpooledTemporaryFile(max_size=max_size)
+        self.pending: list[str] = []
+        self.pending_size: int = 0
+        self.deferred: list[tuple] = []
+    
+    def append(self, string: str) -> None:
+        self.pending.append(string)
+        self.pending_size += len(string)
+        if self.pending_size >= self.block_size:
+            self.flush()
+    
+    def flush(self) -> None:
+        if self.pending:
+            self.spool_file.write(''.join(self.pending).encode('utf-8'))
+            self.pending = []
+            self.pending_size = 0
+    
+    def tell(self) -> int:
+        # the offset in bytes the next line will be spooled at
+        self.flush()
+        return self.spool_file.tell()
+    
+    def defer(self, *args) -> None:
+        self.deferred.append((self.tell(), args))
+    
+    def resolve(self, format_deferred) -> None:
+        # replaces the arguments of every deferred line with the line
+        self.deferred = [(offset, format_deferred(*args)) for offset, args in self.deferred]
+    
+    def read_blocks(self) -> Iterator[str]:
+        # deferred lines must be resolved before reading
+        self.flush()
+        end = self.spool_file.tell()
+        self.spool_file.seek(0)
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            for offset, string in self.deferred + [(end, '')]:
+                while (size := offset - self.spool_file.tell()) > 0:
+                    block = decoder.decode(self.spool_file.read(min(size, self.block_size)))
+                    if block:
+                        yield block
+                if string:
+                    yield string
+        finally:
+            self.spool_file.close()
+
+'''
+******************************************************************
+Block_Writer is a class that wraps any writable file-like object
+and only writes to it once block_size characters have built up,
+so a label is written in a few large writes instead of one per line.
+'''
+class Block_Writer:
+    def __init__(self, write_file, block_size: int = 1 << 16) -> None:
+        self.write_file = write_file
+        self.block_size = block_size
+        self.pending: list[str] = []
+        self.pending_size: int = 0
+    
+    def write(self, string: str) -> None:
+        self.pending.append(string)
+        self.pending_size += len(string)
+        if self.pending_size >= self.block_size:
+            self.flush()
+    
+    def flush(self) -> None:
+        if self.pending:
+            self.write_file.write(''.join(self.pending))
+            self.pending = []
+            self.pending_size = 0
+
 '''
 ******************************************************************
 Run_Helper is a class that helps Run_Manager by storing some 
@@ -911,6 +1851,13 @@ functionality that can't be pinpointed to any, or just one, of the
 previous classes.
 '''
 class Run_Helper:
+    # every character escape_chars may change, each paired with what
+    # replaces it; a character is only escaped when it is not already
+    escape_table: dict[str, str] = {'\\': '\\\\', '"': '\\"', '{': '{{', '[': '[[', '%': '\\%', '【': '【【'}
+    escape_pattern: re.Pattern = re.compile(r'(?<!\\)\\(?!\\)|(?<!\\)"|(?<!{){(?!{)|(?<!\[)\[(?!\[)|(?<![%\\])%(?!%)|(?<!【)【(?!【)')
+    escape_search: re.Pattern = re.compile(r'[\\"{\[%【]')
+    clean_table: dict[int, str] = str.maketrans({'’': "'", '“': '"', '”': '"'})
+    
     def __init__(self) -> None:
         self.in_script: bool = False
         self.wrote_empty: bool = False
@@ -918,19 +1865,15 @@ class Run_Helper:
         self.voice_next: bool = False
         
     def escape_chars(self, string: str) -> str:
-        string = re.sub(r'(?<!\\)\\(?!\\)', r'\\\\', string)
-        string = re.sub(r'(?<!\\)[\"]', '\\"', string)
-        string = re.sub(r'(?<!\\)[\"]', "\\'", string)
-        string = re.sub(r'(?<!{){(?!{)', r'{{', string)
-        string = re.sub(r'(?<!\[)\[(?!\[)', r'[[', string)
-        string = re.sub(r'(?<!%|\\)%(?!%)', r'\\%', string)
-        string = re.sub(r'(?<!【)【(?!【)', '【【', string)
-        return string
+        # every escape only looks at the characters next to it in the
+        # original string, so all of them can be made in a single pass
+        if not self.escape_search.search(string):
+            return string
+        return self.escape_pattern.sub(lambda match: self.escape_table[match.group()], string)
     
     def clean_str(self, string: str) -> str:
-        string = string.replace('’', "'")
-        string = string.replace('“', '"')
-        string = string.replace('”', '"')
+        if not string.isascii():
+            string = string.translate(self.clean_table)
         return string.strip()
     
     def format_name(self, string: str) -> str:
@@ -973,256 +1916,938 @@ THINGS TO ADD?:
     - Add Daniel Westfall's Kinetic Text Tags as options?
 '''
 class Run_Manager:
-    def __init__(self) -> None:
-        pass
+    def __init__(self, label_name: str = '', quiet: bool = False, lcl: Line_Classifier = None) -> None:
+        self.label_name = label_name
+        self.quiet = quiet
+        self.line_indent = '    '
+        self.lcl = lcl if lcl is not None else Line_Classifier()
+        self.lexer = Script_Lexer(self.lcl)
+        self.qar = Quality_Assurance_Reporter(self.lcl)
+        self.rh = Run_Helper()
+        self.rr = Run_Reporter(label_name)
+        self.coh = Character_Object_Handler(lcl=self.lcl)
+        self.rsh = Render_Style_Handler()
+        self.sch = Scene_Handler()
+        self.tsh = Text_Style_Handler()
+        self.qa_done: bool = False
+        self.dscv_done: bool = False
+        self.emit_done: bool = False
+        # the line of the script file being compiled
+        self.line_num: int = 0
+        # what the report was written from, once it has been
+        self.report: dict = None
+        # Character Objects shared by every label are defined outside
+        # of the label
+        self.shares_objs: bool = False
+        # written lines are held back until every character has been
+        # discovered, as their Character Objects come first in the label
+        self.body = Label_Spool()
+    
+    def share_objs(self, shared_objs: dict[str, dict[str, str]]) -> None:
+        # Must be called before anything is compiled
+        self.coh.share_objs(shared_objs)
+        self.shares_objs = True
+    
+    def defer_dialg(self, line: str, chrctr_name: str, chrctr_objs: dict) -> None:
+        # the object name of a character used before being discovered is
+        # only known once discovery is done
+        self.body.defer(line, chrctr_name, chrctr_objs)
+    
+    def compile_lines(self, lines: Iterable[str]) -> None:
+        lex_line = self.lexer.lex_line
+        for line in lines:
+            if not self.compile_statement(lex_line(line), line): break
+        self.finish()
+    
+    def compile_statements(self, statements: Iterable[Statement]) -> None:
+        for stmt in statements:
+            if not self.compile_statement(stmt): break
+        self.finish()
+    
+    def compile_line(self, line: str) -> bool:
+        return self.compile_statement(self.lexer.lex_line(line), line)
+    
+    def compile_statement(self, stmt: Statement, raw_line: str = None) -> bool:
+        # Returns False once no pass needs any further statements. Each
+        # line is lexed once and the Statement is shared by every pass.
+        # raw_line is the line as it was read, when there was one
+        raw_class = stmt.raw or stmt
+        self.line_num = stmt.line_num or self.line_num+1
+        if not self.qa_done:
+            self.qa_done = not self.qar.check_line(stmt.line, raw_class, stmt.diagnosis, raw_line, stmt.line_num)
+        if not self.dscv_done:
+            self.dscv_done = not self.coh.discover_line(stmt.line, raw_class)
+        if not self.emit_done:
+            self.emit_done = not self.emit_line(stmt.line, stmt)
+        return not (self.qa_done and self.dscv_done and self.emit_done)
+    
+    def emit_line(self, line: str, line_class: Line_Class = None) -> bool:
+        # Returns False once the Script End Statement has been read,
+        # line must already be cleaned by Run_Helper.clean_str
+        label_name = self.label_name
+        line_indent = self.line_indent
+        rh = self.rh
+        rr = self.rr
+        coh = self.coh
+        rsh = self.rsh
+        sch = self.sch
+        tsh = self.tsh
+        if line_class is None:
+            line_class = self.lcl.classify(line, rh.in_script)
+        kind = line_class.kind
+        curr_match = line_class
+        write_string: str = ''
+        if kind == Line_Kinds.script_beg: rh.in_script = True
+        elif kind == Line_Kinds.script_end: return False
+        elif rh.in_script:
+            if kind == Line_Kinds.empty_line:
+                if rh.wrote_empty:
+                    return True
+                else:
+                    if coh.is_spkng:
+                        coh.is_spkng = False
+                        coh.curr_prnth = ''
+                        if tsh.curr_cond == 'SPEAK' and tsh.is_active:
+                            tsh.reset_all()
+                    rh.wrote_empty = True
+                    write_string = line_indent+'\n'
+            else:
+                if kind == Line_Kinds.scene_headr:
+                    image_name = 'bg '+rh.format_name(curr_match.group(1).replace('.',''))+'_'+rh.format_name(curr_match.group(2))
+                    if curr_match.group(3) is not None:
+                        image_name = image_name+'_'+rh.format_name(curr_match.group(3))
+                    rr.images_used.add(image_name)
+                    rr.use_image(image_name, self.line_num)
+                    if sch.is_atl:
+                        sch.is_atl = False
+                        sch.curr_trnstn = '\n'+line_indent+sch.format_atl(sch.curr_trnstn, sch.last_headr, image_name)
+                    write_string = line_indent+sch.format_header(image_name, sch.curr_trnstn)
+                    sch.last_headr = image_name
+                    coh.reset_onscreen()
+                elif kind == Line_Kinds.chrct_name:
+                    coh.is_spkng = True
+                    if tsh.curr_cond == 'NARRATE':
+                        tsh.reset_all()
+                    coh.curr_chrct = curr_match.group(1)
+                    if curr_match.group(2) is not None:
+                        coh.curr_extnt = curr_match.group(2)
+                    else:
+                        coh.curr_extnt = ''
+                    return True
+                elif kind == Line_Kinds.scene_trans:
+                    trnstn_name = rh.format_name(curr_match.group(1))
+                    if sch.is_predefined(curr_match.group(1)):
+                        sch.curr_trnstn = '\n'+line_indent+sch.format_predefined(trnstn_name)
+                    else:
+                        sch.is_atl = True
+                        sch.curr_trnstn = rh.format_name(trnstn_name)
+                    return True
+                elif kind == Line_Kinds.reset_rendr:
+                    rsh.in_idle, rsh.in_snap = rsh.set_image_style('COMMON')
+                    rsh.in_bubl, rsh.in_nvl = rsh.set_speech_style('AVL')
+                    write_string = line_indent+rsh.redefine_narrator()
+                elif kind == Line_Kinds.rendr_style:
+                    if curr_match.group(1) is not None:
+                        rsh.in_idle, rsh.in_snap = rsh.set_image_style(curr_match.group(1))
+                    elif curr_match.group(3) is not None:
+                        rsh.in_idle, rsh.in_snap = rsh.set_image_style(curr_match.group(3))
+                    if curr_match.group(2) is not None:
+                        rsh.in_bubl, rsh.in_nvl = rsh.set_speech_style(curr_match.group(2))
+                    if rsh.in_bubl:
+                        write_string = line_indent+rsh.redefine_narrator('BUBBLE')
+                    elif rsh.in_nvl:
+                        write_string = line_indent+rsh.redefine_narrator('NVL')
+                    else:
+                        write_string = line_indent+rsh.redefine_narrator()
+                elif kind == Line_Kinds.reset_text:
+                    tsh.reset_all()
+                    return True
+                elif kind == Line_Kinds.text_style:
+                    tsh.is_active = True
+                    tsh.get_text_styles(curr_match.group(1))
+                    return True
+                elif kind == Line_Kinds.chng_drct:
+                    curr_sprite = (curr_match.group(1)+' '+curr_match.group(2)).strip().lower()
+                    coh.set_ovrs(curr_match.group(1),True,kind=rsh.get_speech_style()).sprites_used.add(curr_sprite)
+                    rr.use_image(curr_sprite, self.line_num)
+                    write_string = line_indent+coh.format_show_chrctr(curr_match.group(1), curr_match.group(2))+'\n'
+                elif kind == Line_Kinds.appr_drct:
+                    if curr_match.group(1) == 'ENTER':
+                        curr_sprite = (curr_match.group(2)).lower()
+                        coh.set_ovrs(curr_match.group(2),True,kind=rsh.get_speech_style()).sprites_used.add(curr_sprite)
+                        rr.use_image(curr_sprite, self.line_num)
+                        write_string = line_indent+coh.format_show_chrctr(curr_match.group(2))+'\n'
+                    else:
+                        coh.set_ovrs(coh.curr_chrct,False,kind=rsh.get_speech_style())
+                        write_string = line_indent+coh.format_hide_chrctr(curr_match.group(2))+'\n'
+                elif kind == Line_Kinds.music_stmt:
+                    audio_name = rh.format_name(curr_match.group(1))
+                    rr.use_audio(audio_name, self.line_num)
+                    write_string = line_indent+'play music '+audio_name+'\n'
+                elif kind == Line_Kinds.voice_stmt:
+                    audio_name = rh.format_name(curr_match.group(1))
+                    rr.use_audio(audio_name, self.line_num)
+                    write_string = line_indent+'play voice '+audio_name+'\n'
+                elif kind == Line_Kinds.sound_stmt:
+                    audio_name = rh.format_name(curr_match.group(1))
+                    rr.use_audio(audio_name, self.line_num)
+                    write_string = line_indent+'play sound '+audio_name+'\n'
+                elif kind == Line_Kinds.audio_stmt:
+                    audio_name = rh.format_name(curr_match.group(2))
+                    rr.use_audio(audio_name, self.line_num)
+                    write_string = line_indent+'play '+rh.format_name(curr_match.group(1))+' '+audio_name+'\n'
+                elif coh.is_spkng:
+                    is_prnth: bool = False
+                    if kind == Line_Kinds.chrct_prnth:
+                        is_prnth = True
+                        coh.curr_prnth = curr_match.group(1)
+                    if rsh.in_snap and not is_prnth:
+                        image_name = rsh.format_image_name(label_name,rh.image_num)
+                        rr.images_used.add(image_name)
+                        rr.use_image(image_name, self.line_num)
+                        write_string = line_indent+'show '+image_name+'\n'
+                        rh.image_num += 1
+                    elif rsh.in_idle:
+                        pass # Only Scene Headers can change the background while in an IDLE Style
+                    else:
+                        speech = rsh.get_speech_style()
+                        if coh.curr_extnt != 'O.S.':
+                            curr_sprite = (coh.curr_chrct+' '+coh.curr_prnth).strip().lower()
+                            is_onscreen: bool = coh.chrctr_table[(coh.curr_chrct, speech)].is_onscreen
+                            if (not is_onscreen) or (coh.is_necessary_prnth(coh.curr_chrct,coh.curr_prnth,speech) and is_onscreen):
+                                coh.set_ovrs(coh.curr_chrct,True,coh.curr_prnth,speech).sprites_used.add(curr_sprite)
+                                rr.use_image(curr_sprite, self.line_num)
+                                write_string = line_indent+coh.format_show_chrctr(coh.curr_chrct, coh.curr_prnth)+'\n'
+                        else:
+                            # an off screen line in BUBBLE or NVL also hides the
+                            # character's AVL sprite
+                            if speech != 'AVL' and coh.chrctr_table[(coh.curr_chrct, speech)].is_onscreen == True:
+                                coh.set_ovrs(coh.curr_chrct,False,kind=speech)
+                                write_string = line_indent+coh.format_hide_chrctr(coh.curr_chrct)+'\n'
+                            elif coh.chrctr_table[(coh.curr_chrct, 'AVL')].is_onscreen == True:
+                                coh.set_ovrs(coh.curr_chrct,False)
+                                write_string = line_indent+coh.format_hide_chrctr(coh.curr_chrct)+'\n'
+                    if not is_prnth:
+                        line = rh.escape_chars(line)
+                        if tsh.is_active:
+                            true_conds = ['SPEAK', TS_Keywords.count_cond, 'INF']
+                            if tsh.curr_cond in true_conds:
+                                if tsh.line_count != 0:
+                                    line = tsh.tag_prefix+tsh.apply_case(line)+tsh.tag_suffix
+                                    if tsh.line_count > 0:
+                                        tsh.line_count -= 1
+                                if tsh.line_count == 0:
+                                    tsh.reset_all()
+                        if coh.curr_extnt != 'V.O.':
+                            if rsh.in_bubl:
+                                chrctr_objs = coh.bubl_objs
+                            elif rsh.in_nvl:
+                                chrctr_objs = coh.nvl_objs
+                            else:
+                                chrctr_objs = coh.avl_objs
+                            if coh.curr_chrct in chrctr_objs:
+                                write_string = write_string+line_indent+coh.format_chrctr_dialg(line,coh.curr_chrct,chrctr_objs)
+                            else:
+                                self.body.append(write_string)
+                                self.defer_dialg(line,coh.curr_chrct,chrctr_objs)
+                                write_string = ''
+                        else:
+                            write_string = write_string+line_indent+coh.format_chrctr_dialg(line)
+                        coh.chrctr_table[(coh.curr_chrct, rsh.get_speech_style())].lines_spoken += 1
+                elif kind == Line_Kinds.cmmnt_line:
+                    write_string = line_indent+line.strip()
+                else:
+                    line = rh.escape_chars(line)
+                    if tsh.is_active:
+                        true_conds = ['NARRATE', TS_Keywords.count_cond, 'INF']
+                        if tsh.curr_cond in true_conds:
+                            if tsh.line_count != 0:
+                                line = tsh.tag_prefix+tsh.apply_case(line)+tsh.tag_suffix
+                                if tsh.line_count > 0:
+                                    tsh.line_count -= 1
+                            if tsh.line_count == 0:
+                                tsh.reset_all()
+                    write_string = line_indent+'\"'+line+'\"\n'
+                    rr.lines_narrated += 1
+                rh.wrote_empty = False
+        if write_string:
+            self.body.append(write_string)
+        return True
+    
+    def finish(self) -> None:
+        self.qar.finish()
+        if not self.quiet:
+            if self.qar.error:
+                print(self.qar.format_message(self.qar.error))
+            self.coh.print_characters()
+        self.coh.check_undiscovered()
+        line_indent = self.line_indent
+        self.body.resolve(lambda line, chrctr_name, chrctr_objs: line_indent+self.coh.format_chrctr_dialg(line,chrctr_name,chrctr_objs))
+    
+    def sprites_used(self) -> Registry:
+        sprites = Registry()
+        for chrctr_attr in self.coh.chrctr_table.values():
+            for sprite in chrctr_attr.sprites_used:
+                sprites.add(sprite)
+        return sprites
+    
+    def check_assets(self, assets) -> None:
+        # Checks every image, sprite and audio name written to the label
+        # against assets, once the whole script has been compiled
+        rr = self.rr
+        self.qar.check_assets(assets, rr.images_used, self.sprites_used(), rr.audio_used, rr.image_lines, rr.audio_lines)
+    
+    def iter_header(self) -> Iterator[str]:
+        # Yields everything written before the body of the label
+        coh = self.coh
+        line_indent = self.line_indent
+        yield 'label ' + self.label_name + ':\n'
+        yield line_indent+'$ narrator = Character(name=None) # DELETE IF REDUNDANT\n'
+        if self.shares_objs:
+            return
+        for chrct in coh.avl_chrctrs:
+            yield line_indent+coh.create_chrct_objs(chrct,coh.avl_objs)
+        for chrct in coh.bubl_chrctrs:
+            yield line_indent+coh.create_chrct_objs(chrct,coh.bubl_objs,kind='BUBBLE')
+        for chrct in coh.nvl_chrctrs:
+            yield line_indent+coh.create_chrct_objs(chrct,coh.nvl_objs,kind='NVL')
+    
+    def iter_label(self) -> Iterator[str]:
+        # Yields the label in blocks, once the script has been compiled
+        yield from self.iter_header()
+        yield from self.body.read_blocks()
+        yield self.line_indent + 'return'
+    
+    def split_lines(blocks: Iterable[str]) -> Iterator[str]:
+        rest = ''
+        for block in blocks:
+            lines = (rest+block).split('\n')
+            rest = lines.pop()
+            for line in lines:
+                yield line+'\n'
+        if rest:
+            yield rest
+    
+    def stream(self, lines: Iterable[str], by_line: bool = False) -> Iterator[str]:
+        # Compiles any iterable of script lines, such as an open file, 
+        # and lazily yields the label in blocks, or line by line
+        self.compile_lines(lines)
+        if by_line:
+            yield from Run_Manager.split_lines(self.iter_label())
+        else:
+            yield from self.iter_label()
+    
+    def write_label(self, write_file) -> None:
+        block_writer = Block_Writer(write_file)
+        for block in self.iter_label():
+            block_writer.write(block)
+        block_writer.flush()
+    
+    def write_report(self) -> None:
+        self.report = self.rr.write_report(self.qar, self.coh)
+    
+    def open_path(path: str, mode: str):
+        # '-' stands for stdin or stdout, which are left open afterwards.
+        # A script is read through a Mapped_Script
+        if path == '-':
+            return contextlib.nullcontext(sys.stdin if mode == 'r' else sys.stdout)
+        if mode == 'r':
+            return contextlib.nullcontext(Mapped_Script(path))
+        return open(path, mode, encoding='utf-8')
+    
+    def run_file(read_file, write_file, label_name: str, quiet: bool = False):
+        # Compiles between file-like objects, nothing is opened or closed
+        rm = Run_Manager(label_name, quiet)
+        rm.compile_lines(read_file)
+        rm.write_label(write_file)
+        return rm
+    
+    def run(read_path: str, write_path: str, label_name: str, quiet: bool = False, cache_statements: bool = False, profile: bool = False, incremental: bool = False, read_statements = None, assets = None, shared_objs: dict[str, dict[str, str]] = None, report_format: str = 'md', report_dir: str = ''):
+        # Reads the script once; the quality assurance, character 
+        # discovery and writing passes all advance on the same line.
+        # Either path may be '-' to read from stdin or write to stdout.
+        # A profiled run returns a Profiled_Run_Manager. An incremental
+        # run splices into the label already at write_path, and needs 
+        # both paths to be files. A run cannot be both, as the scenes an
+        # incremental run copies are never compiled to be profiled. A
+        # script in a typed format is read by read_statements(read_path,
+        # lexer), which yields its Statements. Given assets, the index
+        # of the game directory, every image, sprite and audio name the
+        # label uses is checked against it. Given shared_objs, 
+        # characters are named by the object names of the project, and
+        # the label does not define them. The report is written as 
+        # report_format, 'md', 'json' or 'csv', into report_dir, or the
+        # working directory when it is empty
+        if profile and incremental:
+            raise Exception('INVALID RUN: a run cannot be both profiled and incremental')
+        run_manager = Profiled_Run_Manager if profile else Run_Manager
+        rm = run_manager(label_name, quiet or write_path == '-')
+        if shared_objs is not None:
+            rm.share_objs(shared_objs)
+        if read_statements is not None:
+            rm.compile_statements(read_statements(read_path, rm.lexer))
+        elif incremental and read_path != '-' and write_path != '-':
+            rm = Scene_Run_Manager.compile_file(read_path, write_path, label_name, quiet, shared_objs)
+        elif cache_statements and read_path != '-':
+            rm.compile_statements(Statement_Cache(read_path).statements(rm.lexer))
+        else:
+            with Run_Manager.open_path(read_path, 'r') as read_file:
+                rm.compile_lines(read_file)
+        if assets is not None:
+            rm.check_assets(assets)
+        with Run_Manager.open_path(write_path, 'w') as write_file:
+            rm.write_label(write_file)
+        rm.rr.set_format(report_format, report_dir)
+        rm.write_report()
+        return rm
+
+'''
+******************************************************************
+Pattern_Counter stands in for a compiled pattern while a run is
+profiled, counting how many lines the pattern was tried on and how
+many it matched.
+'''
+class Pattern_Counter:
+    __slots__ = ('pattern', 'attempts', 'hits')
+    
+    def __init__(self, pattern: re.Pattern) -> None:
+        self.pattern = pattern
+        self.attempts: int = 0
+        self.hits: int = 0
     
-    def run(read_path: str, write_path: str, label_name: str) -> None:
-        qar = Quality_Assurance_Reporter()
-        qar.get_messages(read_path)
-        if qar.error:
-            print(qar.format_message(qar.error))
-            # return
-        line_indent = '    '
-        rh = Run_Helper()
-        rr = Run_Reporter(label_name)
-        res = Regular_Expressions()
-        res.init_all()
-        coh = Character_Object_Handler(read_path)
-        rsh = Render_Style_Handler()
-        sch = Scene_Handler()
-        tsh = Text_Style_Handler()
-        with open(write_path, 'w', encoding='utf-8') as write_file:
+    def match(self, string: str):
+        self.attempts += 1
+        if curr_match := self.pattern.match(string):
+            self.hits += 1
+        return curr_match
+
+'''
+******************************************************************
+Profiled_Expressions wraps a Regular_Expressions, handing out a
+Pattern_Counter in place of every pattern accessed through it. Only
+a Line_Classifier made for a profiled run is given one, so runs
+that are not profiled match their patterns directly.
+'''
+class Profiled_Expressions:
+    def __init__(self, res: Regular_Expressions = None) -> None:
+        self.res = res if res is not None else Regular_Expressions()
+        self.char_set = self.res.char_set
+        self.counters: dict[str, Pattern_Counter] = {}
+    
+    def __getattr__(self, name: str) -> Pattern_Counter:
+        counter = Pattern_Counter(getattr(self.res, name))
+        self.counters[name] = counter
+        self.__dict__[name] = counter
+        return counter
+
+'''
+******************************************************************
+Byte_Counter wraps a writable file, counting the bytes every string
+written to it takes once encoded as utf-8, and hashing them when it
+is given a digest.
+'''
+class Byte_Counter:
+    def __init__(self, write_file, digest = None) -> None:
+        self.write_file = write_file
+        self.digest = digest
+        self.num_bytes: int = 0
+    
+    def write(self, string: str) -> int:
+        encoded = string.encode('utf-8')
+        self.num_bytes += len(encoded)
+        if self.digest is not None:
+            self.digest.update(encoded)
+        return self.write_file.write(string)
+
+'''
+******************************************************************
+Profiled_Run_Manager is a Run_Manager that records where a run 
+spends its time. Every stage of the run is timed on its own:
+reading lines, lexing, quality assurance, character discovery, 
+emission, finishing the label, writing it and writing the report.
+It also counts how many lines of each kind were compiled, how many
+times every pattern was tried and matched, and how many bytes were
+read and written. The stages are timed by wrapping the methods 
+Run_Manager calls, so Run_Manager itself is never slowed down. The
+profile is returned as a dict by profile(), ready to dump as JSON.
+'''
+class Profiled_Run_Manager(Run_Manager):
+    stages: list[str] = ['read', 'lex', 'qa', 'discovery', 'emission', 'finish', 'write', 'report']
+    
+    def __init__(self, label_name: str = '', quiet: bool = False) -> None:
+        self.res = Profiled_Expressions()
+        super().__init__(label_name, quiet, Line_Classifier(self.res))
+        self.stage_times: dict[str, float] = dict.fromkeys(self.stages, 0.0)
+        self.kind_counts: dict[str, int] = {}
+        self.bytes_read: int = 0
+        self.bytes_written: int = 0
+        self.report_bytes: int = 0
+        # instance attributes shadow the methods Run_Manager calls
+        self.lexer.lex_line = self.timed('lex', self.lexer.lex_line)
+        self.qar.check_line = self.timed('qa', self.qar.check_line)
+        self.coh.discover_line = self.timed('discovery', self.coh.discover_line)
+        self.emit_line = self.timed('emission', self.emit_line)
+        self.finish = self.timed('finish', self.finish)
+    
+    def timed(self, stage: str, func):
+        stage_times = self.stage_times
+        perf_counter = time.perf_counter
+        def timed_func(*args):
+            start = perf_counter()
             try:
-                with open(read_path, 'r', encoding='utf-8') as read_file:
-                    try:
-                        write_file.write('label ' + label_name + ':\n')
-                        write_file.write(line_indent+'$ narrator = Character(name=None) # DELETE IF REDUNDANT\n')
-                        for chrct in coh.avl_chrctrs:
-                            write_file.write(line_indent+coh.create_chrct_objs(chrct,coh.avl_objs))
-                        for chrct in coh.bubl_chrctrs:
-                            write_file.write(line_indent+coh.create_chrct_objs(chrct,coh.bubl_objs,kind='BUBBLE'))
-                        for chrct in coh.nvl_chrctrs:
-                            write_file.write(line_indent+coh.create_chrct_objs(chrct,coh.nvl_objs,kind='NVL'))
-                        
-                        line_num: int = 0
-                        for line in read_file:
-                            line_num += 1
-                            line = rh.clean_str(line)
-                            write_string: str = ''
-                            if res.script_beg.match(line): rh.in_script = True
-                            elif res.script_end.match(line): break
-                            elif rh.in_script:
-                                if res.empty_line.match(line):
-                                    if rh.wrote_empty:
-                                        continue
-                                    else:
-                                        if coh.is_spkng:
-                                            coh.is_spkng = False
-                                            coh.curr_prnth = ''
-                                            if tsh.curr_cond == 'SPEAK' and tsh.is_active:
-                                                tsh.reset_all()
-                                        rh.wrote_empty = True
-                                        write_string = line_indent+'\n'
-                                else:
-                                    if curr_match := res.scene_headr.match(line):
-                                        image_name = 'bg '+rh.format_name(curr_match.group(1).replace('.',''))+'_'+rh.format_name(curr_match.group(2))
-                                        if curr_match.group(3) is not None:
-                                            image_name = image_name+'_'+rh.format_name(curr_match.group(3))
-                                        if image_name not in rr.images_used:
-                                            rr.images_used.append(image_name)
-                                        if sch.is_atl:
-                                            sch.is_atl = False
-                                            sch.curr_trnstn = '\n'+line_indent+sch.format_atl(sch.curr_trnstn, sch.last_headr, image_name)
-                                        write_string = line_indent+sch.format_header(image_name, sch.curr_trnstn)
-                                        sch.last_headr = image_name
-                                        coh.reset_onscreen()
-                                    elif curr_match := res.chrct_name.match(line):
-                                        coh.is_spkng = True
-                                        if tsh.curr_cond == 'NARRATE':
-                                            tsh.reset_all()
-                                        coh.curr_chrct = curr_match.group(1)
-                                        if curr_match.group(2) is not None:
-                                            coh.curr_extnt = curr_match.group(2)
-                                        else:
-                                            coh.curr_extnt = ''
-                                        continue
-                                    elif curr_match := res.scene_trans.match(line):
-                                        trnstn_name = rh.format_name(curr_match.group(1))
-                                        if sch.is_predefined(curr_match.group(1)):
-                                            sch.curr_trnstn = '\n'+line_indent+sch.format_predefined(trnstn_name)
-                                        else:
-                                            sch.is_atl = True
-                                            sch.curr_trnstn = rh.format_name(trnstn_name)
-                                        continue
-                                    elif curr_match := res.reset_rendr.match(line):
-                                        rsh.in_idle, rsh.in_snap = rsh.set_image_style('COMMON')
-                                        rsh.in_bubl, rsh.in_nvl = rsh.set_speech_style('AVL')
-                                        write_string = line_indent+rsh.redefine_narrator()
-                                    elif curr_match := res.rendr_style.match(line):
-                                        if curr_match.group(1) is not None:
-                                            rsh.in_idle, rsh.in_snap = rsh.set_image_style(curr_match.group(1))
-                                        elif curr_match.group(3) is not None:
-                                            rsh.in_idle, rsh.in_snap = rsh.set_image_style(curr_match.group(3))
-                                        if curr_match.group(2) is not None:
-                                            rsh.in_bubl, rsh.in_nvl = rsh.set_speech_style(curr_match.group(2))
-                                        if rsh.in_bubl:
-                                            write_string = line_indent+rsh.redefine_narrator('BUBBLE')
-                                        elif rsh.in_nvl:
-                                            write_string = line_indent+rsh.redefine_narrator('NVL')
-                                        else:
-                                            write_string = line_indent+rsh.redefine_narrator()
-                                    elif curr_match := res.reset_text.match(line):
-                                        tsh.reset_all()
-                                        continue
-                                    elif curr_match := res.text_style.match(line):
-                                        tsh.is_active = True
-                                        tsh.get_text_styles(curr_match.group(1))
-                                        continue
-                                    elif curr_match := res.chng_drct.match(line):
-                                        curr_sprite = (curr_match.group(1)+' '+curr_match.group(2)).strip().lower()
-                                        if rsh.in_bubl:
-                                            coh.bubl_ovrs[curr_match.group(1)].is_onscreen = True
-                                            if curr_sprite not in coh.bubl_ovrs[curr_match.group(1)].sprites_used:
-                                                coh.bubl_ovrs[curr_match.group(1)].sprites_used.append(curr_sprite)
-                                        elif rsh.in_nvl:
-                                            coh.nvl_ovrs[curr_match.group(1)].is_onscreen = True
-                                            if curr_sprite not in coh.nvl_ovrs[curr_match.group(1)].sprites_used:
-                                                coh.nvl_ovrs[curr_match.group(1)].sprites_used.append(curr_sprite)
-                                        else:
-                                            coh.avl_ovrs[curr_match.group(1)].is_onscreen = True
-                                            if curr_sprite not in coh.avl_ovrs[curr_match.group(1)].sprites_used:
-                                                coh.avl_ovrs[curr_match.group(1)].sprites_used.append(curr_sprite)
-                                        write_string = line_indent+coh.format_show_chrctr(curr_match.group(1), curr_match.group(2))+'\n'
-                                    elif curr_match := res.appr_drct.match(line):
-                                        if curr_match.group(1) == 'ENTER':
-                                            curr_sprite = (curr_match.group(2)).lower()
-                                            if rsh.in_bubl:
-                                                coh.bubl_ovrs[curr_match.group(2)].is_onscreen = True
-                                                if curr_sprite not in coh.bubl_ovrs[curr_match.group(2)].sprites_used:
-                                                    coh.bubl_ovrs[curr_match.group(2)].sprites_used.append(curr_sprite)
-                                            elif rsh.in_nvl:
-                                                coh.nvl_ovrs[curr_match.group(2)].is_onscreen = True
-                                                if curr_sprite not in coh.nvl_ovrs[curr_match.group(2)].sprites_used:
-                                                    coh.nvl_ovrs[curr_match.group(2)].sprites_used.append(curr_sprite)
-                                            else:
-                                                coh.avl_ovrs[curr_match.group(2)].is_onscreen = True
-                                                if curr_sprite not in coh.avl_ovrs[curr_match.group(2)].sprites_used:
-                                                    coh.avl_ovrs[curr_match.group(2)].sprites_used.append(curr_sprite)
-                                            write_string = line_indent+coh.format_show_chrctr(curr_match.group(2))+'\n'
-                                        else:
-                                            if rsh.in_bubl:
-                                                coh.bubl_ovrs[coh.curr_chrct].is_onscreen = False
-                                            elif rsh.in_nvl:
-                                                coh.nvl_ovrs[coh.curr_chrct].is_onscreen = False
-                                            else:
-                                                coh.avl_ovrs[coh.curr_chrct].is_onscreen = False
-                                            write_string = line_indent+coh.format_hide_chrctr(curr_match.group(2))+'\n'
-                                    elif curr_match := res.music_stmt.match(line):
-                                        write_string = line_indent+'play music '+rh.format_name(curr_match.group(1))+'\n'
-                                    elif curr_match := res.voice_stmt.match(line):
-                                        write_string = line_indent+'play voice '+rh.format_name(curr_match.group(1))+'\n'
-                                    elif curr_match := res.sound_stmt.match(line):
-                                        write_string = line_indent+'play sound '+rh.format_name(curr_match.group(1))+'\n'
-                                    elif curr_match := res.audio_stmt.match(line):
-                                        write_string = line_indent+'play '+rh.format_name(curr_match.group(1))+' '+rh.format_name(curr_match.group(2))+'\n'
-                                    elif coh.is_spkng:
-                                        is_prnth: bool = False
-                                        if curr_match := res.chrct_prnth.match(line):
-                                            is_prnth = True
-                                            coh.curr_prnth = curr_match.group(1)
-                                        if rsh.in_snap and not is_prnth:
-                                            image_name = rsh.format_image_name(label_name,rh.image_num)
-                                            rr.images_used.append(image_name)
-                                            write_string = line_indent+'show '+image_name+'\n'
-                                            rh.image_num += 1
-                                        elif rsh.in_idle:
-                                            pass # Only Scene Headers can change the background while in an IDLE Style
-                                        else:
-                                            if coh.curr_extnt != 'O.S.':
-                                                curr_sprite = (coh.curr_chrct+' '+coh.curr_prnth).strip().lower()
-                                                write_show = False
-                                                if rsh.in_bubl:
-                                                    is_onscreen: bool = coh.bubl_ovrs[coh.curr_chrct].is_onscreen
-                                                    if (not is_onscreen) or (coh.is_necessary_prnth(coh.curr_chrct,coh.curr_prnth,'BUBBLE') and is_onscreen):
-                                                        write_show = True
-                                                        coh.set_ovrs(coh.curr_chrct,True,coh.curr_prnth,'BUBBLE')
-                                                        if curr_sprite not in coh.bubl_ovrs[coh.curr_chrct].sprites_used:
-                                                            coh.bubl_ovrs[coh.curr_chrct].sprites_used.append(curr_sprite)
-                                                elif rsh.in_nvl:
-                                                    is_onscreen: bool = coh.nvl_ovrs[coh.curr_chrct].is_onscreen
-                                                    if (not is_onscreen) or (coh.is_necessary_prnth(coh.curr_chrct,coh.curr_prnth,'NVL') and is_onscreen):
-                                                        write_show = True
-                                                        coh.set_ovrs(coh.curr_chrct,True,coh.curr_prnth,'NVL')
-                                                        if curr_sprite not in coh.nvl_ovrs[coh.curr_chrct].sprites_used:
-                                                            coh.nvl_ovrs[coh.curr_chrct].sprites_used.append(curr_sprite)
-                                                else:
-                                                    is_onscreen: bool = coh.avl_ovrs[coh.curr_chrct].is_onscreen
-                                                    if (not is_onscreen) or (coh.is_necessary_prnth(coh.curr_chrct,coh.curr_prnth) and is_onscreen):
-                                                        write_show = True
-                                                        coh.set_ovrs(coh.curr_chrct,True,coh.curr_prnth)
-                                                        if curr_sprite not in coh.avl_ovrs[coh.curr_chrct].sprites_used:
-                                                            coh.avl_ovrs[coh.curr_chrct].sprites_used.append(curr_sprite)
-                                                if write_show:
-                                                    write_string = line_indent+coh.format_show_chrctr(coh.curr_chrct, coh.curr_prnth)+'\n'
-                                            else:
-                                                if rsh.in_bubl and coh.bubl_ovrs[coh.curr_chrct].is_onscreen == True:
-                                                    coh.bubl_ovrs[coh.curr_chrct].is_onscreen = False
-                                                    write_string = line_indent+coh.format_hide_chrctr(coh.curr_chrct)+'\n'
-                                                elif rsh.in_nvl and coh.nvl_ovrs[coh.curr_chrct].is_onscreen == True:
-                                                    coh.nvl_ovrs[coh.curr_chrct].is_onscreen = False
-                                                    write_string = line_indent+coh.format_hide_chrctr(coh.curr_chrct)+'\n'
-                                                elif coh.avl_ovrs[coh.curr_chrct].is_onscreen == True:
-                                                    coh.avl_ovrs[coh.curr_chrct].is_onscreen = False
-                                                    write_string = line_indent+coh.format_hide_chrctr(coh.curr_chrct)+'\n'
-                                        if not is_prnth:
-                                            line = rh.escape_chars(line)
-                                            if tsh.is_active:
-                                                true_conds = ['SPEAK', TS_Keywords.count_cond, 'INF']
-                                                if tsh.curr_cond in true_conds:
-                                                    if tsh.line_count != 0:
-                                                        line = tsh.tag_prefix+tsh.apply_case(line)+tsh.tag_suffix
-                                                        if tsh.line_count > 0:
-                                                            tsh.line_count -= 1
-                                                    if tsh.line_count == 0:
-                                                        tsh.reset_all()
-                                            if coh.curr_extnt != 'V.O.':
-                                                if rsh.in_bubl:
-                                                    write_string = write_string+line_indent+coh.format_chrctr_dialg(line,coh.curr_chrct,coh.bubl_objs)
-                                                elif rsh.in_nvl:
-                                                    write_string = write_string+line_indent+coh.format_chrctr_dialg(line,coh.curr_chrct,coh.nvl_objs)
-                                                else:
-                                                    write_string = write_string+line_indent+coh.format_chrctr_dialg(line,coh.curr_chrct,coh.avl_objs)
-                                            else:
-                                                write_string = write_string+line_indent+coh.format_chrctr_dialg(line)
-                                            if rsh.in_bubl:
-                                                coh.bubl_ovrs[coh.curr_chrct].lines_spoken += 1
-                                            elif rsh.in_nvl:
-                                                coh.nvl_ovrs[coh.curr_chrct].lines_spoken += 1
-                                            else:
-                                                coh.avl_ovrs[coh.curr_chrct].lines_spoken += 1
-                                    elif res.cmmnt_line.match(line):
-                                        write_string = line_indent+line.strip()
-                                    else:
-                                        line = rh.escape_chars(line)
-                                        if tsh.is_active:
-                                            true_conds = ['NARRATE', TS_Keywords.count_cond, 'INF']
-                                            if tsh.curr_cond in true_conds:
-                                                if tsh.line_count != 0:
-                                                    line = tsh.tag_prefix+tsh.apply_case(line)+tsh.tag_suffix
-                                                    if tsh.line_count > 0:
-                                                        tsh.line_count -= 1
-                                                if tsh.line_count == 0:
-                                                    tsh.reset_all()
-                                        write_string = line_indent+'\"'+line+'\"\n'
-                                        rr.lines_narrated += 1
-                                    rh.wrote_empty = False
-                            write_file.write(write_string)
-                    finally:
-                        read_file.close()
-                write_file.write(line_indent + 'return')
+                return func(*args)
             finally:
-                write_file.close()
-        rr.write_report(qar,coh)    
+                stage_times[stage] += perf_counter()-start
+        return timed_func
+    
+    def read_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        stage_times = self.stage_times
+        perf_counter = time.perf_counter
+        lines = iter(lines)
+        while True:
+            start = perf_counter()
+            line = next(lines, None)
+            stage_times['read'] += perf_counter()-start
+            if line is None:
+                return
+            self.bytes_read += len(line.encode('utf-8'))
+            yield line
+    
+    def read_statements(self, statements: Iterable[Statement]) -> Iterator[Statement]:
+        # Lines read back from a Statement_Cache are already cleaned,
+        # so only the bytes of their text are counted
+        stage_times = self.stage_times
+        perf_counter = time.perf_counter
+        statements = iter(statements)
+        while True:
+            start = perf_counter()
+            stmt = next(statements, None)
+            stage_times['read'] += perf_counter()-start
+            if stmt is None:
+                return
+            self.bytes_read += len(stmt.line.encode('utf-8'))+1
+            yield stmt
+    
+    def compile_lines(self, lines: Iterable[str]) -> None:
+        super().compile_lines(self.read_lines(lines))
+    
+    def compile_statements(self, statements: Iterable[Statement]) -> None:
+        super().compile_statements(self.read_statements(statements))
+    
+    def compile_statement(self, stmt: Statement, raw_line: str = None) -> bool:
+        self.kind_counts[stmt.kind] = self.kind_counts.get(stmt.kind, 0) + 1
+        return super().compile_statement(stmt, raw_line)
+    
+    def write_label(self, write_file) -> None:
+        start = time.perf_counter()
+        byte_counter = Byte_Counter(write_file)
+        super().write_label(byte_counter)
+        self.bytes_written += byte_counter.num_bytes
+        self.stage_times['write'] += time.perf_counter()-start
+    
+    def write_report(self) -> None:
+        start = time.perf_counter()
+        super().write_report()
+        self.report_bytes = os.path.getsize(self.rr.report_name)
+        self.stage_times['report'] += time.perf_counter()-start
+    
+    def profile(self) -> dict:
+        seconds = {stage: round(self.stage_times[stage], 6) for stage in self.stages}
+        seconds['total'] = round(sum(self.stage_times.values()), 6)
+        return {'label': self.label_name,
+                'seconds': seconds,
+                'bytes': {'read': self.bytes_read, 'written': self.bytes_written, 'report': self.report_bytes},
+                'lines': dict(sorted(self.kind_counts.items())),
+                'patterns': {name: {'attempts': counter.attempts, 'hits': counter.hits} for name, counter in sorted(self.res.counters.items())}}
+    
+    def write_profile(self, write_path: str) -> None:
+        # write_path may be '-' to write to stdout
+        with Run_Manager.open_path(write_path, 'w') as write_file:
+            json.dump(self.profile(), write_file, indent=2)
+            write_file.write('\n')
+
+'''
+******************************************************************
+Scene_Checkpoints is a class that keeps what Scene_Run_Manager
+recorded about every scene of a label in a binary file next to the
+label. The file starts with the compiler that wrote it and the name
+of the label, followed by a hash of the label file, where its body
+starts, the Character Objects it used and a record of every scene.
+The records are only read back while the label file is exactly as 
+it was written, so a label edited by hand is always compiled again.
+'''
+class Scene_Checkpoints:
+    file_extension: str = '.t2s'
+    file_format: int = 4
+    
+    def __init__(self, write_path: str, label_name: str) -> None:
+        self.write_path = write_path
+        self.checkpoint_path = write_path+self.file_extension
+        self.header = (self.file_format, marshal.version, Statement_Cache.hash_file(__file__), label_name)
+    
+    def load(self) -> tuple:
+        # Returns (body_start, chrctr_objs, scenes), or None when the
+        # label cannot be spliced into
+        try:
+            with open(self.checkpoint_path, 'rb') as checkpoint_file:
+                try:
+                    if marshal.load(checkpoint_file) != self.header:
+                        return None
+                    label_hash, body_start, chrctr_objs, scenes = marshal.load(checkpoint_file)
+                finally:
+                    checkpoint_file.close()
+            if Statement_Cache.hash_file(self.write_path) != label_hash:
+                return None
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return body_start, chrctr_objs, scenes
+    
+    def save(self, label_hash: str, body_start: int, chrctr_objs: tuple, scenes: tuple) -> None:
+        temp_path = self.checkpoint_path+'.tmp'
+        with open(temp_path, 'wb') as checkpoint_file:
+            try:
+                marshal.dump(self.header, checkpoint_file)
+                marshal.dump((label_hash, body_start, chrctr_objs, scenes), checkpoint_file)
+            finally:
+                checkpoint_file.close()
+        os.replace(temp_path, self.checkpoint_path)
+
+'''
+******************************************************************
+Scene_Run_Manager is a Run_Manager that only compiles the scenes of
+a script that changed since its label was last written, splicing 
+every other scene in from the label as it is. A scene starts at a
+Scene Header (the lines before the first one are a scene of their
+own), and scene headers are found without lexing the script. Each
+scene is only compiled once it has been read whole: a scene whose
+lines and incoming state are both the same as a scene of the last
+compile is not lexed, checked, discovered or written again, as it
+would do exactly what it did last time. Its part of the label is 
+copied from the last label, the messages and characters it found
+are found again, and the state it left behind is taken up. The 
+incoming state is everything the passes read: the lexer, where 
+quality assurance and discovery are in the script, the on screen
+characters and their parentheticals, the render and text styles, 
+the transition, the image number and what the last line was. What
+writing counts up for the report is kept apart per scene, and added
+up again for the scenes that are copied. Copied scenes are only 
+kept when every Character Object they were written with still has
+the same name, otherwise the script is compiled again without 
+copying anything, so the label is always the same as a full compile
+would write.
+'''
+class Scene_Run_Manager(Run_Manager):
+    # how every line that can start or end a scene starts, once its
+    # leading whitespace is stripped
+    scene_starts: tuple[str] = ('INT.', 'EXT.', 'LOC.', 'IMG.', '/', '\\')
+    
+    def __init__(self, label_name: str = '', quiet: bool = False, write_path: str = '', reuse: bool = True) -> None:
+        super().__init__(label_name, quiet)
+        self.scene_lcl = Line_Classifier(self.lcl.res)
+        self.checkpoints = Scene_Checkpoints(write_path, label_name)
+        self.old_scenes: dict[tuple[bytes, bytes], tuple] = {}
+        self.write_path = write_path
+        # the last label, only open while lines are compiled
+        self.old_file = None
+        if reuse and (checkpoint := self.checkpoints.load()):
+            self.old_body_start, self.old_objs, old_scenes = checkpoint
+            for scene_hash, state_in, *old_scene in old_scenes:
+                self.old_scenes[(scene_hash, state_in)] = old_scene
+        # every scene compiled: (scene_hash, state_in, offset, state_out,
+        # counts, num_checked, messages, chrctrs)
+        self.scenes: list[tuple] = []
+        self.scene_lines: list[str] = []
+        self.scene_hash = hashlib.sha256()
+        self.scene_messages: list[tuple] = []
+        self.scene_chrctrs: dict[tuple[str, str], None] = {}
+        self.qar.diagnosis_message = self.diagnosis_message
+        self.coh.add_chrctr = self.add_chrctr
+        # the state the last scene left, which is only set once a scene
+        # after a copied scene has to be compiled
+        self.state: bytes = None
+        self.state_set: bool = True
+        self.start_keys: set[tuple[str, str]] = set()
+        self.num_copied: int = 0
+        self.must_recompile: bool = False
+        # what writing counted up, added up over every scene
+        self.images_used = Registry()
+        self.audio_used = Registry()
+        self.lines_narrated: int = 0
+        self.chrctr_counts: dict[tuple[str, str], list] = {}
+        self.image_lines: dict[str, int] = {}
+        self.audio_lines: dict[str, int] = {}
+    
+    def diagnosis_message(self, diagnosis: Line_Class, line_num: int, line: str = '') -> Quality_Assurance_Message:
+        # Every message is kept for the scene by its diagnosis, so it can
+        # be found again on any line the scene moves to
+        message = Quality_Assurance_Reporter.diagnosis_message(self.qar, diagnosis, line_num, line)
+        if message is not None:
+            self.scene_messages.append((diagnosis.kind, diagnosis.groups, line_num, message.column))
+        return message
+    
+    def add_chrctr(self, chrct_name: str, kind: str = 'AVL') -> None:
+        # Every character discovered is kept for the scene, whether or
+        # not an earlier scene discovered them first
+        self.scene_chrctrs[(chrct_name, kind)] = None
+        Character_Object_Handler.add_chrctr(self.coh, chrct_name, kind)
+    
+    def get_state(self) -> tuple:
+        # Everything the passes read, made only of values marshal keeps
+        # in the same bytes whenever they are equal
+        lexer = self.lexer
+        qar = self.qar
+        rh = self.rh
+        coh = self.coh
+        rsh = self.rsh
+        sch = self.sch
+        tsh = self.tsh
+        chrctrs = tuple(sorted((chrctr, kind, attr.is_onscreen, attr.last_prnth) for (chrctr, kind), attr in coh.chrctr_table.items() if attr.is_onscreen or attr.last_prnth))
+        return ((lexer.in_script, lexer.is_spkng, lexer.wrote_empty),
+                (self.qa_done, qar.no_start, qar.no_end),
+                (self.dscv_done, coh.in_script, coh.in_bubl, coh.in_nvl, coh.dscv_spkng),
+                self.emit_done,
+                (rh.in_script, rh.wrote_empty, rh.image_num, rh.voice_next),
+                (coh.is_spkng, coh.curr_chrct, coh.curr_extnt, coh.curr_prnth, chrctrs),
+                (rsh.in_snap, rsh.in_idle, rsh.in_bubl, rsh.in_nvl),
+                (sch.is_atl, sch.last_headr, sch.curr_trnstn),
+                (tsh.is_active, tsh.curr_case, tsh.curr_cond, tsh.line_count, tsh.tag_prefix, tsh.tag_suffix))
+    
+    def set_state(self, state: tuple) -> None:
+        # Characters that are neither on screen nor have a parenthetical
+        # are left out of the table, so a scene looks up the same 
+        # characters for the first time whatever came before it
+        lexer = self.lexer
+        qar = self.qar
+        rh = self.rh
+        coh = self.coh
+        rsh = self.rsh
+        sch = self.sch
+        tsh = self.tsh
+        lexer_state, qar_state, dscv_state, self.emit_done, rh_state, coh_state, rsh_state, sch_state, tsh_state = state
+        lexer.in_script, lexer.is_spkng, lexer.wrote_empty = lexer_state
+        self.qa_done, qar.no_start, qar.no_end = qar_state
+        self.dscv_done, coh.in_script, coh.in_bubl, coh.in_nvl, coh.dscv_spkng = dscv_state
+        rh.in_script, rh.wrote_empty, rh.image_num, rh.voice_next = rh_state
+        coh.is_spkng, coh.curr_chrct, coh.curr_extnt, coh.curr_prnth, chrctrs = coh_state
+        self.set_table(((chrctr, kind), is_onscreen, last_prnth) for chrctr, kind, is_onscreen, last_prnth in chrctrs)
+        rsh.in_snap, rsh.in_idle, rsh.in_bubl, rsh.in_nvl = rsh_state
+        sch.is_atl, sch.last_headr, sch.curr_trnstn = sch_state
+        tsh.is_active, tsh.curr_case, tsh.curr_cond, tsh.line_count, tsh.tag_prefix, tsh.tag_suffix = tsh_state
+    
+    def set_table(self, chrctrs: Iterable[tuple]) -> None:
+        # Starts a scene from a table of only the characters the state
+        # keeps, with nothing counted yet
+        chrctr_table = self.coh.chrctr_table = Character_Table()
+        for key, is_onscreen, last_prnth in chrctrs:
+            chrctr_table.set_onscreen(key, is_onscreen).last_prnth = last_prnth
+        self.start_keys = set(chrctr_table)
+    
+    def take_counts(self, scene_start: int) -> tuple:
+        # Returns what writing the scene counted up, starting the next
+        # scene from nothing, with a table of only the characters the
+        # state keeps. Every character first looked up in the scene is
+        # kept, as the report lists characters in the order they were
+        # first looked up. The line every name was first used on is kept
+        # by its line within the scene, which starts after scene_start
+        chrctr_table = self.coh.chrctr_table
+        chrctrs = []
+        unkept = []
+        for key, attr in chrctr_table.items():
+            if attr.lines_spoken or attr.sprites_used or key not in self.start_keys:
+                chrctrs.append((key[0], key[1], attr.lines_spoken, tuple(attr.sprites_used)))
+                attr.lines_spoken = 0
+                attr.sprites_used = Registry()
+            if not (attr.is_onscreen or attr.last_prnth):
+                unkept.append(key)
+        for key in unkept:
+            chrctr_table.discard(key)
+        self.start_keys = set(chrctr_table)
+        rr = self.rr
+        image_lines = tuple((image, line_num-scene_start) for image, line_num in rr.image_lines.items())
+        audio_lines = tuple((audio_name, line_num-scene_start) for audio_name, line_num in rr.audio_lines.items())
+        counts = (tuple(rr.images_used), tuple(rr.audio_used), rr.lines_narrated, tuple(chrctrs), image_lines, audio_lines)
+        rr.images_used = Registry()
+        rr.audio_used = Registry()
+        rr.lines_narrated = 0
+        rr.image_lines = {}
+        rr.audio_lines = {}
+        return counts
+    
+    def add_counts(self, counts: tuple, scene_start: int) -> None:
+        images_used, audio_used, lines_narrated, chrctrs, image_lines, audio_lines = counts
+        for image, line_offset in image_lines:
+            self.image_lines.setdefault(image, scene_start+line_offset)
+        for audio_name, line_offset in audio_lines:
+            self.audio_lines.setdefault(audio_name, scene_start+line_offset)
+        for image in images_used:
+            self.images_used.add(image)
+        for audio_name in audio_used:
+            self.audio_used.add(audio_name)
+        self.lines_narrated += lines_narrated
+        for chrctr, kind, lines_spoken, sprites_used in chrctrs:
+            chrctr_count = self.chrctr_counts.setdefault((chrctr, kind), [0, Registry()])
+            chrctr_count[0] += lines_spoken
+            for sprite in sprites_used:
+                chrctr_count[1].add(sprite)
+    
+    def put_counts(self) -> None:
+        # Gives the report everything counted, in a table that looks up
+        # characters in the same order a full compile did
+        self.rr.images_used = self.images_used
+        self.rr.audio_used = self.audio_used
+        self.rr.lines_narrated = self.lines_narrated
+        self.rr.image_lines = self.image_lines
+        self.rr.audio_lines = self.audio_lines
+        chrctr_table = Character_Table()
+        for key, (lines_spoken, sprites_used) in self.chrctr_counts.items():
+            chrctr_attr = chrctr_table.set_onscreen(key, self.coh.chrctr_table[key].is_onscreen)
+            chrctr_attr.last_prnth = self.coh.chrctr_table[key].last_prnth
+            chrctr_attr.lines_spoken = lines_spoken
+            chrctr_attr.sprites_used = sprites_used
+        self.coh.chrctr_table = chrctr_table
+    
+    def compile_scene(self) -> tuple:
+        # Returns how many lines quality assurance checked, the messages
+        # it found by their line within the scene, and the characters
+        # discovered
+        lex_line = self.lexer.lex_line
+        compile_statement = self.compile_statement
+        first_line = self.qar.line_num
+        self.scene_messages = []
+        self.scene_chrctrs = {}
+        for line in self.scene_lines:
+            if not compile_statement(lex_line(line), line): break
+        messages = tuple((kind, groups, line_num-first_line, column) for kind, groups, line_num, column in self.scene_messages)
+        return self.qar.line_num-first_line, messages, tuple(self.scene_chrctrs)
+    
+    def copy_scene(self, old_offset: int, length: int, num_checked: int, messages: tuple, chrctrs: tuple) -> None:
+        qar = self.qar
+        self.old_file.seek(self.old_body_start+old_offset)
+        self.body.append(self.old_file.read(length).decode('utf-8'))
+        for kind, groups, line_offset, column in messages:
+            message = Quality_Assurance_Reporter.diagnosis_message(qar, Line_Class(kind, groups), qar.line_num+line_offset)
+            message.column = column
+            qar.add_message(message)
+        qar.line_num += num_checked
+        self.line_num += len(self.scene_lines)
+        for chrctr, kind in chrctrs:
+            Character_Object_Handler.add_chrctr(self.coh, chrctr, kind)
+        self.num_copied += 1
+    
+    def end_scene(self) -> None:
+        # The state a copied scene left is only set once a scene has to
+        # be compiled, so a run of copied scenes never sets it
+        if not self.scene_lines:
+            return
+        scene_hash = self.scene_hash.digest()
+        if self.state is None:
+            self.state = marshal.dumps(self.get_state())
+        state_in = self.state
+        offset = self.body.tell()
+        scene_start = self.line_num
+        old_scene = self.old_scenes.get((scene_hash, state_in))
+        if old_scene is not None:
+            old_offset, length, state_out, counts, num_checked, messages, chrctrs = old_scene
+            self.copy_scene(old_offset, length, num_checked, messages, chrctrs)
+            self.state_set = False
+        else:
+            if not self.state_set:
+                self.set_state(marshal.loads(state_in))
+                self.state_set = True
+            num_checked, messages, chrctrs = self.compile_scene()
+            counts = self.take_counts(scene_start)
+            state_out = marshal.dumps(self.get_state())
+        self.state = state_out
+        self.add_counts(counts, scene_start)
+        self.scenes.append((scene_hash, state_in, offset, state_out, counts, num_checked, messages, chrctrs))
+        self.scene_lines = []
+        self.scene_hash = hashlib.sha256()
+    
+    def keeps_objs(self) -> bool:
+        # True when no character's object name changed, so every copied
+        # scene still names the Character Objects of the label
+        for old_objs, new_objs in zip(self.old_objs, self.get_objs()):
+            for chrctr, obj_name in old_objs:
+                if new_objs.get(chrctr) != obj_name:
+                    return False
+        return True
+    
+    def get_objs(self) -> tuple:
+        return (self.coh.avl_objs, self.coh.bubl_objs, self.coh.nvl_objs)
+    
+    def read_scenes(self, lines: Iterable[str]) -> None:
+        scene_starts = self.scene_starts
+        classify = self.scene_lcl.classify
+        clean_str = self.rh.clean_str
+        in_script = False
+        for line in lines:
+            kind = None
+            if line.lstrip().startswith(scene_starts):
+                kind = classify(clean_str(line), in_script).kind
+                if kind == Line_Kinds.scene_headr:
+                    self.end_scene()
+                elif kind == Line_Kinds.script_beg:
+                    in_script = True
+            self.scene_hash.update(line.encode('utf-8'))
+            self.scene_lines.append(line)
+            if kind == Line_Kinds.script_end: break
+        self.end_scene()
+    
+    def compile_lines(self, lines: Iterable[str]) -> None:
+        # Scenes are only copied from the last label while it is open
+        if self.old_scenes:
+            with open(self.write_path, 'rb') as old_file:
+                try:
+                    self.old_file = old_file
+                    self.read_scenes(lines)
+                finally:
+                    old_file.close()
+                    self.old_file = None
+        else:
+            self.read_scenes(lines)
+        if self.num_copied and not self.keeps_objs():
+            self.must_recompile = True
+            return
+        if not self.state_set:
+            self.set_state(marshal.loads(self.state))
+        self.put_counts()
+        self.finish()
+    
+    def compile_file(read_path: str, write_path: str, label_name: str, quiet: bool = False, shared_objs: dict[str, dict[str, str]] = None):
+        # Compiles the script again without copying any scene when the
+        # copied scenes name Character Objects that were renamed
+        rm = Scene_Run_Manager(label_name, quiet, write_path)
+        if shared_objs is not None:
+            rm.share_objs(shared_objs)
+        with Run_Manager.open_path(read_path, 'r') as read_file:
+            rm.compile_lines(read_file)
+        if rm.must_recompile:
+            rm = Scene_Run_Manager(label_name, quiet, write_path, reuse=False)
+            if shared_objs is not None:
+                rm.share_objs(shared_objs)
+            with Run_Manager.open_path(read_path, 'r') as read_file:
+                rm.compile_lines(read_file)
+        return rm
+    
+    def write_label(self, write_file) -> None:
+        # Where every scene ends up in the label is found before it is
+        # written, as the deferred lines written between them move them
+        body_start = sum(len(block.encode('utf-8')) for block in self.iter_header())
+        body_end = self.body.tell()
+        deferred = self.body.deferred
+        num_deferred = 0
+        deferred_size = 0
+        offsets = []
+        for scene in self.scenes + [(None, None, body_end)]:
+            while num_deferred < len(deferred) and deferred[num_deferred][0] <= scene[2]:
+                deferred_size += len(deferred[num_deferred][1].encode('utf-8'))
+                num_deferred += 1
+            offsets.append(scene[2]+deferred_size)
+        byte_counter = Byte_Counter(write_file, hashlib.sha256())
+        super().write_label(byte_counter)
+        scenes = tuple((scene_hash, state_in, offset, end-offset, *scene) for (scene_hash, state_in, _, *scene), offset, end in zip(self.scenes, offsets, offsets[1:]))
+        chrctr_objs = tuple(tuple(objs.items()) for objs in self.get_objs())
+        self.checkpoints.save(byte_counter.digest.hexdigest(), body_start, chrctr_objs, scenes)
 
 '''
 ******************************************************************
@@ -1253,9 +2878,15 @@ class Argv_Parser:
         self.parser._optionals.title = 'arguments' # risky line of code, can break ArgumentParser in a future update
         
         # flags for file arguments, stored as stirng values
-        self.parser.add_argument('-r', '--read', dest='READ', help='(REQUIRED) set file program will read from', required=True)
-        self.parser.add_argument('-w', '--write', dest='WRITE', help='(REQUIRED) set file program will write to', required=True)
+        self.parser.add_argument('-r', '--read', dest='READ', help='(REQUIRED) set file program will read from, or - for stdin', required=True)
+        self.parser.add_argument('-w', '--write', dest='WRITE', help='(REQUIRED) set file program will write to, or - for stdout', required=True)
         self.parser.add_argument('-l', '--label', dest='LABEL', help='(REQUIRED) set label name in rpy file', required=True)
+        
+        # flags for program options, stored as boolean values
+        self.parser.add_argument('-c', '--counts', dest='COUNTS', help='print how many lines of each kind were found', action='store_true')
+        self.parser.add_argument('-s', '--statement-cache', dest='CACHE', help='keep the lexed script in a file next to it, so it is not lexed again until it changes', action='store_true')
+        self.parser.add_argument('-p', '--profile', dest='PROFILE', help='write a JSON profile of the run to a file, or - for stdout')
+        self.parser.add_argument('-i', '--incremental', dest='INCREMENTAL', help='only write the scenes that changed since the label was last written, splicing in the rest', action='store_true')
 
 '''
 ******************************************************************
@@ -1318,8 +2949,10 @@ class Argv_Handler:
         return None
     
     def check_args(args: argparse.Namespace) -> None:
-        File_Validator.is_valid_file(args.READ, '.txt', 'r')
-        File_Validator.is_valid_file(args.WRITE, '.rpy', 'w')
+        if args.READ != '-':
+            File_Validator.is_valid_file(args.READ, '.txt', 'r')
+        if args.WRITE != '-':
+            File_Validator.is_valid_file(args.WRITE, '.rpy', 'w')
         return None
 
 def main():
@@ -1327,7 +2960,11 @@ def main():
     args = arg_parse.parser.parse_args()
     ts = Text_Style_Handler()
     Argv_Handler.check_args(args)
-    Run_Manager.run(args.READ, args.WRITE, args.LABEL)
+    rm = Run_Manager.run(args.READ, args.WRITE, args.LABEL, cache_statements=args.CACHE, profile=args.PROFILE is not None, incremental=args.INCREMENTAL)
+    if args.COUNTS:
+        rm.lcl.print_counts()
+    if args.PROFILE is not None:
+        rm.write_profile(args.PROFILE)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
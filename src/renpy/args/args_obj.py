@@ -5,6 +5,15 @@ class Args_Object:
         self.game_dir: str = ''
         self.read_file: str = ''
         self.write_file: str = ''
+        self.read_dir: str = ''
+        self.jobs: int = 0
+        self.force: bool = False
+        self.profile: str = ''
+        self.watch: bool = False
+        self.incremental: bool = False
+        self.check: bool = False
+        self.report_format: str = 'md'
+        self.scripts: list[str] = []
         
         self.file_prepend = ''
         self.file_append = 'return'
@@ -19,11 +28,23 @@ class Args_Object:
     
     def print(self):
         print('working in Ren\'Py Game Directory \''+self.game_dir+'\'')
+        if self.read_dir:
+            print('to write a label for every script in directory \''+self.read_dir+'\'')
+            return
         print('to write file \''+self.write_file+'.rpy'+'\'')
         print('by reading from file \''+self.read_file+'\'')
         
     def argparse_populate(self, args: argparse.Namespace):
         self.game_dir = args.GAME
-        self.read_file = args.READ
-        self.write_file = args.WRITE
+        self.read_file = args.READ or ''
+        self.write_file = args.WRITE or ''
+        self.read_dir = args.READ_DIR or ''
+        self.jobs = args.JOBS
+        self.force = args.FORCE
+        self.profile = args.PROFILE or ''
+        self.watch = args.WATCH
+        self.incremental = args.INCREMENTAL
+        self.check = args.CHECK
+        self.report_format = args.REPORT
+        self.scripts = args.SCRIPTS
     
\ No newline at end of file
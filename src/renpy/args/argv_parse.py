@@ -30,7 +30,38 @@ class Argv_Parser:
         self.parser._optionals.title = 'arguments' # risky line of code, can break ArgumentParser in a future update
         
         # flags for file arguments, stored as string values
-        self.parser.add_argument('-g', '--game-directory', dest='GAME', help='(REQUIRED) set the Ren\'Py project game directory', required=True)
-        self.parser.add_argument('-w', '--write-file', dest='WRITE', help='(REQUIRED) set file program will write to AND code label (must be unique)', required=True)
-        self.parser.add_argument('-r', '--read-file', dest='READ', help='(REQUIRED) set file program will read from', required=True)
+        self.parser.add_argument('-g', '--game-directory', dest='GAME', help='(REQUIRED WITHOUT --check) set the Ren\'Py project game directory')
+        self.parser.add_argument('-w', '--write-file', dest='WRITE', help='(REQUIRED WITH -r) set file program will write to AND code label (must be unique)')
+        self.parser.add_argument('-r', '--read-file', dest='READ', help='(REQUIRED WITHOUT -d) set file program will read from')
+        self.parser.add_argument('-d', '--read-directory', dest='READ_DIR', help='compile every script in a directory into its own label in the game directory')
+        
+        # flags for program options
+        self.parser.add_argument('-j', '--jobs', dest='JOBS', help='set how many scripts are compiled at once with -d (default: one per CPU)', type=int, default=0)
+        self.parser.add_argument('-f', '--force', dest='FORCE', help='compile every script again, even those unchanged since they were last compiled', action='store_true')
+        self.parser.add_argument('-W', '--watch', dest='WATCH', help='keep running, and compile scripts again whenever they are saved', action='store_true')
+        self.parser.add_argument('-i', '--incremental', dest='INCREMENTAL', help='only compile the scenes of a script that changed since its label was written', action='store_true')
+        self.parser.add_argument('-p', '--profile', dest='PROFILE', help='write a JSON profile of every script compiled to a file, or - for stdout (add -f to profile unchanged scripts)')
+        self.parser.add_argument('-R', '--report-format', dest='REPORT', help='write label reports as md, json or csv, and with -d a project report adding them up (default: md)', choices=['md', 'json', 'csv'], default='md')
+        self.parser.add_argument('--check', dest='CHECK', help='only check scripts, writing every error and warning as JSON Lines to stdout, and exit with 1 if there were errors', action='store_true')
+        
+        # scripts to check, as a pre-commit hook passes them
+        self.parser.add_argument('SCRIPTS', help='scripts to check with --check, along with those of -r and -d', nargs='*')
+    
+    def parse_args(self) -> argparse.Namespace:
+        args = self.parser.parse_args()
+        if args.CHECK:
+            if args.READ is None and args.READ_DIR is None and not args.SCRIPTS:
+                self.parser.error('argument --check: give the scripts to check, or -r/--read-file or -d/--read-directory')
+            return args
+        if args.SCRIPTS:
+            self.parser.error('scripts can only be given on their own with --check')
+        if args.GAME is None:
+            self.parser.error('the following arguments are required: -g/--game-directory')
+        if args.READ_DIR is None and (args.READ is None or args.WRITE is None):
+            self.parser.error('the following arguments are required: -r/--read-file and -w/--write-file, or -d/--read-directory')
+        if args.READ_DIR is not None and args.READ is not None:
+            self.parser.error('argument -d/--read-directory: not allowed with argument -r/--read-file')
+        if args.PROFILE is not None and args.INCREMENTAL:
+            self.parser.error('argument -p/--profile: not allowed with argument -i/--incremental, as the scenes an incremental build copies are not compiled')
+        return args
         
\ No newline at end of file
@@ -0,0 +1 @@
+__all__ =['build_assets', 'build_batch', 'build_cache', 'build_check', 'build_report', 'build_shared', 'build_watch']
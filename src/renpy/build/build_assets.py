@@ -0,0 +1,230 @@
+from collections.abc import Iterable
+import json
+import os
+import re
+
+'''
+******************************************************************
+Asset_Index is a class that indexes the images and audio of a
+Ren'Py game directory by the names a label uses them by. Files under
+the images directory are named as Ren'Py names them: their file name
+without its extension, in lower case, the first word being the tag
+and the rest its attributes, in any order. Files under the audio
+directory are named as the audio namespace names them, and image,
+layeredimage and define audio statements of the .rpy files anywhere
+in the game directory are indexed as well. The index is kept in a
+file in the game directory, along with the time every directory and
+.rpy file was last modified, so only what changed since is scanned
+again. Checking a name takes the same time however many assets the
+game has, and a label is only checked again once an asset it uses
+is added or removed. Scripts the compiler writes to the game
+directory itself, such as the placeholders of Shared_Scripts, can
+be left out.
+'''
+class Asset_Index:
+    index_name: str = '.text2code_assets.json'
+    index_format: int = 1
+    image_dir: str = 'images'
+    audio_dir: str = 'audio'
+    image_extensions: set[str] = {'.png', '.jpg', '.jpeg', '.webp', '.avif', '.svg'}
+    audio_extensions: set[str] = {'.ogg', '.opus', '.mp3', '.wav', '.flac', '.mp2'}
+    # directories Ren'Py writes to, which hold no assets
+    skipped_dirs: set[str] = {'cache', 'saves'}
+    image_definition: re.Pattern = re.compile(r'^[ \t]*(image|layeredimage)[ \t]+([A-Za-z0-9_][\w \t]*?)[ \t]*[=:]', re.MULTILINE)
+    audio_definition: re.Pattern = re.compile(r'^[ \t]*define[ \t]+audio\.(\w+)[ \t]*=', re.MULTILINE)
+    
+    def __init__(self, game_dir: str, skipped_scripts: Iterable[str] = ()) -> None:
+        self.game_dir = game_dir
+        # .rpy files of the game directory that are not read
+        self.skipped_scripts: set[str] = set(skipped_scripts)
+        self.index_path = os.path.join(game_dir, self.index_name)
+        # every directory by its path from the game directory: when it
+        # was modified, its subdirectories, and the assets it holds
+        self.dirs: dict[str, dict] = {}
+        # what the index maps names to, built the first time a name is
+        # checked
+        self.images: dict[str, str] = None
+        self.image_tags: dict[str, str] = None
+        self.audio: dict[str, str] = None
+        self.num_scanned: int = 0
+        self.load()
+    
+    def image_name(self, name: str) -> str:
+        words = name.lower().split()
+        return ' '.join(words[:1]+sorted(words[1:]))
+    
+    def audio_name(self, name: str) -> str:
+        name = re.sub(r'\W', '_', name.lower(), flags=re.ASCII)
+        return '_'+name if name[:1].isdigit() else name
+    
+    def load(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as read_file:
+                try:
+                    index = json.load(read_file)
+                finally:
+                    read_file.close()
+        except (OSError, ValueError):
+            return # an unreadable index only means everything is scanned
+        if index.get('format') == self.index_format:
+            self.dirs = index.get('dirs', {})
+    
+    def save(self) -> None:
+        index = {'format': self.index_format, 'dirs': self.dirs}
+        temp_path = self.index_path+'.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as write_file:
+            try:
+                json.dump(index, write_file, indent=1, sort_keys=True)
+            finally:
+                write_file.close()
+        os.replace(temp_path, self.index_path)
+    
+    def refresh(self) -> None:
+        # Scans every directory modified since it was indexed, and every
+        # .rpy file modified since it was read. Any other directory is
+        # only looked at for when it was modified
+        dirs = {}
+        pending = ['']
+        while pending:
+            rel_dir = pending.pop()
+            try:
+                mtime = os.stat(os.path.join(self.game_dir, rel_dir)).st_mtime_ns
+            except OSError:
+                continue
+            entry = self.dirs.get(rel_dir)
+            if entry is None or entry['mtime'] != mtime:
+                entry = self.scan_dir(rel_dir, mtime, entry)
+            else:
+                for file_name in entry['scripts']:
+                    entry['scripts'][file_name] = self.read_script(rel_dir, file_name, entry['scripts'][file_name])
+            dirs[rel_dir] = entry
+            pending.extend(self.join(rel_dir, sub_dir) for sub_dir in entry['subdirs'])
+        self.dirs = dirs
+        self.images = self.image_tags = self.audio = None
+    
+    def join(self, rel_dir: str, name: str) -> str:
+        # paths in the index always use '/'
+        return rel_dir+'/'+name if rel_dir else name
+    
+    def in_dir(self, rel_dir: str, asset_dir: str) -> bool:
+        return rel_dir == asset_dir or rel_dir.startswith(asset_dir+'/')
+    
+    def scan_dir(self, rel_dir: str, mtime: int, old_entry: dict = None) -> dict:
+        # .rpy files that were not modified are not read again
+        old_scripts = old_entry['scripts'] if old_entry is not None else {}
+        entry = {'mtime': mtime, 'subdirs': [], 'images': {}, 'audio': {}, 'scripts': {}}
+        in_images = self.in_dir(rel_dir, self.image_dir)
+        in_audio = self.in_dir(rel_dir, self.audio_dir)
+        self.num_scanned += 1
+        try:
+            dir_entries = list(os.scandir(os.path.join(self.game_dir, rel_dir)))
+        except OSError:
+            return entry
+        for dir_entry in dir_entries:
+            name = dir_entry.name
+            if dir_entry.is_dir():
+                if not name.startswith('.') and name not in self.skipped_dirs:
+                    entry['subdirs'].append(name)
+                continue
+            stem, extension = os.path.splitext(name)
+            extension = extension.lower()
+            if extension == '.rpy':
+                if not rel_dir and name in self.skipped_scripts:
+                    continue
+                entry['scripts'][name] = self.read_script(rel_dir, name, old_scripts.get(name))
+            elif in_images and extension in self.image_extensions and stem.strip():
+                entry['images'].setdefault(self.image_name(stem), self.join(rel_dir, name))
+            elif in_audio and extension in self.audio_extensions and stem.strip():
+                entry['audio'].setdefault(self.audio_name(stem), self.join(rel_dir, name))
+        return entry
+    
+    def read_script(self, rel_dir: str, file_name: str, old_script: dict = None) -> dict:
+        # Returns the images, layered image tags and audio a .rpy file
+        # defines, reading it again only when it was modified
+        script_path = os.path.join(self.game_dir, rel_dir, file_name)
+        try:
+            mtime = os.stat(script_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if old_script is not None and old_script['mtime'] == mtime:
+            return old_script
+        script = {'mtime': mtime, 'images': [], 'tags': [], 'audio': []}
+        try:
+            with open(script_path, 'r', encoding='utf-8', errors='replace') as read_file:
+                try:
+                    text = read_file.read()
+                finally:
+                    read_file.close()
+        except OSError:
+            return script
+        for statement, name in self.image_definition.findall(text):
+            if statement == 'image':
+                script['images'].append(self.image_name(name))
+            else:
+                script['tags'].append(name.lower().strip())
+        script['audio'] = [self.audio_name(name) for name in self.audio_definition.findall(text)]
+        return script
+    
+    def build_maps(self) -> None:
+        # Files in the asset directories come before definitions, and
+        # the first file of a name found is the one it maps to
+        images = {}
+        image_tags = {}
+        audio = {}
+        for rel_dir, entry in self.dirs.items():
+            for name, file_path in entry['images'].items():
+                images.setdefault(name, file_path)
+            for name, file_path in entry['audio'].items():
+                audio.setdefault(name, file_path)
+        for rel_dir, entry in self.dirs.items():
+            for file_name, script in entry['scripts'].items():
+                script_path = self.join(rel_dir, file_name)
+                for name in script['images']:
+                    images.setdefault(name, script_path)
+                for tag in script['tags']:
+                    image_tags.setdefault(tag, script_path)
+                for name in script['audio']:
+                    audio.setdefault(name, script_path)
+        self.images = images
+        self.image_tags = image_tags
+        self.audio = audio
+    
+    def image_file(self, name: str) -> str:
+        # Returns the file that shows the image name, or None. Any image
+        # of a layered image's tag is shown by the file defining it
+        if self.images is None:
+            self.build_maps()
+        name = self.image_name(name)
+        file_path = self.images.get(name)
+        if file_path is None:
+            file_path = self.image_tags.get(name.split(' ', 1)[0])
+        return file_path
+    
+    def audio_file(self, name: str) -> str:
+        if self.audio is None:
+            self.build_maps()
+        return self.audio.get(self.audio_name(name))
+    
+    def has_image(self, name: str) -> bool:
+        return self.image_file(name) is not None
+    
+    def has_audio(self, name: str) -> bool:
+        return self.audio_file(name) is not None
+    
+    def found(self, images: Iterable[str], audio: Iterable[str]) -> dict[str, dict[str, bool]]:
+        # Returns whether the index has every image and audio name a
+        # label uses, which is all a check of the label depends on
+        return {'images': {image: self.has_image(image) for image in images},
+                'audio': {audio_name: self.has_audio(audio_name) for audio_name in audio}}
+    
+    def is_unchanged(self, found: dict[str, dict[str, bool]]) -> bool:
+        # Whether every name of found, as found returned it for a label,
+        # is still found or missing
+        return found is not None and self.found(found['images'], found['audio']) == found
+    
+    def print_summary(self) -> None:
+        if self.images is None:
+            self.build_maps()
+        print(' - assets: '+str(len(self.images))+' image(s), '+str(len(self.audio))+' audio file(s), '+str(self.num_scanned)+' director(ies) scanned')
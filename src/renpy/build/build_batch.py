@@ -0,0 +1,267 @@
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import re
+import traceback
+
+from src.old_prog import Run_Manager, Profiled_Run_Manager, Quality_Assurance_Message, Quality_Assurance_Reporter
+from src.renpy.build.build_assets import Asset_Index
+from src.renpy.build.build_cache import Build_Cache
+from src.renpy.build.build_report import Project_Report
+from src.renpy.build.build_shared import Shared_Scripts
+from src.renpy.read.read_registry import Reader_Registry
+
+'''
+******************************************************************
+Build_Result is a class that stores everything a build of a single
+script reports back: where it was read from and written to, the
+errors and warnings found by quality assurance, and how many lines
+were spoken, along with the profile of the build when it was
+profiled. A build also reports the object name of every character,
+and the sprites and locations it used, for Shared_Scripts, and keeps
+its label report so a Project_Report can be made without reading the
+script again. A checked build keeps which of the images and audio
+its label uses were found, so the Build_Cache can tell when the
+assets that matter to it change. Only plain values are stored so a
+Build_Result can be sent back from a worker process.
+'''
+class Build_Result:
+    def __init__(self, read_path: str, write_path: str, label_name: str) -> None:
+        self.read_path = read_path
+        self.write_path = write_path
+        self.label_name = label_name
+        self.failure: str = ''
+        # the traceback of a failure the script itself could not cause
+        self.traceback: str = ''
+        self.error: Quality_Assurance_Message = None
+        self.warnings: list[Quality_Assurance_Message] = []
+        self.lines_narrated: int = 0
+        self.lines_spoken: dict[str, int] = {}
+        self.cached: bool = False
+        self.profile: dict = None
+        self.report: dict = None
+        self.characters: list[tuple[str, str, str]] = []
+        self.sprites: list[str] = []
+        self.locations: list[str] = []
+        self.assets: dict[str, dict[str, bool]] = None
+    
+    def fail(self, exc: Exception) -> None:
+        # The compiler raises a plain Exception for a script it cannot
+        # compile, and a script that cannot be read raises an OSError or
+        # a UnicodeError. Anything else is a bug, so its traceback is kept
+        self.failure = type(exc).__name__+': '+str(exc)
+        if not (type(exc) is Exception or isinstance(exc, (OSError, UnicodeError))):
+            self.traceback = traceback.format_exc()
+    
+    def collect(self, rm: Run_Manager) -> None:
+        self.error = rm.qar.error
+        self.warnings = rm.qar.warnings
+        self.lines_narrated = rm.rr.lines_narrated
+        self.report = rm.report
+        for chrctr in rm.coh.all_chrctr:
+            self.lines_spoken[chrctr] = rm.coh.chrctr_table.count_lines(chrctr)
+        for kind, objs in rm.coh.speech_objs():
+            self.characters.extend((chrctr, kind, obj_name) for chrctr, obj_name in objs.items())
+        self.sprites = list(rm.sprites_used())
+        self.locations = [image for image in rm.rr.images_used if image.startswith('bg ')]
+        if isinstance(rm, Profiled_Run_Manager):
+            self.profile = rm.profile()
+    
+    def to_dict(self) -> dict:
+        return {'error': vars(self.error) if self.error else None,
+                'warnings': [vars(warning) for warning in self.warnings],
+                'lines_narrated': self.lines_narrated,
+                'lines_spoken': self.lines_spoken,
+                'report': self.report,
+                'assets': self.assets}
+    
+    def from_dict(self, result: dict) -> None:
+        if result['error']:
+            self.error = Quality_Assurance_Message(**result['error'])
+        self.warnings = [Quality_Assurance_Message(**warning) for warning in result['warnings']]
+        self.lines_narrated = result['lines_narrated']
+        self.lines_spoken = result['lines_spoken']
+        self.report = result.get('report')
+        self.assets = result.get('assets')
+
+'''
+******************************************************************
+build_script compiles one script into its label file. It is a
+module level function so worker processes can run it, and any
+exception is stored in the result instead of ending the whole batch,
+with its traceback when the script could not have caused it.
+Scripts that are not plain text are read by their reader from
+Reader_Registry, and always compiled in full. A checked build
+reports every asset its label uses that the Asset_Index saved in the
+game directory does not have. Given shared_objs, characters are named
+by the object names of the project instead of by the label alone.
+The label report is written as report_format into report_dir.
+'''
+def build_script(read_path: str, write_path: str, label_name: str, quiet: bool = True, profile: bool = False, incremental: bool = False, check_assets: bool = False, shared_objs: dict[str, dict[str, str]] = None, report_format: str = 'md', report_dir: str = '') -> Build_Result:
+    result = Build_Result(read_path, write_path, label_name)
+    try:
+        read_statements = Reader_Registry.read_statements(read_path)
+        assets = Asset_Index(os.path.dirname(write_path) or '.') if check_assets else None
+        rm = Run_Manager.run(read_path, write_path, label_name, quiet, profile=profile, incremental=incremental, read_statements=read_statements, assets=assets, shared_objs=shared_objs, report_format=report_format, report_dir=report_dir)
+        result.collect(rm)
+        if assets is not None:
+            result.assets = assets.found(list(rm.rr.images_used)+result.sprites, rm.rr.audio_used)
+    except Exception as exc:
+        result.fail(exc)
+    return result
+
+'''
+******************************************************************
+Batch_Builder is a class that compiles every script found in a
+directory into its own label file in the Ren'Py game directory.
+Scripts are compiled across a pool of worker processes, while
+results always come back in the sorted order of the script names.
+Each label is named after its script. Scripts that have not
+changed since they were last compiled are skipped using the game
+directory's Build_Cache. A profiled batch profiles every script it
+compiles, and an incremental batch only compiles the scenes of a 
+script that changed. The images and audio of the game directory are
+indexed again before every batch, and every label is checked against
+them, so a script is compiled again once an asset its label uses
+is added or removed. Characters, sprites and locations are defined
+once for the whole game directory by its Shared_Scripts. Labels
+compiled at once name new characters on their own, and a label
+whose name for a new character was taken by a label before it is
+compiled again. Label reports are written as report_format into
+report_dir, the game directory unless another is given, and the
+reports of a whole batch are added up into a Project_Report
+written beside them.
+'''
+class Batch_Builder:
+    def __init__(self, read_dir: str, game_dir: str, jobs: int = 0, force: bool = False, profile: bool = False, incremental: bool = False, shared_script_names: tuple[str, str, str] = ('characters.rpy', 'sprites.rpy', 'locations.rpy'), report_format: str = 'md', report_dir: str = None) -> None:
+        self.read_dir = read_dir
+        self.game_dir = game_dir
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self.cache = Build_Cache(game_dir, force)
+        self.assets = Asset_Index(game_dir, shared_script_names)
+        self.shared = Shared_Scripts(game_dir, *shared_script_names)
+        self.profile = profile
+        self.incremental = incremental
+        self.report_format = report_format
+        self.report_dir = report_dir if report_dir is not None else game_dir
+    
+    def format_label(self, file_name: str) -> str:
+        label_name = re.sub(r'\W', '_', os.path.splitext(file_name)[0]).lower()
+        if not label_name or label_name[0].isdigit():
+            label_name = 'label_'+label_name
+        return label_name
+    
+    def plan(self) -> list[tuple[str, str, str]]:
+        builds = []
+        used_labels = {}
+        for read_path in Reader_Registry.find_scripts(self.read_dir):
+            label_name = self.format_label(os.path.basename(read_path))
+            if label_name in used_labels:
+                raise Exception('INVALID BATCH: files \"'+used_labels[label_name]+'\" and \"'+read_path+'\" would both write label \"'+label_name+'\"')
+            used_labels[label_name] = read_path
+            builds.append((read_path, os.path.join(self.game_dir, label_name+'.rpy'), label_name))
+        return builds
+    
+    def build(self, builds: list[tuple[str, str, str]] = None, quiet: bool = True) -> list[Build_Result]:
+        if builds is None:
+            builds = self.plan()
+        self.assets.refresh()
+        self.assets.save()
+        self.cache.shared_id = self.shared.project_id
+        self.cache.report_format = self.report_format
+        self.cache.report_dir = self.report_dir
+        results: list[Build_Result] = [None] * len(builds)
+        stale: list[int] = []
+        for index, (read_path, write_path, label_name) in enumerate(builds):
+            cached = self.cache.lookup(read_path, write_path, label_name, self.assets)
+            if cached is None:
+                stale.append(index)
+                continue
+            results[index] = Build_Result(read_path, write_path, label_name)
+            results[index].from_dict(cached)
+            results[index].cached = True
+        if self.jobs == 1 or len(stale) <= 1:
+            built = [self.build_shared(builds[index], quiet) for index in stale]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.jobs, len(stale))) as executor:
+                stale_builds = list(zip(*[builds[index] for index in stale]))
+                shared_objs = [self.shared.objs]*len(stale)
+                built = list(executor.map(build_script, *stale_builds, [quiet]*len(stale), [self.profile]*len(stale), [self.incremental]*len(stale), [True]*len(stale), shared_objs, [self.report_format]*len(stale), [self.report_dir]*len(stale)))
+            for position, result in enumerate(built):
+                if not result.failure and not self.share(result):
+                    built[position] = self.build_shared(builds[stale[position]], quiet)
+        for index, result in zip(stale, built):
+            results[index] = result
+            if result.failure:
+                self.cache.discard(result.read_path)
+            else:
+                self.cache.store(result.read_path, result.write_path, result.label_name, result.to_dict())
+        self.cache.save()
+        self.shared.prune()
+        self.shared.write(self.assets)
+        self.shared.save()
+        return results
+    
+    def share(self, result: Build_Result) -> bool:
+        return self.shared.merge(result.label_name, result.write_path, result.characters, result.sprites, result.locations)
+    
+    def build_shared(self, build: tuple[str, str, str], quiet: bool = True) -> Build_Result:
+        # Compiles a script in this process, by the object names every
+        # label compiled before it has been given
+        result = build_script(*build, quiet, self.profile, self.incremental, True, self.shared.objs, self.report_format, self.report_dir)
+        if not result.failure and not self.share(result):
+            result.failure = 'INVALID BUILD: label \"'+result.label_name+'\" named a character by a name another character has'
+        return result
+    
+    def print_results(self, results: list[Build_Result]) -> None:
+        qar = Quality_Assurance_Reporter()
+        for result in results:
+            if result.failure:
+                print(result.label_name+': FAILED ('+result.failure+')')
+                if result.traceback:
+                    print('  '+result.traceback.rstrip().replace('\n', '\n  '))
+                continue
+            if result.cached:
+                print(result.label_name+': \''+result.write_path+'\' is up to date with '+str(len(result.warnings))+' warning(s)')
+            else:
+                print(result.label_name+': wrote \''+result.write_path+'\' with '+str(len(result.warnings))+' warning(s)')
+            if result.error:
+                print('  '+qar.format_message(result.error).replace('\n', '\n  '))
+    
+    def print_summary(self, results: list[Build_Result]) -> None:
+        failed = errors = warnings = narrated = spoken = 0
+        characters = set()
+        for result in results:
+            if result.failure:
+                failed += 1
+                continue
+            if result.error:
+                errors += 1
+            warnings += len(result.warnings)
+            narrated += result.lines_narrated
+            spoken += sum(result.lines_spoken.values())
+            characters.update(result.lines_spoken)
+        print('BATCH SUMMARY:')
+        print(' - '+str(len(results)-failed)+' of '+str(len(results))+' script(s) compiled into \''+self.game_dir+'\' using '+str(min(self.jobs, max(len(results), 1)))+' worker(s)')
+        print(' - '+str(failed)+' failed, '+str(errors)+' with errors, '+str(warnings)+' warning(s)')
+        print(' - '+str(narrated)+' line(s) narrated, '+str(spoken)+' line(s) spoken by '+str(len(characters))+' character(s)')
+        self.cache.print_summary()
+        self.assets.print_summary()
+        self.shared.print_summary()
+    
+    def write_report(self, results: list[Build_Result]) -> str:
+        # Adds up the reports of every label that was built, and returns
+        # the path of the project report
+        project_report = Project_Report()
+        for result in results:
+            if result.report is not None:
+                project_report.merge(result.report)
+        return project_report.write(self.report_format, self.report_dir)
+    
+    def write_profile(self, results: list[Build_Result], write_path: str) -> None:
+        # Scripts that were up to date were not compiled, so they have
+        # no profile. write_path may be '-' to write to stdout
+        profiles = {'scripts': [result.profile for result in results if result.profile]}
+        with Run_Manager.open_path(write_path, 'w') as write_file:
+            json.dump(profiles, write_file, indent=2)
+            write_file.write('\n')
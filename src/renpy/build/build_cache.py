@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+
+from src.old_prog import Statement_Cache
+
+'''
+******************************************************************
+Build_Cache is a class that keeps a manifest of every script built
+into a Ren'Py game directory. For each script the manifest records
+a hash of its contents, the options it was built with and the
+version of the compiler that built it, along with what the build
+reported. A script whose hash, options and compiler all match and
+whose label file and report still exist does not need to be built
+again.
+The options include the project of the Shared_Scripts its characters
+were named by, and the format and directory its report was written
+as and into. Given the Asset_Index of the game directory, a script
+is only built again for its assets once an image or audio name its
+label uses is added or removed, not whenever any asset of the game
+is.
+The compiler version is a hash of the source of every module that
+decides what a label holds: the compiler itself, the readers of
+every script format and the build modules. Any change to them
+invalidates every entry.
+'''
+class Build_Cache:
+    manifest_name: str = '.text2code_manifest.json'
+    src_dir: str = os.path.join(os.path.dirname(__file__), '..', '..')
+    # modules, and directories of modules, that decide the output
+    compiler_paths: list[str] = ['old_prog.py', os.path.join('renpy', 'read'), os.path.join('renpy', 'build')]
+    
+    def __init__(self, game_dir: str, force: bool = False) -> None:
+        self.manifest_path = os.path.join(game_dir, self.manifest_name)
+        self.force = force
+        self.shared_id: str = ''
+        self.report_format: str = 'md'
+        self.report_dir: str = ''
+        self.tool_version = self.hash_compiler()
+        self.entries: dict[str, dict] = {}
+        self.digests: dict[str, str] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self.load()
+    
+    def hash_compiler(self) -> str:
+        digest = hashlib.sha256()
+        for compiler_path in self.compiler_paths:
+            compiler_path = os.path.join(self.src_dir, compiler_path)
+            if os.path.isdir(compiler_path):
+                module_paths = [os.path.join(compiler_path, file_name) for file_name in sorted(os.listdir(compiler_path)) if file_name.endswith('.py')]
+            else:
+                module_paths = [compiler_path]
+            for module_path in module_paths:
+                digest.update(os.path.basename(module_path).encode('utf-8')+b'\0')
+                digest.update(Statement_Cache.hash_file(module_path).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def entry_key(self, read_path: str) -> str:
+        return os.path.abspath(read_path)
+    
+    def report_path(self, label_name: str) -> str:
+        return os.path.join(self.report_dir, label_name.lower()+'_report.'+self.report_format)
+    
+    def options(self, write_path: str, label_name: str) -> dict:
+        return {'write_path': os.path.abspath(write_path), 'label_name': label_name, 'shared': self.shared_id, 'report': self.report_format, 'report_dir': os.path.abspath(self.report_dir)}
+    
+    def load(self) -> None:
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as read_file:
+                try:
+                    manifest = json.load(read_file)
+                finally:
+                    read_file.close()
+        except (OSError, ValueError):
+            return # an unreadable manifest only means everything is rebuilt
+        if manifest.get('tool_version') == self.tool_version:
+            self.entries = manifest.get('entries', {})
+    
+    def save(self) -> None:
+        manifest = {'tool_version': self.tool_version, 'entries': self.entries}
+        temp_path = self.manifest_path+'.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as write_file:
+            try:
+                json.dump(manifest, write_file, indent=1, sort_keys=True)
+            finally:
+                write_file.close()
+        os.replace(temp_path, self.manifest_path)
+    
+    def lookup(self, read_path: str, write_path: str, label_name: str, assets = None) -> dict:
+        # Returns the reported results of the last build if it is still
+        # up to date, otherwise None. Given assets, the Asset_Index the
+        # build is checked against, the assets the label uses must be
+        # found as they were
+        key = self.entry_key(read_path)
+        digest = Statement_Cache.hash_file(read_path)
+        self.digests[key] = digest
+        entry = self.entries.get(key)
+        if not self.force and entry is not None \
+            and entry['digest'] == digest \
+            and entry['options'] == self.options(write_path, label_name) \
+            and os.path.exists(write_path) \
+            and os.path.exists(self.report_path(label_name)) \
+            and (assets is None or assets.is_unchanged(entry['result'].get('assets'))):
+            self.hits += 1
+            return entry['result']
+        self.misses += 1
+        return None
+    
+    def store(self, read_path: str, write_path: str, label_name: str, result: dict) -> None:
+        key = self.entry_key(read_path)
+        self.entries[key] = \
+            {'digest': self.digests[key],
+             'options': self.options(write_path, label_name),
+             'result': result}
+    
+    def discard(self, read_path: str) -> None:
+        self.entries.pop(self.entry_key(read_path), None)
+    
+    def print_summary(self) -> None:
+        print(' - cache: '+str(self.hits)+' hit(s), '+str(self.misses)+' miss(es)'+(' (forced rebuild)' if self.force else ''))
@@ -0,0 +1,82 @@
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import sys
+
+from src.old_prog import QA_Keywords, Quality_Assurance_Message, Quality_Assurance_Reporter, Script_Lexer
+from src.renpy.read.read_registry import Reader_Registry
+
+'''
+******************************************************************
+check_script lints one script, running quality assurance alone: no
+character is discovered and no label is written. Every error and
+warning is found, instead of stopping at the first error, and each
+is returned as a dict of its file, line and column, ready to be
+dumped as a JSON line. It is a module level function so worker
+processes can run it, and a script that cannot be read is reported
+as an error of its own instead of ending the whole check.
+'''
+def check_script(read_path: str) -> list[dict]:
+    qar = Quality_Assurance_Reporter(check_all=True)
+    try:
+        read_statements = Reader_Registry.read_statements(read_path)
+        if read_statements is not None:
+            qar.check_statements(read_statements(read_path, Script_Lexer(qar.lcl)))
+        else:
+            qar.get_messages(read_path)
+    except Exception as exc:
+        failure = Quality_Assurance_Message(QA_Keywords.error_type, type(exc).__name__+': '+str(exc), 'Make sure the script can be read.')
+        return [format_message(read_path, failure)]
+    messages = sorted(qar.errors+qar.warnings, key=lambda message: (message.line_num, message.column))
+    return [format_message(read_path, message) for message in messages]
+
+def format_message(read_path: str, message: Quality_Assurance_Message) -> dict:
+    return {'file': read_path,
+            'line': message.line_num,
+            'column': message.column,
+            'severity': message.msg_type.lower(),
+            'message': message.msg_text,
+            'tip': message.msg_tip}
+
+'''
+******************************************************************
+Script_Checker is a class that lints scripts without compiling
+them, across a pool of worker processes, and writes what it found
+as JSON Lines, one line for every error and warning. Scripts are
+checked in chunks, so checking many small scripts is not slowed
+down by sending each one to a worker on its own, while results
+always come back in the order the scripts were given. A directory
+is checked for every script whose format is registered.
+'''
+class Script_Checker:
+    # scripts sent to a worker at once
+    chunk_size: int = 8
+    
+    def __init__(self, read_paths: list[str], jobs: int = 0) -> None:
+        self.read_paths = read_paths
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    
+    def check(self) -> list[list[dict]]:
+        # Returns the messages of every script, in the order given
+        if self.jobs == 1 or len(self.read_paths) <= 1:
+            return [check_script(read_path) for read_path in self.read_paths]
+        jobs = min(self.jobs, len(self.read_paths))
+        chunk_size = max(1, min(self.chunk_size, len(self.read_paths)//jobs))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return list(executor.map(check_script, self.read_paths, chunksize=chunk_size))
+    
+    def write(self, results: list[list[dict]], write_file = None) -> None:
+        if write_file is None:
+            write_file = sys.stdout
+        for messages in results:
+            for message in messages:
+                write_file.write(json.dumps(message)+'\n')
+    
+    def count(self, results: list[list[dict]], severity: str) -> int:
+        return sum(1 for messages in results for message in messages if message['severity'] == severity)
+    
+    def print_summary(self, results: list[list[dict]]) -> None:
+        # Printed to stderr, so only JSON Lines are written to stdout
+        errors = self.count(results, QA_Keywords.error_type.lower())
+        warnings = self.count(results, QA_Keywords.warn_type.lower())
+        print('checked '+str(len(results))+' script(s): '+str(errors)+' error(s), '+str(warnings)+' warning(s)', file=sys.stderr)
@@ -0,0 +1,100 @@
+import csv
+import json
+import os
+
+'''
+******************************************************************
+Project_Report is a class that adds up the reports of every label of
+a batch into a single report for the whole game. Every label report
+is merged once, as the batch hands them over, into running totals
+of the lines every character spoke, the labels they spoke in and the
+sprites they used, along with every image and audio file used and
+how many errors and warnings were found. The reports of labels that
+were up to date come from the Build_Cache, so no script is read
+again. The report is written as JSON, CSV or markdown.
+'''
+class Project_Report:
+    report_name: str = 'project-report'
+    csv_fields: list[str] = ['character', 'lines_spoken', 'labels', 'sprites_used']
+    
+    def __init__(self) -> None:
+        # the totals of every label by its name
+        self.labels: dict[str, dict] = {}
+        self.lines_narrated: int = 0
+        # lines spoken, labels and sprites of every character
+        self.characters: dict[str, dict] = {}
+        self.images: dict[str, None] = {}
+        self.audio: dict[str, None] = {}
+        self.num_errors: int = 0
+        self.num_warnings: int = 0
+    
+    def merge(self, report: dict) -> None:
+        # Adds a label report, as Run_Reporter.to_dict made it
+        lines_spoken = 0
+        for chrctr, chrctr_report in report['characters'].items():
+            totals = self.characters.setdefault(chrctr, {'lines_spoken': 0, 'labels': [], 'sprites': {}})
+            totals['lines_spoken'] += chrctr_report['lines_spoken']
+            totals['labels'].append(report['label'])
+            totals['sprites'].update(dict.fromkeys(chrctr_report['sprites']))
+            lines_spoken += chrctr_report['lines_spoken']
+        self.lines_narrated += report['lines_narrated']
+        self.images.update(dict.fromkeys(report['images']))
+        self.audio.update(dict.fromkeys(report['audio']))
+        self.num_errors += report['error'] is not None
+        self.num_warnings += len(report['warnings'])
+        self.labels[report['label']] = \
+            {'lines_narrated': report['lines_narrated'],
+             'lines_spoken': lines_spoken,
+             'error': report['error'] is not None,
+             'warnings': len(report['warnings'])}
+    
+    def to_dict(self) -> dict:
+        return {'labels': self.labels,
+                'lines_narrated': self.lines_narrated,
+                'characters': {chrctr: {'lines_spoken': totals['lines_spoken'], 'labels': totals['labels'], 'sprites': list(totals['sprites'])}
+                               for chrctr, totals in self.characters.items()},
+                'images': list(self.images),
+                'audio': list(self.audio),
+                'errors': self.num_errors,
+                'warnings': self.num_warnings}
+    
+    def write(self, report_format: str = 'json', report_dir: str = '') -> str:
+        # Returns the path of the file written into report_dir, or the 
+        # working directory when it is empty
+        write_path = os.path.join(report_dir, self.report_name+'.'+report_format)
+        with open(write_path, 'w', encoding='utf-8', newline='' if report_format == 'csv' else None) as write_file:
+            try:
+                if report_format == 'json':
+                    json.dump(self.to_dict(), write_file, indent=2)
+                    write_file.write('\n')
+                elif report_format == 'csv':
+                    self.write_csv(write_file)
+                else:
+                    self.write_markdown(write_file)
+            finally:
+                write_file.close()
+        return write_path
+    
+    def write_csv(self, write_file) -> None:
+        # A row for every character, the narrator first
+        writer = csv.writer(write_file)
+        writer.writerow(self.csv_fields)
+        writer.writerow(['NARRATOR', self.lines_narrated, sum(1 for label in self.labels.values() if label['lines_narrated']), 0])
+        for chrctr, totals in self.characters.items():
+            writer.writerow([chrctr, totals['lines_spoken'], len(totals['labels']), len(totals['sprites'])])
+    
+    def write_markdown(self, write_file) -> None:
+        write_file.write('# Report for Ren\'Py Project: '+str(len(self.labels))+' label(s)')
+        write_file.write('\n\n## Quality Assurance:')
+        write_file.write('\n* '+str(self.num_errors)+' label(s) with errors, '+str(self.num_warnings)+' warning(s)')
+        write_file.write('\n\n## Characters:')
+        write_file.write('\n* NARRATOR spoke '+str(self.lines_narrated)+' time(s).')
+        for chrctr, totals in self.characters.items():
+            write_file.write('\n* '+chrctr+' spoke '+str(totals['lines_spoken'])+' time(s) in '+str(len(totals['labels']))+' label(s), using '+str(len(totals['sprites']))+' sprite(s).')
+        write_file.write('\n\n## Images Used:')
+        for image in self.images:
+            write_file.write('\n* '+image)
+        write_file.write('\n\n## Audio Used:')
+        for audio_name in self.audio:
+            write_file.write('\n* '+audio_name)
+        write_file.write('\n')
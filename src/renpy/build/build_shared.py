@@ -0,0 +1,172 @@
+import json
+import os
+import re
+import uuid
+
+'''
+******************************************************************
+Shared_Scripts is a class that keeps the characters, sprites and
+locations of every label in a Ren'Py game directory, and writes them
+to scripts shared by every label. A character is given its object
+name the first time any label is compiled with them, and keeps it
+for good, so no two characters of the project ever share a name and
+every label names a character the same way. The names are kept in a
+file in the game directory, along with what every label last used,
+so compiling a label only updates what that label uses. Characters
+are defined once in the character script instead of every time a
+label is entered. Sprites and locations that have no file in the
+game directory are defined as placeholders in the sprite and location
+scripts, so the game runs before every image is drawn. A shared
+script is only written when what it defines has changed.
+'''
+class Shared_Scripts:
+    registry_name: str = '.text2code_shared.json'
+    registry_format: int = 1
+    default_locations_path: str = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'data', 'default_locations.rpy')
+    script_header: str = '# Written by text2code for every label in this directory, any change will be overwritten\n'
+    speech_kinds: dict[str, str] = {'AVL': '', 'BUBBLE': ',kind=bubble', 'NVL': ',kind=nvl'}
+    # names of sprites and locations that can be defined by an image
+    # statement
+    image_name: re.Pattern = re.compile(r'^[A-Za-z_]\w*(?: \w+)*$', re.ASCII)
+    
+    def __init__(self, game_dir: str, character_script_name: str = 'characters.rpy', sprite_script_name: str = 'sprites.rpy', location_script_name: str = 'locations.rpy') -> None:
+        self.game_dir = game_dir
+        self.registry_path = os.path.join(game_dir, self.registry_name)
+        self.script_names: tuple[str, str, str] = (character_script_name, sprite_script_name, location_script_name)
+        # changes whenever the names are started over, so labels named
+        # by the old names are compiled again
+        self.project_id: str = ''
+        # object name of every character by speech style and character
+        self.objs: dict[str, dict[str, str]] = {kind: {} for kind in self.speech_kinds}
+        self.used_names: set[str] = set()
+        # the label file, characters, sprites and locations of every
+        # label by its name
+        self.labels: dict[str, dict] = {}
+        self.num_written: int = 0
+        self.load()
+    
+    def load(self) -> None:
+        if os.path.exists(self.registry_path):
+            try:
+                with open(self.registry_path, 'r', encoding='utf-8') as read_file:
+                    try:
+                        registry = json.load(read_file)
+                    finally:
+                        read_file.close()
+            except (OSError, ValueError):
+                registry = {} # an unreadable registry only means names start over
+            if registry.get('format') == self.registry_format:
+                self.project_id = registry.get('project_id', '')
+                for kind, objs in registry.get('objs', {}).items():
+                    self.objs.setdefault(kind, {}).update(objs)
+                self.labels = registry.get('labels', {})
+        if not self.project_id:
+            self.project_id = uuid.uuid4().hex
+        self.used_names = {obj_name for objs in self.objs.values() for obj_name in objs.values()}
+    
+    def save(self) -> None:
+        registry = {'format': self.registry_format, 'project_id': self.project_id, 'objs': self.objs, 'labels': self.labels}
+        temp_path = self.registry_path+'.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as write_file:
+            try:
+                json.dump(registry, write_file, indent=1, sort_keys=True)
+            finally:
+                write_file.close()
+        os.replace(temp_path, self.registry_path)
+    
+    def merge(self, label_name: str, write_path: str, characters: list[tuple[str, str, str]], sprites: list[str], locations: list[str]) -> bool:
+        # Keeps what a label was compiled with. Returns False, keeping
+        # nothing, when the label named a character by an object name
+        # another character has since been given, as it was compiled
+        # alongside a label that named a character first
+        new_objs = {}
+        for chrctr, kind, obj_name in characters:
+            shared_name = self.objs[kind].get(chrctr)
+            if shared_name is None:
+                if obj_name in self.used_names or obj_name in new_objs:
+                    return False
+                new_objs[obj_name] = (chrctr, kind)
+            elif shared_name != obj_name:
+                return False
+        for obj_name, (chrctr, kind) in new_objs.items():
+            self.objs[kind][chrctr] = obj_name
+            self.used_names.add(obj_name)
+        self.labels[label_name] = \
+            {'write_path': os.path.abspath(write_path),
+             'characters': [[chrctr, kind] for chrctr, kind, obj_name in characters],
+             'sprites': list(sprites),
+             'locations': list(locations)}
+        return True
+    
+    def prune(self) -> None:
+        # Forgets every label whose file is gone. The object names of its
+        # characters are still kept
+        for label_name in [label_name for label_name, label in self.labels.items() if not os.path.exists(label['write_path'])]:
+            del self.labels[label_name]
+    
+    def collect(self, key: str) -> list:
+        # Returns what every label uses under key, in the order labels
+        # are named and then used it, without repeats
+        collected = {}
+        for label_name in sorted(self.labels):
+            for item in self.labels[label_name][key]:
+                collected.setdefault(tuple(item) if isinstance(item, list) else item, None)
+        return list(collected)
+    
+    def character_script(self) -> str:
+        lines = [self.script_header]
+        for chrctr, kind in self.collect('characters'):
+            lines.append('define '+self.objs[kind][chrctr]+' = Character(name=\''+chrctr.title()+'\''+self.speech_kinds[kind]+')\n')
+        return ''.join(lines)
+    
+    def image_script(self, images: list[str], assets = None) -> str:
+        # Images shown by a file of the game directory are left to it
+        lines = []
+        for image in images:
+            if self.image_name.match(image) and (assets is None or not assets.has_image(image)):
+                lines.append('image '+image+' = Placeholder()\n')
+        return ''.join(lines)
+    
+    def sprite_script(self, assets = None) -> str:
+        return self.script_header+self.image_script(self.collect('sprites'), assets)
+    
+    def location_script(self, assets = None) -> str:
+        with open(self.default_locations_path, 'r', encoding='utf-8') as read_file:
+            try:
+                default_locations = read_file.read().rstrip('\n')+'\n'
+            finally:
+                read_file.close()
+        return self.script_header+default_locations+'\n'+self.image_script(self.collect('locations'), assets)
+    
+    def write_script(self, script_name: str, script: str) -> None:
+        script_path = os.path.join(self.game_dir, script_name)
+        try:
+            with open(script_path, 'r', encoding='utf-8') as read_file:
+                try:
+                    if read_file.read() == script:
+                        return
+                finally:
+                    read_file.close()
+        except OSError:
+            pass
+        temp_path = script_path+'.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as write_file:
+            try:
+                write_file.write(script)
+            finally:
+                write_file.close()
+        os.replace(temp_path, script_path)
+        self.num_written += 1
+    
+    def write(self, assets = None) -> None:
+        # Writes the shared scripts from every label kept. Given assets,
+        # the Asset_Index of the game directory, sprites and locations it
+        # has files for are not defined
+        character_script_name, sprite_script_name, location_script_name = self.script_names
+        self.write_script(character_script_name, self.character_script())
+        self.write_script(sprite_script_name, self.sprite_script(assets))
+        self.write_script(location_script_name, self.location_script(assets))
+    
+    def print_summary(self) -> None:
+        print(' - shared: '+str(len(self.collect('characters')))+' character(s), '+str(len(self.collect('sprites')))+' sprite(s), '
+              +str(len(self.collect('locations')))+' location(s), '+str(self.num_written)+' script(s) written')
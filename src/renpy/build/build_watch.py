@@ -0,0 +1,105 @@
+import os
+import time
+
+from src.old_prog import Regular_Expressions
+from src.renpy.build.build_batch import Batch_Builder, Build_Result
+
+'''
+******************************************************************
+Script_Watcher is a class that keeps a Batch_Builder running,
+compiling scripts again as soon as they are saved. Scripts are
+watched by polling os.stat, so any editor and file system works.
+A burst of saves is gathered until the scripts have been quiet for
+the debounce time, then only the scripts that changed are compiled.
+Every compile after the first runs in this process, where the
+regular expressions have already been compiled, so a saved script
+is written without paying for a new process. A directory is
+planned again on every poll, so new scripts are picked up as well.
+A script or directory that is moved or deleted while it is watched
+only fails that compile. Any other error ends the watch, as it
+would end a single build.
+'''
+class Script_Watcher:
+    def __init__(self, builder: Batch_Builder, builds: list[tuple[str, str, str]] = None, interval: float = 0.025, debounce: float = 0.05) -> None:
+        self.builder = builder
+        self.builds = builds
+        self.interval = interval
+        self.debounce = debounce
+        self.stats: dict[str, tuple[int, int]] = {}
+    
+    def plan(self) -> list[tuple[str, str, str]]:
+        if self.builds is not None:
+            return self.builds
+        return self.builder.plan()
+    
+    def stat(self, read_path: str) -> tuple[int, int]:
+        try:
+            stat = os.stat(read_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def poll(self, builds: list[tuple[str, str, str]]) -> list[tuple[str, str, str]]:
+        # Returns the builds whose script changed since the last poll
+        changed = []
+        stats = {}
+        for build in builds:
+            stat = self.stat(build[0])
+            if stat is None:
+                continue
+            stats[build[0]] = stat
+            if self.stats.get(build[0]) != stat:
+                changed.append(build)
+        self.stats = stats
+        return changed
+    
+    def warm_up(self) -> None:
+        res = Regular_Expressions()
+        res.init_all()
+        res.init_quality_assurance()
+        res.init_group('objects')
+    
+    def wait(self) -> list[tuple[str, str, str]]:
+        # Blocks until scripts have changed and then stayed unchanged
+        # for the debounce time, and returns every build that changed
+        pending: dict[str, tuple[str, str, str]] = {}
+        quiet_since = None
+        while True:
+            time.sleep(self.interval)
+            try:
+                builds = self.plan()
+            except OSError as exc:
+                print('FAILED ('+str(exc)+')')
+                time.sleep(self.debounce)
+                continue
+            changed = self.poll(builds)
+            now = time.monotonic()
+            if changed:
+                for build in changed:
+                    pending[build[0]] = build
+                quiet_since = now
+            elif pending and now-quiet_since >= self.debounce:
+                return list(pending.values())
+    
+    def build(self, builds: list[tuple[str, str, str]]) -> list[Build_Result]:
+        start = time.perf_counter()
+        try:
+            results = self.builder.build(builds)
+        except OSError as exc:
+            # a script was deleted or moved before it was compiled
+            print('FAILED ('+str(exc)+')')
+            return []
+        results = [result for result in results if not result.cached]
+        if results:
+            self.builder.print_results(results)
+            print(' - compiled '+str(len(results))+' script(s) in '+str(round((time.perf_counter()-start)*1000))+' ms')
+        return results
+    
+    def watch(self) -> None:
+        # Runs until interrupted
+        self.warm_up()
+        self.poll(self.plan())
+        self.builder.jobs = 1
+        print('watching for changes, press Ctrl+C to stop...')
+        while True:
+            self.build(self.wait())
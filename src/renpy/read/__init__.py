@@ -1 +1 @@
-__all__ = ['read_docx', 'read_fdx', 'read_pdf', 'read_raw', 'read_rpy']
\ No newline at end of file
+__all__ = ['read_registry']
\ No newline at end of file
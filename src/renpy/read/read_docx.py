@@ -1 +1,131 @@
-# import docx
\ No newline at end of file
+# Read class for .docx
+
+import xml.etree.ElementTree as xml
+import zipfile
+
+from src.old_prog import Line_Kinds, Script_Lexer
+
+'''
+******************************************************************
+Read_RenPy_DOCX is a class that reads a Word document without any
+library outside the standard one. The body of the document is parsed
+incrementally straight out of the archive, and every paragraph is
+dropped once it has been read, so memory stays the same however many
+pages the document has. A line break within a paragraph starts a new
+line. Paragraphs in one of the screenplay styles of Word are lexed
+as the kind of their style, as Read_RenPy_FDX does, and any other
+paragraph is lexed as a line of a plain text script. Changes tracked
+by Word are read as if they were accepted: deleted text is left out,
+and a paragraph whose mark was deleted runs on into the next one.
+Lines are numbered as the document would be saved as plain text, one
+line for every paragraph and line break, as its XML has no lines of
+its own.
+'''
+class Read_RenPy_DOCX:
+    w: str = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+    # kinds of the paragraph styles, by lowercase style name
+    style_kinds: dict[str, str] = \
+        {'scene heading': Line_Kinds.scene_headr,
+         'character': Line_Kinds.chrct_name,
+         'parenthetical': Line_Kinds.chrct_prnth,
+         'dialogue': Line_Kinds.dialg_line,
+         'transition': Line_Kinds.scene_trans,
+         'action': Line_Kinds.narrt_line}
+    # elements that break the text of a paragraph, other than a run
+    break_tags: set[str] = {w+'tab', w+'br', w+'cr', w+'p'}
+    
+    def __init__(self) -> None:
+        pass
+    
+    def style_names(docx_file: zipfile.ZipFile) -> dict[str, str]:
+        # Returns the lowercase name of every paragraph style by its id
+        w = Read_RenPy_DOCX.w
+        names = {}
+        if 'word/styles.xml' not in docx_file.namelist():
+            return names
+        with docx_file.open('word/styles.xml') as styles_file:
+            for style in xml.parse(styles_file).getroot().iter(w+'style'):
+                name = style.find(w+'name')
+                if style.get(w+'type') == 'paragraph' and name is not None:
+                    names[style.get(w+'styleId')] = name.get(w+'val', '').lower()
+        return names
+    
+    def paragraphs(read_path: str):
+        # Yields the style name, text and line number of every line in the
+        # body of the document, a paragraph of a text box being read as a
+        # line of the paragraph it is anchored in
+        w = Read_RenPy_DOCX.w
+        p_tag = w+'p'
+        ppr_tag = w+'pPr'
+        style_tag = w+'pStyle'
+        mark_del_path = w+'rPr/'+w+'del'
+        val_attr = w+'val'
+        with zipfile.ZipFile(read_path) as docx_file:
+            style_names = Read_RenPy_DOCX.style_names(docx_file)
+            with docx_file.open('word/document.xml') as read_file:
+                depth: int = 0
+                p_depth: int = 0
+                body = None
+                # the text of paragraphs whose mark was deleted
+                run_on: str = ''
+                line_num: int = 0
+                # only the paragraph being read is kept in the tree
+                for event, elem in xml.iterparse(read_file, ('start', 'end')):
+                    if event == 'start':
+                        depth += 1
+                        if depth == 2:
+                            body = elem
+                        elif elem.tag == p_tag:
+                            p_depth += 1
+                        continue
+                    depth -= 1
+                    if elem.tag == p_tag:
+                        p_depth -= 1
+                        if p_depth == 0:
+                            style_name = None
+                            ppr = elem.find(ppr_tag)
+                            text = run_on+Read_RenPy_DOCX.paragraph_text(elem)
+                            if ppr is not None and ppr.find(mark_del_path) is not None:
+                                run_on = text
+                            else:
+                                run_on = ''
+                                if ppr is not None and (style := ppr.find(style_tag)) is not None:
+                                    style_name = style_names.get(style.get(val_attr))
+                                for line in text.split('\n'):
+                                    line_num += 1
+                                    yield style_name, line, line_num
+                    if depth == 2:
+                        body.clear()
+    
+    def paragraph_text(paragraph) -> str:
+        # Text deleted with tracked changes is left out, as it is kept
+        # apart from the text of the document
+        w = Read_RenPy_DOCX.w
+        t_tag = w+'t'
+        text = []
+        for elem in paragraph.iter():
+            tag = elem.tag
+            if tag == t_tag:
+                text.append(elem.text or '')
+            elif tag in Read_RenPy_DOCX.break_tags:
+                if tag == w+'tab':
+                    text.append('\t')
+                elif tag != w+'p':
+                    if elem.get(w+'type', 'textWrapping') == 'textWrapping':
+                        text.append('\n')
+                elif elem is not paragraph and text:
+                    text.append('\n')
+        return ''.join(text)
+    
+    def read(read_path: str, lexer: Script_Lexer = None):
+        # Yields the Statements of the document, lexed by lexer
+        if lexer is None:
+            lexer = Script_Lexer()
+        yield from lexer.lex_paragraphs(Read_RenPy_DOCX.typed_paragraphs(read_path))
+    
+    def typed_paragraphs(read_path: str):
+        # Yields the kind, text and line number of every line, the kind
+        # being None for a line without a screenplay style
+        style_kinds = Read_RenPy_DOCX.style_kinds
+        for style_name, text, line_num in Read_RenPy_DOCX.paragraphs(read_path):
+            yield style_kinds.get(style_name), text, line_num
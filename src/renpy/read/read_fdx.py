@@ -1 +1,101 @@
-import xml.etree.ElementTree as xml
\ No newline at end of file
+# Read class for .fdx
+
+import re
+import xml.etree.ElementTree as xml
+
+from src.old_prog import Line_Kinds, Script_Lexer
+
+'''
+******************************************************************
+Read_RenPy_FDX is a class that reads a Final Draft script straight
+into Statements. The XML is parsed incrementally and every paragraph
+is dropped once it has been lexed, so memory stays the same however
+long the script is. Final Draft already gives each paragraph its
+type, so Scene Headers, Character Names, Parentheticals and
+Transitions are lexed as that type instead of being guessed from
+their text, and Action is never mistaken for any of them. Paragraphs
+are laid out as in a plain text script: an empty line comes before
+each one, except within the speech of a character. The (CONT'D)
+Final Draft adds to a Character Name is left out, as it is not an
+extension. Every paragraph is read from the line of the file its
+Paragraph element starts on.
+'''
+class Read_RenPy_FDX:
+    # kinds of the paragraph types, any other type is lexed as narration
+    paragraph_kinds: dict[str, str] = \
+        {'Scene Heading': Line_Kinds.scene_headr,
+         'Character': Line_Kinds.chrct_name,
+         'Parenthetical': Line_Kinds.chrct_prnth,
+         'Dialogue': Line_Kinds.dialg_line,
+         'Transition': Line_Kinds.scene_trans}
+    contd: re.Pattern = re.compile(r"\(\s*CONT[\'\u2019]D\s*\)", re.IGNORECASE)
+    
+    def __init__(self) -> None:
+        pass
+    
+    def events(read_path: str):
+        # Yields every event of the XML with the line of the file it was
+        # found on. The file is fed to the parser a line at a time, and
+        # parsing is never deferred to a later line where it can be
+        parser = xml.XMLPullParser(('start', 'end'))
+        flush = getattr(parser, 'flush', None)
+        with open(read_path, 'rb') as read_file:
+            for line_num, line in enumerate(read_file, 1):
+                parser.feed(line)
+                if flush is not None:
+                    flush()
+                for event, elem in parser.read_events():
+                    yield event, elem, line_num
+        parser.close()
+    
+    def paragraphs(read_path: str):
+        # Yields the type, text and line number of every paragraph in the
+        # body of the script, leaving out the title page and script notes
+        depth: int = 0
+        in_body: bool = False
+        root = content = None
+        # the lines the paragraphs being read start on
+        para_nums: list[int] = []
+        # only the paragraph being read is kept in the tree
+        for event, elem, line_num in Read_RenPy_FDX.events(read_path):
+            if event == 'start':
+                depth += 1
+                if depth == 1:
+                    root = elem
+                elif depth == 2:
+                    in_body = elem.tag == 'Content'
+                    content = elem
+                elif elem.tag == 'Paragraph':
+                    para_nums.append(line_num)
+                continue
+            depth -= 1
+            if elem.tag == 'Paragraph' and depth > 1:
+                para_num = para_nums.pop()
+            if in_body and elem.tag == 'Paragraph':
+                texts = elem.findall('Text')
+                # dual dialogue nests the paragraphs of both speeches
+                if texts or elem.find('.//Paragraph') is None:
+                    text = ''.join([''.join(text.itertext()) for text in texts])
+                    if '\n' in text:
+                        text = ' '.join(text.splitlines())
+                    yield elem.get('Type', ''), text, para_num
+                if depth == 2:
+                    content.clear()
+                else:
+                    elem.clear()
+            elif depth == 1:
+                root.clear()
+    
+    def read(read_path: str, lexer: Script_Lexer = None):
+        # Yields the Statements of the script, lexed by lexer
+        if lexer is None:
+            lexer = Script_Lexer()
+        yield from lexer.lex_paragraphs(Read_RenPy_FDX.typed_paragraphs(read_path))
+    
+    def typed_paragraphs(read_path: str):
+        # Yields the kind, text and line number of every paragraph
+        for para_type, text, line_num in Read_RenPy_FDX.paragraphs(read_path):
+            kind = Read_RenPy_FDX.paragraph_kinds.get(para_type, Line_Kinds.narrt_line)
+            if kind == Line_Kinds.chrct_name and '(' in text:
+                text = Read_RenPy_FDX.contd.sub('', text).rstrip()
+            yield kind, text, line_num
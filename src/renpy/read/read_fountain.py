@@ -0,0 +1,158 @@
+# Read class for .fountain
+
+import re
+
+from src.old_prog import Line_Kinds, Mapped_Script, Regular_Expressions, Script_Lexer
+from src.renpy.read.read_fdx import Read_RenPy_FDX
+
+'''
+******************************************************************
+Read_RenPy_Fountain is a class that lexes a Fountain script by the
+rules of Fountain instead of guessing at its lines as plain text. The
+script is read a line at a time with a single line of lookahead, and
+no line is ever looked at again, so a script is lexed in one pass.
+Boneyard and notes are left out, even when they span lines, along with
+the title page, sections, synopses and page breaks. Scene Headings,
+Character Names, Parentheticals and Transitions are found by where
+they stand, or by the character that forces them, and are lexed as
+that type, while Action, forced or not, is never mistaken for any of
+them. Dual dialogue is read as one speech after the other, and the
+(CONT'D) of a Character Name is left out, as Read_RenPy_FDX does.
+Lines keep the layout they have in the script, so any statement of a
+plain text script can be written in a Fountain script as Action.
+'''
+class Read_RenPy_Fountain:
+    # starts of Scene Headings, with those only Ren'Py scripts have
+    heading: re.Pattern = re.compile(r'(?:INT|EXT|EST|INT\.?/EXT|I/E|LOC|IMG)[\.\s]', re.IGNORECASE)
+    scene_number: re.Pattern = re.compile(r'\s*#[\w\.-]+#$')
+    # starts and ends of boneyard and notes
+    opening: re.Pattern = re.compile(r'/\*|\[\[')
+    closing: dict[str, str] = {'/*': '*/', '[[': ']]'}
+    # first and last characters of the statements of a plain text script
+    statement_ends: set[str] = {'{}', '<>', '[]', '**', '*?'}
+    title_keys: set[str] = {'title', 'credit', 'author', 'authors', 'source', 'draft date', 'date',
+                            'contact', 'copyright', 'notes', 'revision', 'font'}
+    
+    def __init__(self) -> None:
+        pass
+    
+    def uncommented(lines):
+        # Yields the line number of every line and the line without its
+        # boneyard and notes, and without '\n'. A line that was only 
+        # boneyard or notes is left out
+        opening = Read_RenPy_Fountain.opening
+        closing: str = None
+        for line_num, line in enumerate(lines, 1):
+            line = line[:-1] if line[-1:] == '\n' else line
+            if closing is None and '/*' not in line and '[[' not in line:
+                yield line_num, line
+                continue
+            kept = []
+            start: int = 0
+            while start < len(line):
+                if closing is None:
+                    curr_match = opening.search(line, start)
+                    if curr_match is None:
+                        kept.append(line[start:])
+                        break
+                    kept.append(line[start:curr_match.start()])
+                    closing = Read_RenPy_Fountain.closing[curr_match.group()]
+                    start = curr_match.end()
+                else:
+                    end = line.find(closing, start)
+                    if end < 0:
+                        break
+                    closing = None
+                    start = end+2
+            text = ''.join(kept)
+            if text.strip():
+                yield line_num, text
+    
+    def is_name(text: str) -> bool:
+        # A Character Name is upper case but for its extension, and has
+        # at least one letter
+        head = text.partition('(')[0]
+        return text[0].isalnum() and head.upper() == head and head.lower() != head
+    
+    def typed_lines(read_path: str):
+        # Yields the kind, text and line number of every line of the
+        # script, the kind being None for an empty line and the start of
+        # the script
+        fountain = Read_RenPy_Fountain
+        script_beg = Regular_Expressions().script_beg
+        lines = fountain.uncommented(Mapped_Script(read_path))
+        line_num, line = next(lines, (0, None))
+        # the title page is every line before the first empty one
+        if line is not None and line.partition(':')[0].strip().lower() in fountain.title_keys and ':' in line:
+            while line is not None and line.strip():
+                line_num, line = next(lines, (0, None))
+        empty_before: bool = True
+        in_speech: bool = False
+        while line is not None:
+            next_num, next_line = next(lines, (0, None))
+            empty_after = next_line is None or not next_line.strip()
+            text = line.strip()
+            kind = Line_Kinds.narrt_line
+            if not text:
+                # two spaces keep a speech going over an empty line
+                if not (in_speech and line == '  '):
+                    in_speech = False
+                    empty_before = True
+                    yield None, '', line_num
+                line_num, line = next_num, next_line
+                continue
+            if text[0] == '/' and script_beg.match(text):
+                # the lines after the start of the script are read as the
+                # first lines of a file are
+                yield None, line, line_num
+                empty_before = True
+                line_num, line = next_num, next_line
+                continue
+            if in_speech:
+                if text[0] == '(' and text[-1] == ')':
+                    kind = Line_Kinds.chrct_prnth
+                else:
+                    kind = Line_Kinds.dialg_line
+                    line = text[1:].lstrip() if text[0] == '~' else text
+            elif text[0] == '=':
+                # a synopsis or a page break
+                line_num, line = next_num, next_line
+                continue
+            elif text[0] == '#' or text[0]+text[-1] in fountain.statement_ends:
+                # a section or a statement stands before the line it is
+                # about, which still starts after an empty line
+                yield kind, line, line_num
+                line_num, line = next_num, next_line
+                continue
+            elif text[0] in '!~':
+                line = text[1:]
+            elif text[0] == '>':
+                if text[-1] == '<':
+                    line = text[1:-1].strip()
+                else:
+                    kind = Line_Kinds.scene_trans
+                    line = text[1:].lstrip()
+            elif text[0] == '@' or (empty_before and not empty_after and fountain.is_name(text)):
+                kind = Line_Kinds.chrct_name
+                line = text[1:].lstrip() if text[0] == '@' else text
+                if line[-1:] == '^':
+                    # the second speech of dual dialogue
+                    line = line[:-1].rstrip()
+                if '(' in line:
+                    line = Read_RenPy_FDX.contd.sub('', line).rstrip()
+                in_speech = not empty_after
+            elif (text[0] == '.' and text[1:2] != '.') or (empty_after and fountain.heading.match(text)):
+                kind = Line_Kinds.scene_headr
+                line = fountain.scene_number.sub('', text[1:].lstrip() if text[0] == '.' else text)
+            elif empty_before and empty_after and text.endswith('TO:') and text.upper() == text:
+                kind = Line_Kinds.scene_trans
+                line = text
+            yield kind, line, line_num
+            empty_before = False
+            line_num, line = next_num, next_line
+    
+    def read(read_path: str, lexer: Script_Lexer = None):
+        # Yields the Statements of the script, lexed by lexer
+        if lexer is None:
+            lexer = Script_Lexer()
+        yield from lexer.lex_typed_lines(Read_RenPy_Fountain.typed_lines(read_path))
@@ -1 +1,163 @@
-# import pypdf as pdf
\ No newline at end of file
+# Read class for .pdf
+
+import re
+
+try:
+    import pypdf as pdf
+except ImportError:
+    pdf = None
+
+from src.old_prog import Script_Lexer
+from src.renpy.read.read_fdx import Read_RenPy_FDX
+
+'''
+******************************************************************
+Read_RenPy_PDF is a class that reads the lines of a screenplay back
+out of a PDF, using pypdf. Pages are decoded one at a time as the
+lines are asked for, so compiling starts on the first page and only
+one page is ever held as text. The text of a page is extracted in
+its layout, so every line keeps the column it was indented to. The
+lines a paragraph was wrapped into are joined again: a line is only
+the end of a paragraph when the first word of the next line in the
+same column would have fit after it. In the layout of a proportional
+font every letter takes a single column, and the spaces between 
+words grow to keep the words where they were printed, so a word is
+taken to be as much wider than its letters as spaces are wider than
+the single column they take in a monospaced font. After the end of a
+sentence, a capitalised word is only taken to be as wide as its
+letters, as a new paragraph is the likelier of the two there. Page
+numbers, (MORE) and the (CONT'D) of a Character Name continued on a
+new page are left out. A paragraph is read from the line its first
+line has in the text extracted from every page, one after the other.
+'''
+class Read_RenPy_PDF:
+    page_number: re.Pattern = re.compile(r'^\s*(?:PAGE\s+)?\d+\s*\.?\s*$', re.IGNORECASE)
+    more: re.Pattern = re.compile(r'^\s*\(\s*MORE\s*\)\s*$', re.IGNORECASE)
+    
+    def __init__(self) -> None:
+        pass
+    
+    def pages(read_path: str):
+        # Yields the text of every page in its layout. The file is read
+        # as pages need it instead of all at once, and the objects of a
+        # page are dropped once it has been decoded
+        if pdf is None:
+            raise Exception('INVALID READ: reading \"'+read_path+'\" needs pypdf, install it with \'pip install pypdf\'')
+        with open(read_path, 'rb') as read_file:
+            reader = pdf.PdfReader(read_file)
+            for page_index in range(len(reader.pages)):
+                text = reader.pages[page_index].extract_text(extraction_mode='layout')
+                reader.resolved_objects.clear()
+                yield text
+    
+    def page_lines(text: str) -> tuple[int, list[tuple]]:
+        # Returns the index of the first line of a page with words, and
+        # the indent, words, width and average space between words of
+        # every line from it to the last line with words, without the 
+        # page number or (MORE). Spaces are as wide as the layout made 
+        # them. An empty line has no words
+        empty_line = (0, '', 0, 0.0)
+        lines = []
+        for line in text.split('\n'):
+            words = line.split()
+            if not words or Read_RenPy_PDF.more.match(line):
+                lines.append(empty_line)
+                continue
+            stripped = line.strip()
+            width = len(line.rstrip())
+            space = (len(stripped)-sum(map(len, words)))/(len(words)-1) if len(words) > 1 else 1.0
+            lines.append((width-len(stripped), ' '.join(words), width, space))
+        content = [index for index, line in enumerate(lines) if line[1]]
+        for index in sorted({content[0], content[-1]} if content else (), reverse=True):
+            if Read_RenPy_PDF.page_number.match(lines[index][1]):
+                lines[index] = empty_line
+                content.remove(index)
+        return (content[0], lines[content[0]:content[-1]+1]) if content else (0, [])
+    
+    def is_upper(words: str) -> bool:
+        # A line without letters, such as a number, is not upper case
+        return words.upper() == words and words.lower() != words
+    
+    def is_whole(words: str) -> bool:
+        # Character Names, Scene Headers, Transitions and Parentheticals 
+        # are never wrapped, nor joined to the line after them
+        return Read_RenPy_PDF.is_upper(words) or (words[0] == '(' and words[-1] == ')')
+    
+    def word_width(last_words: str, first_word: str, word_scale: float) -> float:
+        # The columns first_word would have taken at the end of the line
+        # before it. After the end of a sentence, a capital letter more
+        # likely starts a paragraph than continues one, so the word is
+        # only taken to be as wide as its letters
+        if last_words[-1] in '.?!' and first_word[0].isupper():
+            return len(first_word)
+        return word_scale*len(first_word)
+    
+    def lines(read_path: str):
+        # Yields the lines of the screenplay as they were written, with
+        # one empty line between blocks
+        for line_num, line in Read_RenPy_PDF.numbered_lines(read_path):
+            yield line
+    
+    def numbered_lines(read_path: str):
+        # Yields the line number and line of every line lines yields. An
+        # empty line added before a block has the number of the block
+        page_start: int = 0
+        para_num: int = 0
+        space_total: float = 0.0
+        space_count: int = 0
+        para: list[str] = []
+        para_indent: int = 0
+        para_width: int = 0
+        para_space: float = 0.0
+        wrote_empty: bool = True
+        for text in Read_RenPy_PDF.pages(read_path):
+            first_index, lines = Read_RenPy_PDF.page_lines(text)
+            column_widths: dict[int, int] = {}
+            for indent, words, width, space in lines:
+                if width > column_widths.get(indent, 0):
+                    column_widths[indent] = width
+                if ' ' in words:
+                    space_total += space
+                    space_count += 1
+            # a space is about half as wide as a letter
+            word_scale = max(1.0, space_total/space_count/2) if space_count else 1.0
+            new_page: bool = True
+            for line_num, (indent, words, width, space) in enumerate(lines, page_start+first_index+1):
+                if not words:
+                    if para:
+                        yield para_num, ' '.join(para)+'\n'
+                        para = []
+                    if not wrote_empty:
+                        yield line_num, '\n'
+                        wrote_empty = True
+                    continue
+                if '(' in words:
+                    words = Read_RenPy_FDX.contd.sub('', words).rstrip()
+                # a wrapped line leaves no room for the next word
+                first_word = words.split(' ', 1)[0]
+                if para and (indent != para_indent or Read_RenPy_PDF.is_whole(para[-1]) or Read_RenPy_PDF.is_whole(words) \
+                        or para_width+para_space+Read_RenPy_PDF.word_width(para[-1], first_word, word_scale) <= column_widths[para_indent]):
+                    yield para_num, ' '.join(para)+'\n'
+                    para = []
+                    # a speech is indented, and continues on a new page 
+                    # without a Character Name
+                    in_speech = indent > 0 and para_indent > 0 and not (Read_RenPy_PDF.is_upper(words) and words[0] != '(')
+                    if new_page and not in_speech:
+                        yield line_num, '\n'
+                if not para:
+                    para_num = line_num
+                para.append(words)
+                para_indent = indent
+                para_width = width
+                para_space = space
+                wrote_empty = False
+                new_page = False
+            page_start += text.count('\n')+1
+        if para:
+            yield para_num, ' '.join(para)+'\n'
+    
+    def read(read_path: str, lexer: Script_Lexer = None):
+        # Yields the Statements of the screenplay, lexed by lexer
+        if lexer is None:
+            lexer = Script_Lexer()
+        yield from lexer.lex_typed_lines((None, line, line_num) for line_num, line in Read_RenPy_PDF.numbered_lines(read_path))
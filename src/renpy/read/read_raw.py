@@ -1,13 +1,18 @@
-# Read class for .txt .fountain and .md
+# Read class for .txt and .md
+
+from src.old_prog import Mapped_Script, Script_Lexer
 
 class Read_RenPy_Raw:
     def __init__(self) -> None:
         pass
     
-    def read(read_path: str):
-        with open(read_path, 'rb', encoding='utf-8') as read_file:
-            try:
-                for line in read_file:
-                    print(line)
-            finally:
-                read_file.close()
\ No newline at end of file
+    def lines(read_path: str):
+        # Yields every line of the script as text, without a byte order
+        # mark and ending in '\n'
+        yield from Mapped_Script(read_path)
+    
+    def read(read_path: str, lexer: Script_Lexer = None):
+        # Yields the Statements of the script, lexed by lexer
+        if lexer is None:
+            lexer = Script_Lexer()
+        yield from lexer.lex(Read_RenPy_Raw.lines(read_path))
\ No newline at end of file
@@ -0,0 +1,104 @@
+# Registry of the read classes, by extension and magic bytes
+
+import importlib
+import os
+import re
+
+'''
+******************************************************************
+Reader_Registry is a class that finds the read class of a script
+from its extension, or from the bytes it starts with when its
+extension is not registered, and only imports the module of a read
+class the first time a script of its format is read. Compiling a
+plain text script never imports the readers of PDF, Word or XML
+scripts, nor what they are built on. Every read class has a
+read(read_path, lexer) that yields the Statements of a script one
+at a time, and the classes of formats read as lines of text also
+have a lines(read_path) that yields them. Plain text is read by
+Run_Manager itself, which is how it can compile a script by scenes.
+'''
+class Reader_Registry:
+    # module and class of the reader of every extension
+    extension_readers: dict[str, tuple[str, str]] = \
+        {'.txt': ('src.renpy.read.read_raw', 'Read_RenPy_Raw'),
+         '.md': ('src.renpy.read.read_raw', 'Read_RenPy_Raw'),
+         '.fountain': ('src.renpy.read.read_fountain', 'Read_RenPy_Fountain'),
+         '.fdx': ('src.renpy.read.read_fdx', 'Read_RenPy_FDX'),
+         '.docx': ('src.renpy.read.read_docx', 'Read_RenPy_DOCX'),
+         '.pdf': ('src.renpy.read.read_pdf', 'Read_RenPy_PDF')}
+    # extension of the format a script starts with, when its own
+    # extension is not registered
+    magic_extensions: list[tuple[re.Pattern, str]] = \
+        [(re.compile(rb'%PDF-'), '.pdf'),
+         (re.compile(rb'PK\x03\x04'), '.docx'),
+         (re.compile(rb'(?:\xef\xbb\xbf)?\s*(?:<\?xml[^>]*\?>\s*)?<FinalDraft[\s>]'), '.fdx')]
+    magic_size: int = 512
+    plain_reader: tuple[str, str] = ('src.renpy.read.read_raw', 'Read_RenPy_Raw')
+    # read classes already imported, by module and class
+    readers: dict[tuple[str, str], type] = {}
+    
+    def __init__(self) -> None:
+        pass
+    
+    def register(extension: str, module_name: str, class_name: str, magic: bytes = None) -> None:
+        # Reads scripts ending in extension with the class_name class of
+        # module_name, which is only imported once one is read. A script
+        # whose extension is not registered and starts with magic is
+        # read by it too
+        extension = extension.lower()
+        Reader_Registry.extension_readers[extension] = (module_name, class_name)
+        if magic:
+            Reader_Registry.magic_extensions.append((re.compile(re.escape(magic)), extension))
+    
+    def extensions() -> list[str]:
+        return list(Reader_Registry.extension_readers)
+    
+    def sniff(read_path: str) -> str:
+        # Returns the extension of the format read_path starts with, or
+        # None when it starts like none of them
+        try:
+            with open(read_path, 'rb') as read_file:
+                head = read_file.read(Reader_Registry.magic_size)
+        except OSError:
+            return None
+        for magic, extension in Reader_Registry.magic_extensions:
+            if magic.match(head):
+                return extension
+        return None
+    
+    def find(read_path: str) -> tuple[str, str]:
+        # Returns the module and class of the reader of read_path, a
+        # script that is in no other format being plain text
+        extension = os.path.splitext(read_path)[1].lower()
+        if extension not in Reader_Registry.extension_readers and read_path != '-':
+            extension = Reader_Registry.sniff(read_path)
+        return Reader_Registry.extension_readers.get(extension, Reader_Registry.plain_reader)
+    
+    def find_scripts(read_dir: str) -> list[str]:
+        # Returns every file of read_dir whose extension is registered,
+        # in the order of their names
+        scripts = []
+        for file_name in sorted(os.listdir(read_dir)):
+            read_path = os.path.join(read_dir, file_name)
+            if os.path.splitext(file_name)[1].lower() in Reader_Registry.extension_readers and os.path.isfile(read_path):
+                scripts.append(read_path)
+        return scripts
+    
+    def load(reader: tuple[str, str]) -> type:
+        if reader not in Reader_Registry.readers:
+            module_name, class_name = reader
+            Reader_Registry.readers[reader] = getattr(importlib.import_module(module_name), class_name)
+        return Reader_Registry.readers[reader]
+    
+    def reader(read_path: str) -> type:
+        # Returns the read class of read_path, importing it if it is the
+        # first of its format
+        return Reader_Registry.load(Reader_Registry.find(read_path))
+    
+    def read_statements(read_path: str):
+        # Returns the read(read_path, lexer) of the reader of read_path,
+        # or None for plain text, which Run_Manager reads itself
+        reader = Reader_Registry.find(read_path)
+        if reader == Reader_Registry.plain_reader:
+            return None
+        return Reader_Registry.load(reader).read
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# the tests import the compiler as __main__.py does, from the repo root
+repo_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if repo_dir not in sys.path:
+    sys.path.insert(0, repo_dir)
+
+@pytest.fixture
+def scripts_dir() -> str:
+    # the bundled scripts of every format
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'basic_scripts')
+
+@pytest.fixture
+def typed_dir() -> str:
+    # scripts of the typed formats that start and end the script, so
+    # every statement of them is compiled
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'typed_scripts')
@@ -0,0 +1,29 @@
+from src.old_prog import Run_Manager
+from src.renpy.build.build_assets import Asset_Index
+
+# a scene used twice, the second time in the last scene
+script: str = '///SCRIPT BEG\\\\\\\n\nINT. DOMUS\n\nBOB\nSalve.\n\nEXT. FORUM\n\nBOB\nAve.\n\nINT. DOMUS\n\nBOB\nVale.\n\n\\\\\\SCRIPT END///\n'
+
+def check_script(tmp_path, text: str, incremental: bool = False) -> list[tuple[str, int, int]]:
+    game_dir = tmp_path / 'game'
+    (game_dir / 'images').mkdir(parents=True, exist_ok=True)
+    (game_dir / 'images' / 'bg ext_forum.png').write_bytes(b'')
+    read_path = tmp_path / 'domus.txt'
+    read_path.write_text(text, encoding='utf-8')
+    assets = Asset_Index(str(game_dir))
+    assets.refresh()
+    rm = Run_Manager.run(str(read_path), str(game_dir / 'domus.rpy'), 'domus', quiet=True, incremental=incremental, assets=assets, report_dir=str(tmp_path))
+    return [(warning.msg_text, warning.line_num, warning.column) for warning in rm.qar.warnings]
+
+def test_missing_asset_first_line(tmp_path):
+    # a missing asset is reported once, on the line it is first used on
+    assert check_script(tmp_path, script) == \
+        [('Missing Image \'bg int_domus\' first used on line 3', 3, 1),
+         ('Missing Sprite \'bob\' first used on line 6', 6, 1)]
+
+def test_copied_scene_lines(tmp_path):
+    # scenes an incremental compile copies report the lines a full
+    # compile does
+    check_script(tmp_path, script, incremental=True)
+    edited = script.replace('Vale.', 'Ave atque vale.')
+    assert check_script(tmp_path, edited, incremental=True) == check_script(tmp_path, edited)
@@ -0,0 +1,53 @@
+from src.renpy.build import build_batch
+from src.renpy.build.build_batch import Batch_Builder, build_script
+
+script: str = '///SCRIPT BEG\\\\\\\n\nINT. DOMUS\n\nBOB\nSalve.\n\n\\\\\\SCRIPT END///\n'
+
+def raise_exc(exc: Exception):
+    def run(*args, **kwargs):
+        raise exc
+    return run
+
+def test_script_failure(tmp_path, monkeypatch):
+    # the compiler's own failures need no traceback
+    monkeypatch.setattr(build_batch.Run_Manager, 'run', raise_exc(Exception('INVALID RUN: bad')))
+    result = build_script(str(tmp_path / 'a.txt'), str(tmp_path / 'a.rpy'), 'a')
+    assert result.failure == 'Exception: INVALID RUN: bad'
+    assert not result.traceback
+
+def test_bug_keeps_traceback(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_batch.Run_Manager, 'run', raise_exc(KeyError('BOB')))
+    result = build_script(str(tmp_path / 'a.txt'), str(tmp_path / 'a.rpy'), 'a')
+    assert result.failure == "KeyError: 'BOB'"
+    assert 'Traceback' in result.traceback and 'raise exc' in result.traceback
+
+def test_missing_script(tmp_path):
+    result = build_script(str(tmp_path / 'missing.txt'), str(tmp_path / 'missing.rpy'), 'missing', report_dir=str(tmp_path))
+    assert result.failure.startswith('FileNotFoundError')
+    assert not result.traceback
+
+def build_dirs(tmp_path):
+    read_dir = tmp_path / 'scripts'
+    game_dir = tmp_path / 'game'
+    read_dir.mkdir()
+    game_dir.mkdir()
+    (read_dir / 'domus.txt').write_text(script, encoding='utf-8')
+    return read_dir, game_dir
+
+def test_cache_hit_and_miss(tmp_path):
+    read_dir, game_dir = build_dirs(tmp_path)
+    assert not Batch_Builder(str(read_dir), str(game_dir), jobs=1).build()[0].cached
+    assert Batch_Builder(str(read_dir), str(game_dir), jobs=1).build()[0].cached
+    # an edited script is built again
+    (read_dir / 'domus.txt').write_text(script.replace('Salve.', 'Ave.'), encoding='utf-8')
+    builder = Batch_Builder(str(read_dir), str(game_dir), jobs=1)
+    assert not builder.build()[0].cached
+    assert (builder.cache.hits, builder.cache.misses) == (0, 1)
+
+def test_cache_missing_report(tmp_path):
+    # a deleted report is written again
+    read_dir, game_dir = build_dirs(tmp_path)
+    Batch_Builder(str(read_dir), str(game_dir), jobs=1).build()
+    (game_dir / 'domus_report.md').unlink()
+    assert not Batch_Builder(str(read_dir), str(game_dir), jobs=1).build()[0].cached
+    assert (game_dir / 'domus_report.md').exists()
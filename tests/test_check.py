@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+
+repo_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def run_check(*args: str, cwd) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, repo_dir, '--check', *args], cwd=cwd, capture_output=True, text=True, encoding='utf-8')
+
+def test_check_clean(tmp_path):
+    (tmp_path / 'domus.txt').write_text('///SCRIPT BEG\\\\\\\n\nINT. DOMUS\n\nBOB\nSalve.\n\n\\\\\\SCRIPT END///\n', encoding='utf-8')
+    checked = run_check('domus.txt', cwd=tmp_path)
+    assert checked.returncode == 0
+    assert checked.stdout == ''
+    assert 'checked 1 script(s): 0 error(s), 0 warning(s)' in checked.stderr
+
+def test_check_json_lines(tmp_path):
+    # every diagnostic is a JSON line on stdout, and an error fails
+    # the check
+    (tmp_path / 'domus.txt').write_text('INT. DOMUS\n\nBOB\nSalve.\n', encoding='utf-8')
+    (tmp_path / 'forum.txt').write_text('///SCRIPT BEG\\\\\\\n\nEXT. FORUM\n\n<<BOGUS>>\n', encoding='utf-8')
+    checked = run_check('domus.txt', 'forum.txt', cwd=tmp_path)
+    assert checked.returncode == 1
+    messages = [json.loads(line) for line in checked.stdout.splitlines()]
+    assert [(message['file'], message['line'], message['column'], message['severity']) for message in messages] == \
+        [('domus.txt', 1, 1, 'error'),
+         ('domus.txt', 5, 1, 'warning'),
+         ('forum.txt', 5, 1, 'warning'),
+         ('forum.txt', 6, 1, 'warning')]
+    assert all(message['message'] and message['tip'] for message in messages)
+    assert 'checked 2 script(s): 1 error(s), 3 warning(s)' in checked.stderr
@@ -0,0 +1,62 @@
+import random
+import re
+
+from src.old_prog import Run_Helper
+
+# The escapes and cleaning as they were made before Run_Helper made
+# them in one pass, which every string must still come out the same as
+def old_escape_chars(string: str) -> str:
+    string = re.sub(r'(?<!\\)\\(?!\\)', r'\\\\', string)
+    string = re.sub(r'(?<!\\)[\"]', '\\"', string)
+    string = re.sub(r'(?<!\\)[\"]', "\\'", string)
+    string = re.sub(r'(?<!{){(?!{)', r'{{', string)
+    string = re.sub(r'(?<!\[)\[(?!\[)', r'[[', string)
+    string = re.sub(r'(?<!%|\\)%(?!%)', r'\\%', string)
+    string = re.sub(r'(?<!【)【(?!【)', '【【', string)
+    return string
+
+def old_clean_str(string: str) -> str:
+    string = string.replace('’', "'")
+    string = string.replace('“', '"')
+    string = string.replace('”', '"')
+    return string.strip()
+
+escape_corpus: list[str] = \
+    ['',
+     'Plain dialogue, nothing to escape.',
+     # backslashes
+     '\\', '\\\\', '\\\\\\', 'a\\b', 'C:\\path\\to\\file', 'ends with \\',
+     # quotes
+     '"', '""', 'She said "hi".', '\\"', '\\\\"', '"\\', "it's", '“curly”',
+     # braces
+     '{', '{{', '{{{', '{b}bold{/b}', '}{', '{\\',
+     # brackets
+     '[', '[[', '[[[', '[name] says', ']]', '\\[',
+     # percents
+     '%', '%%', '%%%', '100%', '\\%', '\\\\%', '%"', '50% off [now]',
+     # lenticular brackets
+     '【', '【【', '【【【', '【note】', '【{', '\\【',
+     # every character next to every other
+     '\\"{[%【', '【%[{"\\', '{"}', '"{"', '[%]', '%[%', '\\{\\[\\%', '"%"', '【"【', '{{"[[', '%%\\\\""']
+clean_corpus: list[str] = \
+    ['', '  padded  ', 'it’s', '“quoted”', '\t“mixed’ ascii" \n', '’’’', 'ünïcödé “and” ’quotes’', '【’】']
+
+def random_strings(seed: int, count: int) -> list[str]:
+    rng = random.Random(seed)
+    alphabet = '\\"{}[]%【】’“” ab'
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))) for _ in range(count)]
+
+def test_escape_corpus():
+    rh = Run_Helper()
+    for string in escape_corpus:
+        assert rh.escape_chars(string) == old_escape_chars(string), string
+
+def test_escape_random():
+    rh = Run_Helper()
+    for string in random_strings(6, 20000):
+        assert rh.escape_chars(string) == old_escape_chars(string), string
+
+def test_clean_corpus():
+    rh = Run_Helper()
+    for string in clean_corpus+escape_corpus+random_strings(7, 5000):
+        assert rh.clean_str(string) == old_clean_str(string), string
@@ -0,0 +1,17 @@
+import pytest
+
+from dev.gen_script import Script_Generator
+from src.old_prog import Run_Manager
+
+@pytest.mark.parametrize('seed', [0, 1, 3, 6, 7, 10, 11, 16, 20, 21, 22])
+def test_compiles_to_end(tmp_path, seed):
+    # every character written is discovered, whatever the seed
+    read_path = tmp_path / 'generated.txt'
+    with open(read_path, 'w', encoding='utf-8') as write_file:
+        Script_Generator(seed).write(write_file, 2000)
+    rm = Run_Manager.run(str(read_path), str(tmp_path / 'generated.rpy'), 'generated', quiet=True, report_dir=str(tmp_path))
+    assert rm.emit_done
+    assert rm.qar.error is None
+
+def test_same_seed_same_script():
+    assert list(Script_Generator(5).generate(500)) == list(Script_Generator(5).generate(500))
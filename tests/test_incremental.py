@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from dev.check_incremental import Incremental_Check
+from src.old_prog import Run_Manager, Scene_Run_Manager
+
+# An incremental compile splices the scenes that changed into the
+# label already written, and must write exactly what a full compile
+# of the edited script writes
+
+def read_script(scripts_dir: str) -> list[str]:
+    # The bundled script, between the statements that start and end it
+    with open(os.path.join(scripts_dir, 'test_script.txt'), 'r', encoding='utf-8-sig') as read_file:
+        lines = read_file.read().split('\n')
+    title_end = lines.index('________________')+1
+    return lines[:title_end]+['///SCRIPT BEG\\\\\\']+lines[title_end:]+['', '\\\\\\SCRIPT END///', '']
+
+def compile_script(lines: list[str], read_path: str, write_path: str, incremental: bool) -> tuple[str, int]:
+    with open(read_path, 'w', encoding='utf-8') as write_file:
+        write_file.write('\n'.join(lines))
+    rm = Run_Manager.run(read_path, write_path, 'script', quiet=True, incremental=incremental)
+    with open(write_path, 'r', encoding='utf-8') as read_file:
+        return read_file.read(), getattr(rm, 'num_copied', 0)
+
+def edit_scene(lines: list[str]) -> None:
+    # changes a line of dialogue in the second scene
+    index = lines.index('EXT. DOMUS')
+    index = next(num for num in range(index, len(lines)) if lines[num].startswith('('))+1
+    lines[index] = 'Ad extremum, verba nova.'
+
+def add_scene(lines: list[str]) -> None:
+    # copies the first scene to the end, with a character never seen
+    start = lines.index('INT. DOMUS')
+    end = lines.index('EXT. DOMUS')
+    scene = lines[start:end]+['NOVUS', 'Salve.', '', '']
+    index = lines.index('\\\\\\SCRIPT END///')
+    lines[index:index] = scene
+
+def drop_scene(lines: list[str]) -> None:
+    start = lines.index('EXT. DOMUS')
+    end = lines.index('EXT./INT. DOMUS')
+    del lines[start:end]
+
+def test_incremental_matches_full_on_fixture(tmp_path, monkeypatch, scripts_dir):
+    # reports are written to the working directory
+    monkeypatch.chdir(tmp_path)
+    lines = read_script(scripts_dir)
+    read_path = str(tmp_path / 'script.txt')
+    label, _ = compile_script(lines, read_path, str(tmp_path / 'incremental.rpy'), False)
+    assert 'SERGIUS' in label.upper()
+    num_copied = 0
+    for edit in [edit_scene, add_scene, drop_scene]:
+        edit(lines)
+        label, copied = compile_script(lines, read_path, str(tmp_path / 'incremental.rpy'), True)
+        full_label, _ = compile_script(lines, read_path, str(tmp_path / 'full.rpy'), False)
+        assert label == full_label, edit.__name__
+        num_copied += copied
+    # unchanged scenes were copied instead of being compiled again
+    assert num_copied > 0
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_incremental_matches_full_on_generated(tmp_path, seed):
+    # the same check as dev/check_incremental.py, on smaller scripts
+    check = Incremental_Check(str(tmp_path), seed, 600)
+    assert check.run(10)
+    assert check.num_copied > 0
+
+def test_last_label_only_open_while_compiling(tmp_path, monkeypatch, scripts_dir):
+    monkeypatch.chdir(tmp_path)
+    lines = read_script(scripts_dir)
+    read_path = str(tmp_path / 'script.txt')
+    write_path = str(tmp_path / 'incremental.rpy')
+    compile_script(lines, read_path, write_path, True)
+    rm = Scene_Run_Manager('script', True, write_path)
+    assert rm.old_scenes and rm.old_file is None
+    with open(read_path, 'r', encoding='utf-8') as read_file:
+        rm.compile_lines(read_file)
+    assert rm.num_copied > 0 and rm.old_file is None
@@ -0,0 +1,116 @@
+import os
+import zipfile
+
+from src.old_prog import Line_Kinds, Run_Manager
+from src.renpy.read.read_docx import Read_RenPy_DOCX
+
+namespace: str = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+styles_xml: str = \
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>' \
+    '<w:styles '+namespace+'>' \
+    '<w:style w:type="paragraph" w:styleId="SceneHeading"><w:name w:val="Scene Heading"/></w:style>' \
+    '<w:style w:type="paragraph" w:styleId="Character"><w:name w:val="Character"/></w:style>' \
+    '<w:style w:type="paragraph" w:styleId="Parenthetical"><w:name w:val="Parenthetical"/></w:style>' \
+    '<w:style w:type="paragraph" w:styleId="Dialogue"><w:name w:val="Dialogue"/></w:style>' \
+    '<w:style w:type="paragraph" w:styleId="Transition"><w:name w:val="Transition"/></w:style>' \
+    '<w:style w:type="paragraph" w:styleId="Action"><w:name w:val="Action"/></w:style>' \
+    '<w:style w:type="character" w:styleId="Strong"><w:name w:val="Character"/></w:style>' \
+    '</w:styles>'
+
+def paragraph(runs: str, style: str = None, deleted: bool = False) -> str:
+    # deleted is whether the mark ending the paragraph was deleted
+    ppr = '<w:pStyle w:val="'+style+'"/>' if style else ''
+    if deleted:
+        ppr = ppr+'<w:rPr><w:del w:id="9" w:author="A"/></w:rPr>'
+    return '<w:p>'+('<w:pPr>'+ppr+'</w:pPr>' if ppr else '')+runs+'</w:p>'
+
+def run(text: str) -> str:
+    return '<w:r><w:t xml:space="preserve">'+text+'</w:t></w:r>'
+
+# The paragraphs of the document: unstyled lines read as plain text,
+# every screenplay style, tracked changes and a line break
+document_xml: str = \
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>' \
+    '<w:document '+namespace+'><w:body>' \
+    +paragraph(run('///SCRIPT BEG\\\\\\')) \
+    +paragraph('') \
+    +paragraph(run('CUT TO:'), 'Transition') \
+    +paragraph(run('EXT. HORTUS'), 'SceneHeading') \
+    +paragraph(run('Lorem ipsum ')+'<w:del w:id="1" w:author="A"><w:r><w:delText>deleted </w:delText></w:r></w:del>'
+               +'<w:ins w:id="2" w:author="A">'+run('inserted ')+'</w:ins>'+run('odor amet.'), 'Action') \
+    +paragraph(run('JUVENTIA ENTERS'), 'Action') \
+    +paragraph(run('JUVENTIA'), 'Character') \
+    +paragraph(run('ira'), 'Parenthetical') \
+    +paragraph(run('Prima linea.')+'<w:r><w:br/></w:r>'+run('Secunda linea.'), 'Dialogue') \
+    +paragraph('<w:del w:id="3" w:author="A"><w:r><w:delText>Verba deleta.</w:delText></w:r></w:del>', 'Dialogue', True) \
+    +paragraph(run('Vale, '), 'Action', True) \
+    +paragraph(run('amice.'), 'Dialogue') \
+    +paragraph('') \
+    +paragraph(run('SERGIUS')) \
+    +paragraph(run('Salve.')) \
+    +paragraph('') \
+    +paragraph(run('\\\\\\SCRIPT END///')) \
+    +'</w:body></w:document>'
+
+def write_docx(write_path: str) -> str:
+    with zipfile.ZipFile(write_path, 'w') as docx_file:
+        docx_file.writestr('word/styles.xml', styles_xml)
+        docx_file.writestr('word/document.xml', document_xml)
+    return write_path
+
+def test_styles_and_tracked_changes(tmp_path):
+    read_path = write_docx(str(tmp_path / 'styled.docx'))
+    stmts = [(stmt.kind, stmt.line) for stmt in Read_RenPy_DOCX.read(read_path) if stmt.kind != Line_Kinds.empty_line]
+    assert stmts == \
+        [(Line_Kinds.script_beg, '///SCRIPT BEG\\\\\\'),
+         (Line_Kinds.scene_trans, 'CUT TO:'),
+         (Line_Kinds.scene_headr, 'EXT. HORTUS'),
+         # deleted text is left out, inserted text is kept
+         (Line_Kinds.narrt_line, 'Lorem ipsum inserted odor amet.'),
+         (Line_Kinds.narrt_line, 'JUVENTIA ENTERS'),
+         (Line_Kinds.chrct_name, 'JUVENTIA'),
+         (Line_Kinds.chrct_prnth, '(ira)'),
+         # a line break starts a new line of the speech
+         (Line_Kinds.dialg_line, 'Prima linea.'),
+         (Line_Kinds.dialg_line, 'Secunda linea.'),
+         # a deleted paragraph is gone, and one whose mark was deleted
+         # runs on into the next, taking its style
+         (Line_Kinds.dialg_line, 'Vale, amice.'),
+         # unstyled paragraphs are read as a plain text script
+         (Line_Kinds.chrct_name, 'SERGIUS'),
+         (Line_Kinds.dialg_line, 'Salve.'),
+         (Line_Kinds.script_end, '\\\\\\SCRIPT END///')]
+
+def test_line_numbers(tmp_path):
+    # a line break starts a line, and a paragraph whose mark was deleted
+    # shares the line of the paragraph it runs on into
+    read_path = write_docx(str(tmp_path / 'styled.docx'))
+    line_nums = {stmt.line: stmt.line_num for stmt in Read_RenPy_DOCX.read(read_path)}
+    assert line_nums['CUT TO:'] == 3
+    assert line_nums['Secunda linea.'] == 10
+    assert line_nums['Vale, amice.'] == 11
+    assert line_nums['SERGIUS'] == 13
+
+def test_style_names(tmp_path):
+    with zipfile.ZipFile(write_docx(str(tmp_path / 'styled.docx'))) as docx_file:
+        names = Read_RenPy_DOCX.style_names(docx_file)
+    assert names['SceneHeading'] == 'scene heading'
+    # character styles are not paragraph styles
+    assert 'Strong' not in names
+
+def test_bundled_script_lines(scripts_dir):
+    # Word draws the rule under the title page as a border, so it has no
+    # line of its own
+    with open(os.path.join(scripts_dir, 'test_script.txt'), 'r', encoding='utf-8-sig') as read_file:
+        text_lines = [line.strip() for line in read_file if line.strip() and line.strip() != '________________']
+    docx_lines = [text.strip() for style, text, line_num in Read_RenPy_DOCX.paragraphs(os.path.join(scripts_dir, 'test_script.docx')) if text.strip()]
+    assert docx_lines == text_lines
+
+def test_compile(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_path = str(tmp_path / 'docx.rpy')
+    Run_Manager.run(write_docx(str(tmp_path / 'styled.docx')), write_path, 'docx', quiet=True, read_statements=Read_RenPy_DOCX.read)
+    with open(write_path, 'r', encoding='utf-8') as read_file:
+        label = read_file.read()
+    assert 'Secunda linea.' in label
+    assert 'deleta' not in label
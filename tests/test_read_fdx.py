@@ -0,0 +1,67 @@
+import os
+
+from src.old_prog import Line_Kinds, Run_Manager
+from src.renpy.read.read_fdx import Read_RenPy_FDX
+
+def script_statements(read_path: str) -> list[tuple]:
+    # The kind and line of every statement from the start of the script,
+    # leaving out the empty lines between paragraphs
+    stmts = [(stmt.kind, stmt.line) for stmt in Read_RenPy_FDX.read(read_path)]
+    start = stmts.index((Line_Kinds.script_beg, '///SCRIPT BEG\\\\\\'))
+    return [stmt for stmt in stmts[start:] if stmt[0] != Line_Kinds.empty_line]
+
+def test_paragraph_types(typed_dir):
+    stmts = script_statements(os.path.join(typed_dir, 'marked_script.fdx'))
+    assert stmts == \
+        [(Line_Kinds.script_beg, '///SCRIPT BEG\\\\\\'),
+         (Line_Kinds.scene_trans, 'CUT TO:'),
+         (Line_Kinds.scene_headr, 'INT. DOMUS - NIGHT'),
+         # the runs of a paragraph are joined
+         (Line_Kinds.narrt_line, 'Lorem ipsum odor amet.'),
+         # Action is never read as another kind
+         (Line_Kinds.narrt_line, 'SERGIUS ENTERS THE DOMUS'),
+         (Line_Kinds.chrct_name, 'SERGIUS'),
+         # a Parenthetical is put in parentheses
+         (Line_Kinds.chrct_prnth, '(gaudium)'),
+         (Line_Kinds.dialg_line, 'Salve, Juventia.'),
+         (Line_Kinds.chrct_name, 'JUVENTIA (V.O.)'),
+         (Line_Kinds.dialg_line, 'Salve.'),
+         # (CONT'D) is not an extension
+         (Line_Kinds.chrct_name, 'SERGIUS'),
+         (Line_Kinds.dialg_line, 'Quid agis?'),
+         # dual dialogue is one speech after the other
+         (Line_Kinds.chrct_name, 'SERGIUS'),
+         (Line_Kinds.dialg_line, 'Ita.'),
+         (Line_Kinds.chrct_name, 'JUVENTIA'),
+         (Line_Kinds.dialg_line, 'Minime.'),
+         (Line_Kinds.script_end, '\\\\\\SCRIPT END///')]
+
+def test_title_page_and_notes_left_out(typed_dir):
+    lines = [stmt.line for stmt in Read_RenPy_FDX.read(os.path.join(typed_dir, 'marked_script.fdx'))]
+    assert 'TITULUS' not in lines
+    assert 'A note that is not part of the script.' not in lines
+    assert 'Written after the script ends.' not in lines
+
+def test_contd_stripped():
+    assert Read_RenPy_FDX.contd.sub('', "SERGIUS (CONT'D)").rstrip() == 'SERGIUS'
+    assert Read_RenPy_FDX.contd.sub('', 'SERGIUS (cont’d)').rstrip() == 'SERGIUS'
+    assert Read_RenPy_FDX.contd.sub('', 'SERGIUS (V.O.)') == 'SERGIUS (V.O.)'
+
+def test_compile(tmp_path, monkeypatch, typed_dir):
+    monkeypatch.chdir(tmp_path)
+    write_path = str(tmp_path / 'fdx.rpy')
+    rm = Run_Manager.run(os.path.join(typed_dir, 'marked_script.fdx'), write_path, 'fdx', quiet=True, read_statements=Read_RenPy_FDX.read)
+    with open(write_path, 'r', encoding='utf-8') as read_file:
+        label = read_file.read()
+    assert 'Salve, Juventia.' in label
+    assert 'Minime.' in label
+    assert 'CONT' not in label
+    assert rm.qar.error is None
+
+def test_line_numbers(typed_dir):
+    # a paragraph is read from the line its Paragraph element starts on
+    stmts = list(Read_RenPy_FDX.read(os.path.join(typed_dir, 'marked_script.fdx')))
+    line_nums = {stmt.line: stmt.line_num for stmt in stmts if stmt.kind != Line_Kinds.empty_line}
+    assert line_nums['Written before the script starts.'] == 4
+    assert line_nums['///SCRIPT BEG\\\\\\'] == 7
+    assert line_nums['CUT TO:'] == 10
@@ -0,0 +1,77 @@
+import os
+
+from src.old_prog import Line_Kinds, Run_Manager
+from src.renpy.build.build_check import check_script
+from src.renpy.read.read_fountain import Read_RenPy_Fountain
+
+def script_statements(read_path: str) -> list[tuple]:
+    # The kind and line of every statement from the start of the script,
+    # leaving out empty lines
+    stmts = [(stmt.kind, stmt.line) for stmt in Read_RenPy_Fountain.read(read_path)]
+    start = stmts.index((Line_Kinds.script_beg, '///SCRIPT BEG\\\\\\'))
+    return [stmt for stmt in stmts[start:] if stmt[0] != Line_Kinds.empty_line]
+
+def test_fountain_rules(typed_dir):
+    stmts = script_statements(os.path.join(typed_dir, 'marked_script.fountain'))
+    assert stmts == \
+        [(Line_Kinds.script_beg, '///SCRIPT BEG\\\\\\'),
+         # a section is kept as a comment, a synopsis is left out
+         (Line_Kinds.cmmnt_line, '# Actus Primus'),
+         (Line_Kinds.scene_trans, 'CUT TO:'),
+         # the scene number is left out
+         (Line_Kinds.scene_headr, 'INT. DOMUS - NIGHT'),
+         # notes are left out, and so is boneyard spanning lines
+         (Line_Kinds.narrt_line, 'Lorem ipsum  odor amet.'),
+         # a forced Scene Heading needs no empty line after it
+         (Line_Kinds.scene_headr, 'EXT. HORTUS'),
+         (Line_Kinds.narrt_line, 'Sergius waits in the garden.'),
+         # forced Action is never a Character Name
+         (Line_Kinds.narrt_line, 'SERGIUS WAITS'),
+         (Line_Kinds.narrt_line, 'Still.'),
+         (Line_Kinds.chrct_name, 'SERGIUS'),
+         (Line_Kinds.chrct_prnth, '(gaudium)'),
+         (Line_Kinds.dialg_line, 'Salve, Juventia.'),
+         # two spaces keep the speech going over an empty line
+         (Line_Kinds.dialg_line, 'Quid agis?'),
+         (Line_Kinds.narrt_line, 'Juventia turns.'),
+         # a forced Character Name needs no empty line before it
+         (Line_Kinds.chrct_name, 'JUVENTIA'),
+         (Line_Kinds.dialg_line, 'Salve.'),
+         # (CONT'D) is not an extension
+         (Line_Kinds.chrct_name, 'SERGIUS'),
+         (Line_Kinds.dialg_line, 'Ita.'),
+         # dual dialogue is one speech after the other
+         (Line_Kinds.chrct_name, 'JUVENTIA'),
+         (Line_Kinds.dialg_line, 'Minime.'),
+         # centered text is Action, and the page break is left out
+         (Line_Kinds.narrt_line, 'Finis'),
+         (Line_Kinds.scene_trans, 'FADE TO:'),
+         (Line_Kinds.script_end, '\\\\\\SCRIPT END///')]
+
+def test_title_page_left_out(typed_dir):
+    lines = [stmt.line for stmt in Read_RenPy_Fountain.read(os.path.join(typed_dir, 'marked_script.fountain'))]
+    assert not [line for line in lines if line.startswith(('Title:', 'Author:'))]
+    assert 'Written before the script starts.' in lines
+
+def test_uncommented():
+    lines = ['a /* b */ c\n', 'd [[e\n', 'f]] g\n', '/* only\n', 'boneyard */\n', 'h\n']
+    assert list(Read_RenPy_Fountain.uncommented(lines)) == [(1, 'a  c'), (2, 'd '), (3, ' g'), (6, 'h')]
+
+def test_check_line_numbers(tmp_path):
+    # messages are on the line of the file, not the count of statements
+    # left once the title page and notes are left out
+    read_path = tmp_path / 'bad.fountain'
+    read_path.write_text('Title: Titulus\nAuthor: Auctor\n\n/* note */\n///SCRIPT BEG\\\\\\\n\n'
+                         'BOB (V.X.)\nSalve.\n\n\\\\\\SCRIPT END///\n', encoding='utf-8')
+    messages = check_script(str(read_path))
+    assert [(message['severity'], message['line']) for message in messages] == [('error', 7)]
+
+def test_compile(tmp_path, monkeypatch, typed_dir):
+    monkeypatch.chdir(tmp_path)
+    write_path = str(tmp_path / 'fountain.rpy')
+    rm = Run_Manager.run(os.path.join(typed_dir, 'marked_script.fountain'), write_path, 'fountain', quiet=True, read_statements=Read_RenPy_Fountain.read)
+    with open(write_path, 'r', encoding='utf-8') as read_file:
+        label = read_file.read()
+    assert 'Quid agis?' in label
+    assert 'scene cut' not in label
+    assert rm.qar.error is None
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from src.renpy.read import read_pdf
+from src.renpy.read.read_docx import Read_RenPy_DOCX
+from src.renpy.read.read_pdf import Read_RenPy_PDF
+
+def test_lines_match_docx(scripts_dir):
+    # The bundled PDF was printed from the bundled Word document, so the
+    # lines wrapped on its pages must be joined back into its paragraphs
+    pytest.importorskip('pypdf')
+    pdf_lines = [line.strip() for line in Read_RenPy_PDF.lines(os.path.join(scripts_dir, 'test_script.pdf')) if line.strip()]
+    docx_lines = [text.strip() for style, text, line_num in Read_RenPy_DOCX.paragraphs(os.path.join(scripts_dir, 'test_script.docx')) if text.strip()]
+    assert pdf_lines == docx_lines
+
+def test_page_lines():
+    text = '\n'.join(['', '                    SERGIUS', '          Lorem ipsum   odor', '          amet.',
+                      '                    (MORE)', '', '                                  2.'])
+    first_index, lines = Read_RenPy_PDF.page_lines(text)
+    # the page number is left out, and (MORE) is an empty line
+    assert [words for indent, words, width, space in lines] == ['SERGIUS', 'Lorem ipsum odor', 'amet.']
+    assert lines[1][0] == 10
+    # the page starts on its second line, as the first is empty
+    assert first_index == 1
+
+def test_word_width():
+    # after the end of a sentence, a capital is only as wide as its letters
+    assert Read_RenPy_PDF.word_width('habitasse.', 'Montes', 2.0) == 6
+    assert Read_RenPy_PDF.word_width('habitasse,', 'Montes', 2.0) == 12.0
+    assert Read_RenPy_PDF.word_width('habitasse.', 'montes', 2.0) == 12.0
+
+def test_needs_pypdf(monkeypatch, scripts_dir):
+    monkeypatch.setattr(read_pdf, 'pdf', None)
+    with pytest.raises(Exception, match='INVALID READ'):
+        list(Read_RenPy_PDF.lines(os.path.join(scripts_dir, 'test_script.pdf')))
@@ -0,0 +1,46 @@
+from src.old_prog import Run_Manager
+from src.renpy.build.build_batch import Batch_Builder
+
+script: str = '///SCRIPT BEG\\\\\\\n\nINT. DOMUS\n\nBOB\nSalve.\n\n<NVL>\n\nBOB\nAve.\n\nBOB\nVale.\n\n\\\\\\SCRIPT END///\n'
+
+def test_lines_spoken_in_every_style(tmp_path):
+    # a line spoken in a second speech style is counted once
+    read_path = tmp_path / 'styles.txt'
+    read_path.write_text(script, encoding='utf-8')
+    rm = Run_Manager.run(str(read_path), str(tmp_path / 'styles.rpy'), 'styles', quiet=True, report_format='json', report_dir=str(tmp_path))
+    assert rm.report['characters']['BOB']['lines_spoken'] == 3
+
+def test_markdown_counts_lines_once(tmp_path):
+    # every report format gives the same count
+    read_path = tmp_path / 'styles.txt'
+    read_path.write_text(script, encoding='utf-8')
+    rm = Run_Manager.run(str(read_path), str(tmp_path / 'styles.rpy'), 'styles', quiet=True, report_dir=str(tmp_path))
+    with open(rm.rr.report_name, 'r', encoding='utf-8') as read_file:
+        assert '* BOB spoke 3 time(s).' in read_file.read()
+
+def test_batch_reports_in_game_dir(tmp_path, monkeypatch):
+    # reports are written beside the labels, never to the working directory
+    work_dir = tmp_path / 'work'
+    read_dir = tmp_path / 'scripts'
+    game_dir = tmp_path / 'game'
+    for made_dir in (work_dir, read_dir, game_dir):
+        made_dir.mkdir()
+    monkeypatch.chdir(work_dir)
+    (read_dir / 'styles.txt').write_text(script, encoding='utf-8')
+    builder = Batch_Builder(str(read_dir), str(game_dir), jobs=1, report_format='json')
+    results = builder.build()
+    assert not results[0].failure
+    assert builder.write_report(results) == str(game_dir / 'project-report.json')
+    assert (game_dir / 'styles_report.json').exists()
+    assert not list(work_dir.iterdir())
+
+def test_batch_summary_matches_project_report(tmp_path):
+    read_dir = tmp_path / 'scripts'
+    game_dir = tmp_path / 'game'
+    read_dir.mkdir()
+    game_dir.mkdir()
+    (read_dir / 'styles.txt').write_text(script, encoding='utf-8')
+    builder = Batch_Builder(str(read_dir), str(game_dir), jobs=1, report_format='json')
+    result = builder.build()[0]
+    assert result.lines_spoken == {'BOB': 3}
+    assert result.report['characters']['BOB']['lines_spoken'] == 3
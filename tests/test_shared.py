@@ -0,0 +1,32 @@
+import pytest
+
+from src.renpy.build.build_batch import Batch_Builder
+
+def speaker_script(chrctr: str) -> str:
+    return '///SCRIPT BEG\\\\\\\n\nINT. DOMUS\n\n'+chrctr+'\nSalve.\n\n\\\\\\SCRIPT END///\n'
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_names_unique_across_labels(tmp_path, jobs):
+    # two characters of different labels that would both be named mr
+    # are given different names, whether or not they compile together
+    read_dir = tmp_path / 'scripts'
+    game_dir = tmp_path / 'game'
+    read_dir.mkdir()
+    game_dir.mkdir()
+    (read_dir / 'marcus.txt').write_text(speaker_script('MARCUS'), encoding='utf-8')
+    (read_dir / 'maria.txt').write_text(speaker_script('MARIA'), encoding='utf-8')
+    builder = Batch_Builder(str(read_dir), str(game_dir), jobs=jobs)
+    assert not [result.failure for result in builder.build() if result.failure]
+    objs = builder.shared.objs['AVL']
+    assert sorted(objs) == ['MARCUS', 'MARIA']
+    assert len(set(objs.values())) == 2
+    characters = (game_dir / 'characters.rpy').read_text(encoding='utf-8')
+    for chrctr, obj_name in objs.items():
+        assert 'define '+obj_name+' = Character(name=\''+chrctr.title()+'\')' in characters
+        label = (game_dir / (chrctr.lower()+'.rpy')).read_text(encoding='utf-8')
+        assert obj_name+' "Salve."' in label
+    # a label compiled again keeps the names it was given
+    (read_dir / 'maria.txt').write_text(speaker_script('MARIA').replace('Salve.', 'Ave.'), encoding='utf-8')
+    builder = Batch_Builder(str(read_dir), str(game_dir), jobs=jobs)
+    builder.build()
+    assert builder.shared.objs['AVL'] == objs
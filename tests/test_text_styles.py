@@ -0,0 +1,79 @@
+import copy
+
+import pytest
+
+from src.old_prog import Line_Classifier, Line_Kinds, Tag_Attributes, Text_Style_Handler, TS_Keywords
+
+class Old_Text_Style_Handler(Text_Style_Handler):
+    # Sets styles the way every handler did before compile_styles, from
+    # tables of its own. Valued tags used to be changed in place, which
+    # corrupted a tag used twice, so each statement gets fresh tags
+    def get_text_styles(self, stmt: str) -> None:
+        tags_dict = copy.deepcopy(Text_Style_Handler.tags_dict)
+        attr_name: str = ''
+        attr_value: str = ''
+        for attr in [style.replace(' ', '') for style in stmt.split(',')]:
+            if attr.find('=') != -1:
+                attr_split = attr.split('=', 1)
+                attr_name = attr_split[0]
+                attr_value = attr_split[1].lower()
+            else:
+                attr_name = attr
+            if curr_cond := self.is_cond(attr_name):
+                self.curr_cond = curr_cond
+                if curr_cond == TS_Keywords.count_cond and attr_value != '':
+                    self.line_count = int(attr_value) if int(attr_value) > 0 else 1
+                else:
+                    self.line_count = -1
+            elif curr_case := self.is_case(attr_name):
+                self.curr_case = curr_case
+            elif curr_tag := tags_dict.get(attr_name):
+                if curr_tag.no_value and curr_tag.needs_value:
+                    curr_tag.tag_start = curr_tag.tag_start+attr_value+'}'
+                self.tag_prefix = self.tag_prefix + curr_tag.tag_start
+                if curr_tag.tag_end:
+                    self.tag_suffix = self.tag_suffix + curr_tag.tag_end
+            else:
+                new_tag = Tag_Attributes(attr_name.lower(), True if attr_value != '' else False, attr_value)
+                self.tag_prefix = self.tag_prefix + new_tag.tag_start
+                self.tag_suffix = self.tag_suffix + new_tag.tag_end
+
+def style_corpus() -> list[list[str]]:
+    # every keyword on its own, then statements as scripts write them,
+    # each list of statements set one after another
+    keywords = list(Text_Style_Handler.cases_dict)+list(Text_Style_Handler.conds_dict)+list(Text_Style_Handler.tags_dict)
+    corpus = [['{'+keyword+'}'] for keyword in keywords if keyword]
+    corpus += \
+        [['{BOLD, COUNT=3}', '{ITALICS}', '{RED, SPEAK}'],
+         ['{UPPER, COUNT=2}', '{QUICK, NARRATE}', '{SWAP, UNDERLINED}'],
+         ['{BIG, BLUE, INF}', '{LOWER, TRANSLUCENT, COUNT=5}'],
+         ['{COLOR=#FF0000}', '{COLOR = #00ff00, B}', '{COLOR=#FF0000}'],
+         ['{A=20, SIZE=40, CPS=12}', '{A=20}', '{ANCHOR=20, A=30}'],
+         ['{FONT=DejaVuSans.ttf, K=2.5, ALPHA=0.5, OUTLINECOLOR=#000000}'],
+         ['{WAVE}', '{SHAKE=3, WAVE, BOLD}', '{SHAKE = 3}'],
+         ['{COUNT=0}', '{LINECOUNT=7, WHILESPEAKING}', '{COUNT, FOREVER}'],
+         ['{ NOALT , ALT , PLAIN , S , STRIKETHROUGH }'],
+         ['{HUGE, TINY, SMALL, BIG}', '{CRAWL, SLOW, STEADY, SWIFT}', '{LIMPID, TRANSPARENT}']]
+    return corpus
+
+def styles_of(tsh: Text_Style_Handler) -> tuple:
+    return tsh.tag_prefix, tsh.tag_suffix, tsh.curr_case, tsh.curr_cond, tsh.line_count
+
+@pytest.mark.parametrize('stmts', style_corpus())
+def test_compile_styles_unchanged(stmts):
+    lcl = Line_Classifier()
+    tsh = Text_Style_Handler()
+    old_tsh = Old_Text_Style_Handler()
+    for stmt in stmts:
+        line_class = lcl.classify(stmt, True)
+        assert line_class.kind == Line_Kinds.text_style
+        tsh.get_text_styles(line_class.group(1))
+        old_tsh.get_text_styles(line_class.group(1))
+        assert styles_of(tsh) == styles_of(old_tsh)
+
+def test_valued_tag_used_twice():
+    tsh = Text_Style_Handler()
+    tsh.get_text_styles('COLOR=#FF0000')
+    tsh.get_text_styles('COLOR=#FF0000')
+    assert tsh.tag_prefix == '{color=#ff0000}{color=#ff0000}'
+    assert Text_Style_Handler.tags_dict['COLOR'].tag_start == '{color='